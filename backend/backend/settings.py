@@ -7,6 +7,7 @@ import os
 import ssl
 from dotenv import load_dotenv
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Load environment variables
 load_dotenv()
@@ -114,6 +115,10 @@ TEMPLATES = [
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOW_CREDENTIALS = True
 
+# Payment and point-spending calls send an Idempotency-Key (core.modules.idempotency)
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
 CORS_ALLOWED_ORIGINS = get_env_list("CORS_ALLOWED_ORIGINS")
 CSRF_TRUSTED_ORIGINS = get_env_list("CSRF_TRUSTED_ORIGINS")
 
@@ -189,6 +194,13 @@ CELERY_BROKER_URL = f"{REDIS_URL}/0"
 CELERY_RESULT_BACKEND = f"{REDIS_URL}/0"
 CELERY_TIMEZONE = "Asia/Dhaka"
 CELERY_ENABLE_UTC = False
+CELERY_BEAT_SCHEDULE = {
+    # Keeps ledger balance reads to a snapshot plus a short tail (core.modules.points)
+    "snapshot-point-balances": {
+        "task": "core.tasks.snapshot_point_balances",
+        "schedule": int(os.getenv("POINTS_SNAPSHOT_INTERVAL", 60 * 60)),
+    },
+}
 
 CHANNEL_LAYERS = {
     "default": {
@@ -221,6 +233,17 @@ DEFAULT_FROM_EMAIL = os.getenv("FROM_EMAIL", EMAIL_HOST_USER)
 
 FRONTEND_SITE_URL = os.getenv("FRONTEND_SITE_URL", "http://localhost:3000")
 
+# New-job alerts are buffered per tutor and sent as one digest per window (seconds);
+# 0 sends every alert immediately
+JOB_ALERT_DIGEST_WINDOW = int(os.getenv("JOB_ALERT_DIGEST_WINDOW", 30 * 60))
+
+# Responses to requests sent with an Idempotency-Key header are replayed for this long (seconds)
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+
+# Chat messages arriving within this many milliseconds are written in one transaction
+# (write-behind, see core.modules.chat); 0 writes each message as it arrives
+CHAT_WRITE_BEHIND_MS = int(os.getenv("CHAT_WRITE_BEHIND_MS", 0))
+
 # ------------------------------------------------------------------------------
 # REST / JWT
 # ------------------------------------------------------------------------------
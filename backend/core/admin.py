@@ -3,6 +3,7 @@ from django.contrib.auth.admin import UserAdmin
 from .models import (
     User, Gig, Credit, Job, Application,
     Notification, Message, UserSettings, Review, EscrowPayment ,Subject, Conversation, ConversationParticipant,
+    PointsTransaction,
 )
 
 @admin.register(User)
@@ -113,4 +114,11 @@ class SubjectAdmin(admin.ModelAdmin):
     list_display = ('name', 'aliases', 'is_active')
     search_fields = ('name', 'aliases')
     list_filter = ('is_active',)
+
+@admin.register(PointsTransaction)
+class PointsTransactionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'delta', 'reason', 'ref', 'created_at')
+    list_filter = ('reason',)
+    search_fields = ('user__username', 'ref')
+    readonly_fields = ('user', 'delta', 'reason', 'ref', 'created_at')
 # backend/core/admin.py
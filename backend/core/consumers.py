@@ -1,7 +1,11 @@
 import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
-from django.utils import timezone
+
+from core.modules import chat
+
+PARTICIPANTS_TTL = 30  # seconds a connection trusts its cached participant ids
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -26,6 +30,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.user = user
         self.user_id = user.id
         self.group_name = f"user_{self.user_id}"
+        self.participants = {}  # conversation id -> (loaded at, participant user ids), see PARTICIPANTS_TTL
 
         # Join group
         await self.channel_layer.group_add(self.group_name, self.channel_name)
@@ -84,8 +89,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
     # Handlers for different message types
 
     async def handle_chat_message(self, data):
-        msg = await self.save_message(data)
-        other_ids = await self.get_other_participant_ids(msg.conversation.id, self.user_id)
+        conversation_id = int(data["conversation_id"])
+        participant_ids = await self.conversation_participant_ids(conversation_id)
+        if self.user_id not in participant_ids:
+            return
+        other_ids = [pid for pid in participant_ids if pid != self.user_id]
+        msg = await self.save_message(conversation_id, data.get("content", ""), other_ids)
 
         # Check unlock status for each recipient
         for receiver_id in other_ids:
@@ -131,12 +140,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
         if not conversation_id:
             return
 
-        # Mark messages as seen for current user in conversation
-        await self.mark_as_read(conversation_id)
+        conversation_id = int(conversation_id)
+        participant_ids = await self.conversation_participant_ids(conversation_id)
+        if self.user_id not in participant_ids:
+            return
+
+        # Mark only the unseen messages, getting back the newest one per sender
+        watermarks = await sync_to_async(chat.mark_read)(self.user_id, conversation_id)
 
         # Notify other participants about read
-        participants = await self.get_other_participant_ids(conversation_id, self.user_id)
-        for pid in participants:
+        for pid in participant_ids:
+            if pid == self.user_id:
+                continue
             await self.channel_layer.group_send(
                 f"user_{pid}",
                 {
@@ -146,19 +161,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 },
             )
 
-        # Notify message senders about status update 'seen'
-        newly_read_message_ids = await self.get_newly_read_message_ids(conversation_id, self.user_id)
-        for message_id in newly_read_message_ids:
-            msg = await self.get_message(message_id)
-            if msg:
-                await self.channel_layer.group_send(
-                    f"user_{msg.sender.id}",
-                    {
-                        "type": "chat.message_status",
-                        "message_id": message_id,
-                        "status": "seen",
-                    },
-                )
+        # One event per sender: all their messages up to message_id are now seen
+        for sender_id, message_id in watermarks.items():
+            await self.channel_layer.group_send(
+                f"user_{sender_id}",
+                {
+                    "type": "chat.read_up_to",
+                    "conversation_id": conversation_id,
+                    "reader_id": self.user_id,
+                    "message_id": message_id,
+                },
+            )
 
     async def handle_chat_delivered(self, data):
         message_id = data.get("message_id")
@@ -189,6 +202,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         conv_data = await self.get_or_create_conversation(int(other_user_id))
+        self.participants.pop(conv_data["id"], None)  # membership may have just been written
         await self.send(text_data=json.dumps({
             "type": "chat.conversation_started",
             "conversation": conv_data
@@ -233,6 +247,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
             "reader_id": event["reader_id"]
         }))
 
+    async def chat_read_up_to(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "chat.read_up_to",
+            "conversation_id": event["conversation_id"],
+            "reader_id": event["reader_id"],
+            "message_id": event["message_id"],
+        }))
+
     async def chat_message_status(self, event):
         await self.send(text_data=json.dumps({
             "type": "chat.message_status",
@@ -242,76 +264,30 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     # --------- DB operations ---------
 
-    @sync_to_async
-    def save_message(self, data):
-        from core.models import User, Conversation, Message, ConversationParticipant, MessageRead
-
-        sender = User.objects.get(id=self.user_id)
-        conversation = Conversation.objects.get(id=data["conversation_id"])
-        msg = Message.objects.create(
-            sender=sender,
-            conversation=conversation,
-            content=data.get("content", ""),
-            timestamp=timezone.now(),
-        )
-
-        # Create MessageRead entries with status 'sent' for all participants except sender
-        participant_ids = ConversationParticipant.objects.filter(conversation=conversation).exclude(user=sender).values_list('user_id', flat=True)
-        for uid in participant_ids:
-            MessageRead.objects.create(message=msg, user_id=uid, status='sent')
-
+    async def save_message(self, conversation_id, content, recipient_ids):
+        # Message plus a 'sent' MessageRead per recipient, written in bulk (core.modules.chat)
+        msg = await chat.save_message(self.user_id, conversation_id, content, recipient_ids)
+        msg.sender = self.user
         return msg
 
-    @sync_to_async
-    def get_other_participant_ids(self, conversation_id, exclude_user_id):
-        from core.models import ConversationParticipant
-        return list(
-            ConversationParticipant.objects.filter(conversation_id=conversation_id)
-            .exclude(user_id=exclude_user_id)
-            .values_list("user_id", flat=True)
-        )
-
-    @sync_to_async
-    def mark_as_read(self, conversation_id):
-        from core.models import MessageRead, Message, ConversationParticipant
-
-        # Mark all unread MessageRead entries as 'seen' for this user in this conversation
-        unread_reads = MessageRead.objects.filter(
-            user_id=self.user_id,
-            message__conversation_id=conversation_id
-        ).exclude(status='seen')
-
-        unread_reads.update(status='seen', read_at=timezone.now())
-
-        # Update participant's last_read_message pointer
-        latest_msg = Message.objects.filter(conversation_id=conversation_id).order_by("-timestamp").first()
-        if latest_msg:
-            participant = ConversationParticipant.objects.filter(user_id=self.user_id, conversation_id=conversation_id).first()
-            if participant:
-                participant.last_read_message = latest_msg
-                participant.save()
+    async def conversation_participant_ids(self, conversation_id):
+        # Cached briefly, so a participant added or removed elsewhere is picked up within PARTICIPANTS_TTL
+        loaded_at, participant_ids = self.participants.get(conversation_id, (0, None))
+        if participant_ids is None or time.monotonic() - loaded_at > PARTICIPANTS_TTL:
+            participant_ids = await self.get_participant_ids(conversation_id)
+            if self.user_id in participant_ids:
+                self.participants[conversation_id] = (time.monotonic(), participant_ids)
+            else:
+                self.participants.pop(conversation_id, None)
+        return participant_ids
 
     @sync_to_async
-    def get_newly_read_message_ids(self, conversation_id, user_id):
-        from core.models import MessageRead
-
-        # Return message IDs that are now seen by user
+    def get_participant_ids(self, conversation_id):
+        from core.models import ConversationParticipant
         return list(
-            MessageRead.objects.filter(
-                user_id=user_id,
-                message__conversation_id=conversation_id,
-                status='seen'
-            ).values_list('message_id', flat=True)
+            ConversationParticipant.objects.filter(conversation_id=conversation_id).values_list("user_id", flat=True)
         )
 
-    @sync_to_async
-    def get_message(self, message_id):
-        from core.models import Message
-        try:
-            return Message.objects.select_related("sender", "conversation").get(id=message_id)
-        except Message.DoesNotExist:
-            return None
-
     @sync_to_async
     def search_users(self, keyword):
         from core.models import User
@@ -403,10 +379,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         status = None
         is_read = False
 
-        if msg.sender.id == self.user_id:
-            other_user_ids = await sync_to_async(
-                lambda: list(msg.conversation.participants.exclude(user_id=self.user_id).values_list('user_id', flat=True))
-            )()
+        if msg.sender_id == self.user_id:
+            other_user_ids = [pid for pid in await self.conversation_participant_ids(msg.conversation_id) if pid != self.user_id]
 
             if other_user_ids:
                 try:
@@ -419,8 +393,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
         return {
             "id": msg.id,
-            "conversation_id": msg.conversation.id,
-            "sender": {"id": msg.sender.id, "username": msg.sender.username},
+            "conversation_id": msg.conversation_id,
+            "sender": {"id": msg.sender_id, "username": msg.sender.username},
             "content": msg.content,
             "timestamp": msg.timestamp.isoformat(),
             "is_system": getattr(msg, "is_system", False),
@@ -0,0 +1,52 @@
+import time
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from core.models import User, Job
+from core.modules.geocoding import NOT_CACHED, geocode_location, lookup_cached, normalize_location
+from core.modules.spatial import geohash_encode
+
+NOMINATIM_MIN_INTERVAL = 1.0  # seconds between remote lookups (Nominatim usage policy)
+
+
+class Command(BaseCommand):
+    help = "Geocode tutor and job locations that have no coordinates or geohash yet (each distinct location is looked up once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all-users", action="store_true", help="Include students, not just tutors")
+
+    def handle(self, *args, **options):
+        users = User.objects.all() if options["all_users"] else User.objects.filter(user_type="tutor")
+        self.backfill(User, users)
+        self.backfill(Job, Job.objects.all())
+
+    def backfill(self, model, queryset):
+        queryset = queryset.filter(Q(latitude__isnull=True) | Q(geohash="")).only("id", *model.GEOCODE_FIELDS)
+
+        # Group ids by normalized location so each place is geocoded once
+        by_location = defaultdict(list)
+        originals = {}
+        for obj in queryset.iterator():
+            query = obj.geocode_query()
+            if not query:
+                continue
+            key = normalize_location(query)
+            by_location[key].append(obj.id)
+            originals.setdefault(key, query)
+
+        updated = 0
+        for key, ids in by_location.items():
+            remote = lookup_cached(key) is NOT_CACHED
+            coords = geocode_location(originals[key])
+            if coords:
+                updated += model.objects.filter(id__in=ids).update(
+                    latitude=coords[0], longitude=coords[1], geohash=geohash_encode(*coords)
+                )
+            else:
+                self.stdout.write(self.style.WARNING(f"No coordinates for '{originals[key]}'"))
+            if remote:
+                time.sleep(NOMINATIM_MIN_INTERVAL)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{model.__name__}: geocoded {len(by_location)} distinct locations, updated {updated} rows"
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.modules import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Drop the per-subject gig leaderboards in Redis so each reloads from the database on its next read"
+
+    def handle(self, *args, **kwargs):
+        if leaderboard.redis_client() is None:
+            self.stdout.write("The cache is not Redis; ranks are read from the database")
+            return
+        try:
+            count = leaderboard.clear()
+        except leaderboard.RedisError as e:
+            raise CommandError(
+                f"Could not reach Redis ({e}); loaded leaderboards expire within {leaderboard.LEADERBOARD_TTL}s"
+            ) from e
+        self.stdout.write(self.style.SUCCESS(f"Dropped {count} gig leaderboards; they reload on first read"))
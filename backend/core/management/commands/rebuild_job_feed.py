@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.modules import feed
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized tutor job feeds from gigs, job subjects and active subjects"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            count = feed.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} feed entries"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Gig, Job, SearchDocument, User
+from core.modules import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents for jobs, gigs and tutor profiles"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            documents = []
+            for job in Job.objects.prefetch_related("subjects").iterator(chunk_size=500):
+                documents.append(SearchDocument(kind="job", object_id=job.id, body=search.job_body(job)))
+            for gig in Gig.objects.select_related("subject").iterator(chunk_size=500):
+                documents.append(SearchDocument(kind="gig", object_id=gig.id, body=search.gig_body(gig)))
+            for user in User.objects.filter(user_type="tutor").iterator(chunk_size=500):
+                documents.append(SearchDocument(kind="tutor", object_id=user.id, body=search.tutor_body(user)))
+            documents = [d for d in documents if d.body.strip()]
+            SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(documents)} documents"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from core.modules import subject_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the subject -> tutors index from gigs and load it into Redis (when the cache is Redis)"
+
+    def handle(self, *args, **kwargs):
+        count = subject_index.rebuild()
+        target = "database and Redis" if subject_index.loaded_redis() is not None else "database"
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} subject/tutor pairs in the {target}"))
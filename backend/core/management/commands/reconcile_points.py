@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.modules import points
+
+
+class Command(BaseCommand):
+    help = "Check every user's points ledger (snapshot + later transactions) against Credit.balance"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--snapshot", action="store_true", help="Take fresh snapshots before checking")
+
+    def handle(self, *args, **options):
+        if options["snapshot"]:
+            self.stdout.write(f"Snapshotted {points.take_snapshots()} balances")
+        mismatches = 0
+        for user_id, credit_balance, ledger_balance in points.reconcile():
+            mismatches += 1
+            self.stdout.write(f"user {user_id}: balance {credit_balance}, ledger {ledger_balance}")
+        if mismatches:
+            raise CommandError(f"{mismatches} balances do not match the ledger")
+        self.stdout.write(self.style.SUCCESS("All balances match the ledger"))
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 9
+
+
+def geohash_encode(lat, lon, precision=PRECISION):
+    # Copy of core.modules.spatial.geohash_encode as it was when this migration was written
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def fill_user_geohashes(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    geocoded = User.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for user_id, lat, lon in geocoded.values_list('id', 'latitude', 'longitude').iterator():
+        User.objects.filter(id=user_id).update(geohash=geohash_encode(lat, lon))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0041_geocodecache_user_latitude_user_longitude'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, help_text='Geocoded from location', null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, help_text='Geocoded from location', null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.RunPython(fill_user_geohashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:53
+
+from django.db import migrations, models
+
+
+SQLITE_FTS_SQL = [
+    "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+    "body, content='core_searchdocument', content_rowid='id')",
+    "CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+SQLITE_FTS_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_ai",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_au",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+MYSQL_FTS_SQL = ["ALTER TABLE core_searchdocument ADD FULLTEXT INDEX core_searchdocument_body_ft (body)"]
+MYSQL_FTS_DROP_SQL = ["ALTER TABLE core_searchdocument DROP INDEX core_searchdocument_body_ft"]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FTS_SQL, 'mysql': MYSQL_FTS_SQL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FTS_DROP_SQL, 'mysql': MYSQL_FTS_DROP_SQL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0042_job_geohash_job_latitude_job_longitude_user_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('job', 'Job'), ('gig', 'Gig'), ('tutor', 'Tutor')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('body', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0045_tutorjobfeed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobAlertDigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.job')),
+                ('tutor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_job_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('tutor', 'job')},
+            },
+        ),
+    ]
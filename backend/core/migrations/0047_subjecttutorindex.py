@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:10
+
+from django.conf import settings
+from collections import defaultdict
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_index(apps, schema_editor):
+    Subject = apps.get_model('core', 'Subject')
+    Gig = apps.get_model('core', 'Gig')
+    SubjectTutorIndex = apps.get_model('core', 'SubjectTutorIndex')
+
+    subjects = {name.lower(): pk for pk, name in Subject.objects.filter(is_active=True).values_list('id', 'name')}
+    points = defaultdict(int)
+    gigs = Gig.objects.filter(tutor__user_type='tutor').values_list('tutor_id', 'subject', 'used_credits')
+    for tutor_id, subject, used_credits in gigs.iterator():
+        subject_id = subjects.get((subject or '').strip().lower())
+        if subject_id:
+            points[(subject_id, tutor_id)] += used_credits
+    SubjectTutorIndex.objects.bulk_create(
+        [SubjectTutorIndex(subject_id=s, tutor_id=t, points_spent=p) for (s, t), p in points.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_jobalertdigestitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectTutorIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points_spent', models.PositiveIntegerField(default=0)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tutor_index', to='core.subject')),
+                ('tutor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_index', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject', '-points_spent'], name='subject_tutor_points_idx'), models.Index(fields=['tutor', 'subject'], name='tutor_subject_idx')],
+                'unique_together': {('subject', 'tutor')},
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
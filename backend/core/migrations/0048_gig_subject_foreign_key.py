@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:02
+
+from collections import defaultdict
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_gig_subjects(apps, schema_editor):
+    """Point every gig at the Subject its text names, directly or through Subject.aliases."""
+    Subject = apps.get_model('core', 'Subject')
+    Gig = apps.get_model('core', 'Gig')
+    SubjectTutorIndex = apps.get_model('core', 'SubjectTutorIndex')
+
+    canonical = {}
+    for pk, name, aliases in Subject.objects.values_list('id', 'name', 'aliases'):
+        for alias in (aliases or '').split(','):
+            if alias.strip():
+                canonical.setdefault(alias.strip().lower(), pk)
+    # Names win over aliases
+    for pk, name in Subject.objects.values_list('id', 'name'):
+        canonical[name.strip().lower()] = pk
+
+    gig_ids = defaultdict(list)
+    for gig_id, text in Gig.objects.values_list('id', 'subject_text').iterator():
+        text = (text or '').strip()
+        if not text:
+            continue
+        subject_id = canonical.get(text.lower())
+        if subject_id is None:
+            subject_id = Subject.objects.create(name=text[:100], is_active=False).pk
+            canonical[text.lower()] = subject_id
+        gig_ids[subject_id].append(gig_id)
+    for subject_id, ids in gig_ids.items():
+        for start in range(0, len(ids), 1000):
+            Gig.objects.filter(id__in=ids[start:start + 1000]).update(subject_id=subject_id)
+
+    # Gigs matched through an alias now count towards the subject index as well
+    SubjectTutorIndex.objects.all().delete()
+    points = defaultdict(int)
+    gigs = Gig.objects.filter(tutor__user_type='tutor', subject__is_active=True).values_list(
+        'subject_id', 'tutor_id', 'used_credits'
+    )
+    for subject_id, tutor_id, used_credits in gigs.iterator():
+        points[(subject_id, tutor_id)] += used_credits
+    SubjectTutorIndex.objects.bulk_create(
+        [SubjectTutorIndex(subject_id=s, tutor_id=t, points_spent=p) for (s, t), p in points.items()],
+        batch_size=1000,
+    )
+
+
+def unlink_gig_subjects(apps, schema_editor):
+    Gig = apps.get_model('core', 'Gig')
+    for gig in Gig.objects.select_related('subject').exclude(subject=None).iterator():
+        Gig.objects.filter(id=gig.id).update(subject_text=gig.subject.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0047_subjecttutorindex'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='gig',
+            old_name='subject',
+            new_name='subject_text',
+        ),
+        migrations.AddField(
+            model_name='gig',
+            name='subject',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gigs', to='core.subject'),
+        ),
+        migrations.RunPython(link_gig_subjects, unlink_gig_subjects),
+        migrations.RemoveField(
+            model_name='gig',
+            name='subject_text',
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['subject', 'tutor'], name='gig_subject_tutor_idx'),
+        ),
+    ]
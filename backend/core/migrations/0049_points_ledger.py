@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def record_opening_balances(apps, schema_editor):
+    """Existing balances have no history: each becomes one opening transaction, snapshotted."""
+    Credit = apps.get_model('core', 'Credit')
+    PointsTransaction = apps.get_model('core', 'PointsTransaction')
+    PointsSnapshot = apps.get_model('core', 'PointsSnapshot')
+
+    balances = Credit.objects.exclude(balance=0).values_list('user_id', 'balance')
+    PointsTransaction.objects.bulk_create(
+        [PointsTransaction(user_id=user_id, delta=balance, reason='opening') for user_id, balance in balances.iterator()],
+        batch_size=1000,
+    )
+    PointsSnapshot.objects.bulk_create(
+        [
+            PointsSnapshot(user_id=user_id, balance=balance, last_transaction_id=last_id)
+            for user_id, balance, last_id in PointsTransaction.objects.values_list('user_id', 'delta', 'id').iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0048_gig_subject_foreign_key'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='credit_balance',
+        ),
+        migrations.CreateModel(
+            name='PointsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.IntegerField(default=0)),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('taken_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='points_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PointsTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'Opening balance'), ('signup', 'Signup bonus'), ('purchase', 'Purchase'), ('referral', 'Referral bonus'), ('transfer_in', 'Transfer received'), ('transfer_out', 'Transfer sent'), ('job_post', 'Job post'), ('job_unlock', 'Job unlock'), ('contact_unlock', 'Contact unlock'), ('profile_unlock', 'Profile unlock'), ('gig_create', 'Gig creation'), ('gig_boost', 'Gig boost'), ('application', 'Job application'), ('adjustment', 'Manual adjustment')], max_length=20)),
+                ('ref', models.CharField(blank=True, help_text='What the points were for, e.g. job:42', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'id'], name='points_txn_user_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_points_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['subject', '-used_credits', '-created_at'], name='gig_leaderboard_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_gig_leaderboard_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobalertdigestitem',
+            name='send_email',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_feeds(apps, schema_editor):
+    """
+    Fill TutorJobFeed for the jobs that existed before feeds were written on save, as
+    core.modules.feed.rebuild() does: every job with an active subject that one of the
+    tutor's gigs is in. Existing entries are kept.
+    """
+    Gig = apps.get_model('core', 'Gig')
+    Job = apps.get_model('core', 'Job')
+    TutorJobFeed = apps.get_model('core', 'TutorJobFeed')
+
+    tutors_by_subject = {}
+    gig_rows = (
+        Gig.objects.filter(tutor__user_type='tutor', subject__is_active=True)
+        .values_list('subject_id', 'tutor_id')
+        .distinct()
+    )
+    for subject_id, tutor_id in gig_rows:
+        tutors_by_subject.setdefault(subject_id, set()).add(tutor_id)
+    if not tutors_by_subject:
+        return
+
+    job_rows = (
+        Job.subjects.through.objects.filter(subject_id__in=list(tutors_by_subject))
+        .values_list('job_id', 'subject_id', 'job__created_at')
+        .order_by('job_id')
+    )
+    entries, job_tutors, current_job_id = [], set(), None
+    for job_id, subject_id, created_at in job_rows.iterator():
+        if job_id != current_job_id:
+            # Rows come ordered by job, so only the current job's tutors need remembering
+            job_tutors, current_job_id = set(), job_id
+        for tutor_id in tutors_by_subject[subject_id]:
+            if tutor_id not in job_tutors:
+                job_tutors.add(tutor_id)
+                entries.append(TutorJobFeed(tutor_id=tutor_id, job_id=job_id, created_at=created_at))
+        if len(entries) >= BATCH_SIZE:
+            TutorJobFeed.objects.bulk_create(entries, ignore_conflicts=True)
+            entries = []
+    TutorJobFeed.objects.bulk_create(entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_jobalertdigestitem_send_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
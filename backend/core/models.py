@@ -16,7 +16,6 @@ class User(AbstractUser):
     email_verified = models.BooleanField(default=False)
     otp_code = models.CharField(max_length=6, blank=True, null=True)
     otp_expires = models.DateTimeField(blank=True, null=True)
-    credit_balance = models.IntegerField(default=5)
     phone_number = PhoneNumberField(blank=True, null=True, unique=True)
     phone = PhoneNumberField(blank=True, null=True, unique=True)
     phone_verified = models.BooleanField(default=False)
@@ -29,6 +28,9 @@ class User(AbstractUser):
     verification_requested = models.BooleanField(default=False) # Reverted: Original duplicate field
     is_premium = models.BooleanField(default=False) # Reverted: Original duplicate field
     location = models.CharField(max_length=255, blank=True, null=True, help_text="e.g., City, Country or Region")
+    latitude = models.FloatField(blank=True, null=True, db_index=True, help_text="Geocoded from location")
+    longitude = models.FloatField(blank=True, null=True, db_index=True, help_text="Geocoded from location")
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
     bio = models.TextField(blank=True, null=True)
     education = models.CharField(max_length=255, blank=True, null=True)
     experience = models.CharField(max_length=255, blank=True, null=True)
@@ -51,12 +53,23 @@ class User(AbstractUser):
         help_text="Whether the referrer has received the bonus for this user's first purchase"
     )
 
+    GEOCODE_FIELDS = ("location",)
+
+    def geocode_query(self):
+        return self.location or ""
+
     def has_premium(self):
         """Check if user currently has active premium."""
         if self.is_premium and self.premium_expires:
             return self.premium_expires >= timezone.now()
         return False
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of tutor/student listings
+            models.Index(fields=['user_type', '-date_joined', '-id'], name='user_type_joined_idx'),
+        ]
+
 class ContactUnlock(models.Model):
     unlocker = models.ForeignKey(User, on_delete=models.CASCADE, related_name="contacts_unlocked")
     target = models.ForeignKey(User, on_delete=models.CASCADE, related_name="unlocked_by")
@@ -187,17 +200,61 @@ class Payment(models.Model):
         """String representation of the Payment."""
         return f"Payment for Order {self.order.id} - Amount: {self.amount} - Status: {self.status}"
 
+class SubjectManager(models.Manager):
+    def canonical(self, name):
+        """The subject called `name`, or listing it among its aliases (case-insensitive), else None."""
+        name = (name or "").strip()
+        if not name:
+            return None
+        subject = self.filter(name__iexact=name).first()
+        if subject is not None:
+            return subject
+        lowered = name.lower()
+        for candidate in self.filter(aliases__icontains=name):
+            if lowered in (alias.lower() for alias in candidate.alias_list()):
+                return candidate
+        return None
+
+    def resolve(self, name):
+        """canonical(name), creating an inactive subject for names not seen before."""
+        subject = self.canonical(name)
+        if subject is None and (name or "").strip():
+            subject, _ = self.get_or_create(name=name.strip(), defaults={"is_active": False})
+        return subject
+
+
 class Subject(models.Model):
     name = models.CharField(max_length=100, unique=True)
     aliases = models.CharField(max_length=255, blank=True, help_text="Comma-separated list of alternate names")
     is_active = models.BooleanField(default=False)
 
+    objects = SubjectManager()
+
     def alias_list(self):
         return [a.strip() for a in self.aliases.split(',') if a.strip()]
 
     def __str__(self):
         return self.name
 
+class GeocodeCache(models.Model):
+    """
+    Shared geocoder results keyed by normalized location text.
+    A row with null coordinates records a lookup that found nothing.
+    """
+    query = models.CharField(max_length=255, unique=True, help_text="Normalized location text")
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def coordinates(self):
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
+
+    def __str__(self):
+        return f"{self.query} → {self.coordinates}"
+
 
 # models.py
 from django.db import models
@@ -207,7 +264,7 @@ User = get_user_model()
 
 class Gig(models.Model):
     tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='gigs')
-    subject = models.CharField(max_length=255, default='')
+    subject = models.ForeignKey(Subject, on_delete=models.SET_NULL, null=True, blank=True, related_name='gigs')
     title = models.CharField(max_length=255, default='')  # default empty string
     description = models.TextField(default='')            # default empty string
     message = models.TextField(blank=True, null=True)
@@ -221,6 +278,12 @@ class Gig(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['subject', 'tutor'], name='gig_subject_tutor_idx'),
+            models.Index(fields=['subject', '-used_credits', '-created_at'], name='gig_leaderboard_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} by {self.tutor.username}"
 
@@ -233,6 +296,51 @@ class Credit(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.balance} credits"
 
+class PointsTransaction(models.Model):
+    """
+    Append-only ledger of point balance changes, written in the same transaction
+    as the Credit.balance update it records (core.modules.points).
+    """
+    REASON_CHOICES = (
+        ("opening", "Opening balance"),
+        ("signup", "Signup bonus"),
+        ("purchase", "Purchase"),
+        ("referral", "Referral bonus"),
+        ("transfer_in", "Transfer received"),
+        ("transfer_out", "Transfer sent"),
+        ("job_post", "Job post"),
+        ("job_unlock", "Job unlock"),
+        ("contact_unlock", "Contact unlock"),
+        ("profile_unlock", "Profile unlock"),
+        ("gig_create", "Gig creation"),
+        ("gig_boost", "Gig boost"),
+        ("application", "Job application"),
+        ("adjustment", "Manual adjustment"),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='points_transactions')
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    ref = models.CharField(max_length=64, blank=True, help_text="What the points were for, e.g. job:42")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='points_txn_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.delta:+d} ({self.reason})"
+
+class PointsSnapshot(models.Model):
+    """A user's ledger balance up to and including last_transaction_id."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='points_snapshot')
+    balance = models.IntegerField(default=0)
+    last_transaction_id = models.BigIntegerField(default=0)
+    taken_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.balance} as of transaction {self.last_transaction_id}"
+
 class Job(models.Model):
     SERVICE_TYPE_CHOICES = [
         ('Tutoring', 'Tutoring'),
@@ -256,6 +364,9 @@ class Job(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs_posted')
 
     location = models.CharField(max_length=255, default='Unknown')
+    latitude = models.FloatField(null=True, blank=True, help_text="Geocoded from location")
+    longitude = models.FloatField(null=True, blank=True, help_text="Geocoded from location")
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
     phone = models.CharField(max_length=30, default='N/A')
     description = models.TextField(default='')
 
@@ -314,6 +425,20 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    GEOCODE_FIELDS = ("location", "country")
+
+    def geocode_query(self):
+        location = "" if self.location in ("", "Unknown") else self.location
+        country = "" if self.country in ("", "Unknown") else self.country
+        if location and country and country.lower() not in location.lower():
+            return f"{location}, {country}"
+        return location
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='job_created_idx'),
+        ]
+
     def __str__(self):
         return f"Job {self.id} by {self.student.username} - {self.service_type}"
 
@@ -339,6 +464,24 @@ class JobUnlock(models.Model):
     def __str__(self):
         return f"{self.tutor.username} unlocked Job {self.job.id} for {self.points_spent} pts"
 
+class TutorJobFeed(models.Model):
+    """
+    Materialized "jobs matching my gigs" feed, one row per (tutor, job).
+    Maintained on write by core.modules.feed; created_at mirrors Job.created_at.
+    """
+    tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_feed')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='feed_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('tutor', 'job')
+        indexes = [
+            models.Index(fields=['tutor', '-created_at', '-id'], name='tutor_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} in feed of tutor {self.tutor_id}"
+
 class PointPackage(models.Model):
     name = models.CharField(max_length=100)
     price_usd = models.DecimalField(max_digits=6, decimal_places=2)
@@ -407,9 +550,48 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['to_user', 'is_read', '-created_at', '-id'], name='notification_inbox_idx'),
+        ]
+
     def __str__(self):
         return f'From {self.from_user} to {self.to_user} - {self.message[:30]}'
 
+class SubjectTutorIndex(models.Model):
+    """
+    Inverted index: active subject -> tutors with a gig in it, with the points
+    spent on those gigs. Maintained by core.modules.subject_index (mirrored to Redis).
+    """
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='tutor_index')
+    tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subject_index')
+    points_spent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('subject', 'tutor')
+        indexes = [
+            models.Index(fields=['subject', '-points_spent'], name='subject_tutor_points_idx'),
+            models.Index(fields=['tutor', 'subject'], name='tutor_subject_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject_id} -> tutor {self.tutor_id} ({self.points_spent} pts)"
+
+
+class JobAlertDigestItem(models.Model):
+    """A new-job alert waiting to be sent to a tutor as part of a digest (core.modules.job_alerts)."""
+    tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pending_job_alerts')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    # Whether the tutor ranked within the job's email cap (JOB_EMAIL_POLICY); only those jobs are emailed
+    send_email = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('tutor', 'job')
+
+    def __str__(self):
+        return f"Job {self.job_id} pending for tutor {self.tutor_id}"
+
 class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -505,6 +687,28 @@ class EscrowPayment(models.Model):
 
 from django.conf import settings
 
+class SearchDocument(models.Model):
+    """
+    Denormalized text of a Job, Gig or tutor profile for full-text search.
+    The full-text index over `body` is vendor specific (see core.modules.search).
+    """
+    KIND_CHOICES = [
+        ('job', 'Job'),
+        ('gig', 'Gig'),
+        ('tutor', 'Tutor'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    body = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
 class AbuseReport(models.Model):
     reported_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='abuse_reports')
     # add other fields as needed
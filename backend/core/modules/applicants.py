@@ -0,0 +1,76 @@
+"""
+Job applicants listing (JobViewSet.applicants).
+
+The ranked applicants of a job (tutors who unlocked it and have a gig in one of
+its active subjects, most points spent in those subjects first) are one
+aggregated query, cached per job for APPLICANTS_TTL. A student's unlocked
+contact ids are one query, cached per student. Contact details are masked in
+memory from the two. The caches are dropped after commit when a JobUnlock
+(job list) or ContactUnlock (student's contacts) is written (core.signals).
+"""
+from django.core.cache import cache
+from django.db.models import Sum
+
+from ..models import ContactUnlock, Job, User
+
+APPLICANTS_TTL = 60  # seconds; also bounds how stale points-spent ordering gets
+APPLICANTS_KEY = "job_applicants:{}"
+CONTACTS_KEY = "contact_unlocks:{}"
+
+
+def ranked_applicants(job_id):
+    """[{id, username, email, phone, points_spent}] for the job, best first."""
+    key = APPLICANTS_KEY.format(job_id)
+    applicants = cache.get(key)
+    if applicants is None:
+        job_subject_ids = Job.subjects.through.objects.filter(job_id=job_id).values("subject_id")
+        rows = (
+            User.objects.filter(
+                user_type="tutor",
+                jobs_unlocked__job_id=job_id,
+                subject_index__subject_id__in=job_subject_ids,
+            )
+            .annotate(points_spent=Sum("subject_index__points_spent"))
+            .order_by("-points_spent", "id")
+            .values("id", "username", "email", "phone_number", "points_spent")
+        )
+        applicants = [
+            {
+                "id": row["id"],
+                "username": row["username"],
+                "email": row["email"],
+                "phone": str(row["phone_number"]) if row["phone_number"] else None,
+                "points_spent": row["points_spent"] or 0,
+            }
+            for row in rows
+        ]
+        cache.set(key, applicants, timeout=APPLICANTS_TTL)
+    return applicants
+
+
+def unlocked_contact_ids(user_id):
+    key = CONTACTS_KEY.format(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = set(ContactUnlock.objects.filter(unlocker_id=user_id).values_list("target_id", flat=True))
+        cache.set(key, ids, timeout=APPLICANTS_TTL)
+    return ids
+
+
+def masked_applicants(applicants, viewer):
+    """Students only see the contact details of tutors they unlocked; tutors see everything."""
+    if viewer.user_type != "student":
+        return [dict(applicant) for applicant in applicants]
+    unlocked = unlocked_contact_ids(viewer.id)
+    return [
+        applicant if applicant["id"] in unlocked else {**applicant, "email": None, "phone": None}
+        for applicant in applicants
+    ]
+
+
+def invalidate_job(job_id):
+    cache.delete(APPLICANTS_KEY.format(job_id))
+
+
+def invalidate_contacts(user_id):
+    cache.delete(CONTACTS_KEY.format(user_id))
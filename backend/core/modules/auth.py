@@ -20,7 +20,7 @@ from rest_framework import views
 from ..serializers import (
     RegisterSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer, UserTokenSerializer
 )
-from ..models import Credit
+from . import points
 
 UserModel = get_user_model()
 
@@ -177,7 +177,7 @@ class VerifyOTPView(views.APIView):
             with transaction.atomic():
                 user = serializer.save()
                 print("✅ USER CREATED:", user.id, user.email)
-                Credit.objects.get_or_create(user=user, defaults={"balance": 5})
+                points.open_account(user, 5)
         
             delete_otp(email, purpose)
             return Response({"detail": "Registration complete"}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,150 @@
+"""
+Subject autocomplete served from memory.
+
+Each process loads a SubjectSuggester: every subject's name, its parsed aliases
+and each word of those, lowercased, in one sorted array of (key, subject) pairs.
+A prefix query is a bisect to the first key >= prefix followed by a scan while
+keys still start with it. Matches are ranked by popularity (gigs + jobs in the
+subject), then name.
+
+Subject saves/deletes bump a version key in the shared cache (core.signals), and
+each process reloads when the version it holds is stale, or after RELOAD_AFTER
+seconds so popularity follows new gigs and jobs. Answering a suggestion costs
+one cache read and no queries; while the cache is unreachable processes only
+reload on age.
+
+SubjectViewSet's `?search=` goes through the same index (SubjectAutocompleteFilter),
+so listing and suggesting match subjects the same way.
+"""
+import time
+import uuid
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework.filters import BaseFilterBackend
+
+from ..models import Gig, Job, Subject
+from .search import order_by_ids
+from .subject_index import CACHE_ERRORS
+
+AUTOCOMPLETE_VERSION_KEY = "subject_autocomplete:version"
+RELOAD_AFTER = 10 * 60  # seconds
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def index_keys(name, aliases):
+    """Lowercased lookup keys: the name, each alias, and every word of those."""
+    keys = set()
+    for phrase in [name, *aliases]:
+        phrase = phrase.strip().lower()
+        if phrase:
+            keys.add(phrase)
+            keys.update(phrase.split())
+    return keys
+
+
+class SubjectSuggester:
+    def __init__(self, subjects, popularity):
+        # subjects: {id: {"id", "name", "aliases", "is_active"}}
+        self.subjects = subjects
+        self.rank = {
+            subject_id: (-popularity.get(subject_id, 0), subject["name"].lower(), subject_id)
+            for subject_id, subject in subjects.items()
+        }
+        entries = sorted(
+            (key, subject_id)
+            for subject_id, subject in subjects.items()
+            for key in index_keys(subject["name"], subject["alias_list"])
+        )
+        self.keys = [key for key, _ in entries]
+        self.subject_ids = [subject_id for _, subject_id in entries]
+        self.by_popularity = sorted(subjects, key=self.rank.__getitem__)
+
+    @classmethod
+    def load(cls):
+        subjects = {}
+        for subject in Subject.objects.only("id", "name", "aliases", "is_active"):
+            subjects[subject.id] = {
+                "id": subject.id,
+                "name": subject.name,
+                "aliases": subject.aliases,
+                "is_active": subject.is_active,
+                "alias_list": subject.alias_list(),
+            }
+        popularity = {}
+        counts = [
+            Gig.objects.exclude(subject=None).values("subject_id").annotate(count=Count("id")),
+            Job.subjects.through.objects.values("subject_id").annotate(count=Count("id")),
+        ]
+        for rows in counts:
+            for row in rows:
+                popularity[row["subject_id"]] = popularity.get(row["subject_id"], 0) + row["count"]
+        return cls(subjects, popularity)
+
+    def matching_ids(self, query):
+        """Ids of subjects with a name, alias or word starting with query, most popular first."""
+        prefix = " ".join(query.lower().split())
+        if not prefix:
+            return self.by_popularity
+        matched = set()
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            matched.add(self.subject_ids[i])
+            i += 1
+        return sorted(matched, key=self.rank.__getitem__)
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        return [self.public(self.subjects[subject_id]) for subject_id in self.matching_ids(query)[:limit]]
+
+    @staticmethod
+    def public(subject):
+        return {field: subject[field] for field in ("id", "name", "aliases", "is_active")}
+
+
+_loaded = (None, 0, None)  # (version, loaded at, SubjectSuggester) held by this process
+
+
+def current_version():
+    """The shared version key, or None when the cache cannot be reached."""
+    try:
+        return cache.get_or_set(AUTOCOMPLETE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    except CACHE_ERRORS as e:
+        print(f"Subject autocomplete: cache unavailable, reloading on age only ({e})")
+        return None
+
+
+def get_suggester():
+    global _loaded
+    version = current_version()
+    loaded_version, loaded_at, suggester = _loaded
+    stale = version is not None and loaded_version != version
+    if suggester is None or stale or time.monotonic() - loaded_at > RELOAD_AFTER:
+        suggester = SubjectSuggester.load()
+        _loaded = (version, time.monotonic(), suggester)
+    return suggester
+
+
+def invalidate():
+    """Make every process reload the subjects on its next suggestion."""
+    try:
+        cache.set(AUTOCOMPLETE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    except CACHE_ERRORS as e:
+        # Runs after commit: processes still pick the change up within RELOAD_AFTER
+        print(f"Subject autocomplete: could not bump the version ({e})")
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    return get_suggester().suggest(query, limit)
+
+
+class SubjectAutocompleteFilter(BaseFilterBackend):
+    """`?search=` over subject names, aliases and their words by prefix, most popular first."""
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return order_by_ids(queryset, get_suggester().matching_ids(query))
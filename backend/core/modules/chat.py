@@ -0,0 +1,140 @@
+"""
+Chat message writes and read receipts (core.consumers.ChatConsumer).
+
+A message is stored together with one MessageRead ('sent') per other
+participant: save_messages() writes any number of messages and all of their
+receipts with two bulk INSERTs in one transaction. The consumer passes ids it
+already holds (its user, the conversation's participants), so nothing is read
+back first.
+
+With CHAT_WRITE_BEHIND_MS set, messages are not written one by one: each
+process collects the messages that arrive within that many milliseconds (or
+until MAX_BATCH are waiting) and writes them in one save_messages() call, and
+every sender waits for the batch its message is in. Write throughput is then
+bounded by batch commits rather than per-row round trips, for a few
+milliseconds of added latency. 0 (the default) writes every message at once.
+
+mark_read() only touches the receipts that are not seen yet. It takes the
+highest unread message id as a watermark, marks everything up to it seen in
+one UPDATE, and reports one watermark per sender, so a read costs the same in
+a long conversation as in a new one.
+"""
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Subquery
+from django.utils import timezone
+
+from ..models import ConversationParticipant, Message, MessageRead
+
+MAX_BATCH = 500
+
+
+def write_behind_delay():
+    return getattr(settings, "CHAT_WRITE_BEHIND_MS", 0) / 1000
+
+
+def save_messages(rows):
+    """
+    rows: [(sender_id, conversation_id, content, timestamp, recipient_ids)].
+    Returns the saved Messages in the same order.
+    """
+    messages = [
+        Message(sender_id=sender_id, conversation_id=conversation_id, content=content, timestamp=timestamp)
+        for sender_id, conversation_id, content, timestamp, _ in rows
+    ]
+    with transaction.atomic():
+        if connection.features.can_return_rows_from_bulk_insert:
+            Message.objects.bulk_create(messages)
+        else:  # MySQL does not hand back the new ids
+            for message in messages:
+                message.save(force_insert=True)
+        MessageRead.objects.bulk_create([
+            MessageRead(message=message, user_id=user_id, status="sent")
+            for message, (*_, recipient_ids) in zip(messages, rows)
+            for user_id in recipient_ids
+        ])
+    return messages
+
+
+class WriteBehindBuffer:
+    """Messages waiting to be written by one event loop, flushed together."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.pending = []  # [(row, future)]
+        self.timer = None
+        self.flushing = set()
+
+    async def submit(self, row):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((row, future))
+        if len(self.pending) >= MAX_BATCH:
+            self.start_flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.delay, self.start_flush)
+        return await future
+
+    def start_flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self.flush(batch))
+            self.flushing.add(task)
+            task.add_done_callback(self.flushing.discard)
+
+    async def flush(self, batch):
+        try:
+            messages = await sync_to_async(save_messages)([row for row, _ in batch])
+        except Exception as e:
+            print(f"Chat write-behind: batch of {len(batch)} failed ({e})")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), message in zip(batch, messages):
+            if not future.done():
+                future.set_result(message)
+
+
+_buffers = weakref.WeakKeyDictionary()  # event loop -> WriteBehindBuffer
+
+
+async def save_message(sender_id, conversation_id, content, recipient_ids):
+    """Store one message and its 'sent' receipts, batched with others if write-behind is on."""
+    row = (sender_id, conversation_id, content, timezone.now(), list(recipient_ids))
+    delay = write_behind_delay()
+    if delay <= 0:
+        return (await sync_to_async(save_messages)([row]))[0]
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(loop)
+    if buffer is None or buffer.delay != delay:
+        buffer = _buffers[loop] = WriteBehindBuffer(delay)
+    return await buffer.submit(row)
+
+
+def mark_read(user_id, conversation_id):
+    """
+    Mark the user's unseen receipts in the conversation seen.
+    Returns {sender_id: highest message id of theirs that became seen}.
+    """
+    unread = MessageRead.objects.filter(user_id=user_id, message__conversation_id=conversation_id).exclude(status="seen")
+    watermarks = {
+        row["message__sender_id"]: row["up_to"]
+        for row in unread.values("message__sender_id").annotate(up_to=Max("message_id"))
+    }
+    with transaction.atomic():
+        if watermarks:
+            # Messages that arrive meanwhile stay unread for the next read
+            unread.filter(message_id__lte=max(watermarks.values())).update(status="seen", read_at=timezone.now())
+        latest = Message.objects.filter(conversation_id=conversation_id).order_by("-timestamp", "-id").values("id")[:1]
+        ConversationParticipant.objects.filter(user_id=user_id, conversation_id=conversation_id).update(
+            last_read_message=Subquery(latest)
+        )
+    return watermarks
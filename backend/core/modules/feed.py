@@ -0,0 +1,75 @@
+"""
+Fan-out-on-write tutor job feed (TutorJobFeed).
+
+A tutor's feed holds every job with an active subject that one of the tutor's
+gigs is in (looked up in core.modules.subject_index). Entries are written from Celery tasks (core.tasks)
+when a job's subjects change, and re-synced per tutor when their gigs change or
+a subject is (de)activated, so reading a feed is one indexed range scan on
+(tutor, created_at).
+"""
+from ..models import Gig, Job, TutorJobFeed
+from . import subject_index
+
+BATCH_SIZE = 1000
+
+
+def matching_tutor_ids(job):
+    return subject_index.tutor_ids(job.subjects.filter(is_active=True).values_list("id", flat=True))
+
+
+def matching_jobs(tutor_id):
+    """{job_id: created_at} for the jobs that belong in tutor_id's feed."""
+    subject_ids = subject_index.subject_ids_for_tutor(tutor_id)
+    return dict(
+        Job.objects.filter(subjects__in=subject_ids)
+        .values_list("id", "created_at")
+        .distinct()
+    )
+
+
+def sync_job(job_id):
+    """Make the feed entries of one job match its current subjects."""
+    job = Job.objects.filter(id=job_id).first()
+    if job is None:
+        return
+    wanted = matching_tutor_ids(job)
+    current = set(TutorJobFeed.objects.filter(job_id=job_id).values_list("tutor_id", flat=True))
+
+    TutorJobFeed.objects.filter(job_id=job_id, tutor_id__in=current - wanted).delete()
+    TutorJobFeed.objects.bulk_create(
+        [TutorJobFeed(tutor_id=tutor_id, job_id=job_id, created_at=job.created_at) for tutor_id in wanted - current],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def sync_tutor(tutor_id):
+    """Make one tutor's feed match their current gigs."""
+    wanted = matching_jobs(tutor_id)
+    current = set(TutorJobFeed.objects.filter(tutor_id=tutor_id).values_list("job_id", flat=True))
+
+    TutorJobFeed.objects.filter(tutor_id=tutor_id, job_id__in=current - set(wanted)).delete()
+    TutorJobFeed.objects.bulk_create(
+        [
+            TutorJobFeed(tutor_id=tutor_id, job_id=job_id, created_at=wanted[job_id])
+            for job_id in set(wanted) - current
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def sync_subject(subject_id):
+    """Re-sync the feeds of tutors with gigs in subject_id (after it is (de)activated)."""
+    tutor_ids = Gig.objects.filter(subject_id=subject_id).values_list("tutor_id", flat=True).distinct()
+    for tutor_id in tutor_ids:
+        sync_tutor(tutor_id)
+
+
+def rebuild():
+    """Recompute every feed from scratch. Returns the number of entries written."""
+    TutorJobFeed.objects.all().delete()
+    tutor_ids = Gig.objects.filter(tutor__user_type="tutor").values_list("tutor_id", flat=True).distinct()
+    for tutor_id in tutor_ids:
+        sync_tutor(tutor_id)
+    return TutorJobFeed.objects.count()
@@ -0,0 +1,65 @@
+import re
+from geopy.exc import GeopyError
+from geopy.geocoders import Nominatim
+
+from ..models import GeocodeCache
+
+GEOCODER_USER_AGENT = "tutormove"
+GEOCODER_TIMEOUT = 5  # seconds
+
+# Returned by lookup_cached() when the location has never been geocoded
+NOT_CACHED = object()
+
+
+def normalize_location(text):
+    """
+    Canonical cache key for a free-text location:
+    lower-case, single spaces, ", " between parts.
+    """
+    if not text:
+        return ""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    text = re.sub(r"\s*,\s*", ", ", text).strip(", ")
+    return text[:255]
+
+
+def lookup_cached(text):
+    """
+    Returns (lat, lon), None for a recorded miss, or NOT_CACHED.
+    Never calls the geocoder.
+    """
+    key = normalize_location(text)
+    if not key:
+        return None
+    entry = GeocodeCache.objects.filter(query=key).first()
+    if entry is None:
+        return NOT_CACHED
+    return entry.coordinates
+
+
+def geocode_location(text):
+    """
+    Resolve a location to (lat, lon) through the shared cache.
+    Only a cache miss reaches Nominatim, and its answer (hit or miss) is stored.
+    Geocoder outages return None without caching so the lookup is retried later.
+    """
+    cached = lookup_cached(text)
+    if cached is not NOT_CACHED:
+        return cached
+
+    try:
+        geolocator = Nominatim(user_agent=GEOCODER_USER_AGENT, timeout=GEOCODER_TIMEOUT)
+        loc = geolocator.geocode(text)
+    except GeopyError as e:
+        print(f"Geocoding failed for '{text}': {e}")
+        return None
+
+    coords = (loc.latitude, loc.longitude) if loc else None
+    GeocodeCache.objects.update_or_create(
+        query=normalize_location(text),
+        defaults={
+            "latitude": coords[0] if coords else None,
+            "longitude": coords[1] if coords else None,
+        },
+    )
+    return coords
@@ -0,0 +1,118 @@
+"""
+Idempotency-Key support for endpoints that spend points or start payments.
+
+A client that may retry sends the same `Idempotency-Key` header with every
+attempt. The first attempt runs the view and its response (anything below
+500) is stored in the cache for IDEMPOTENCY_KEY_TTL, keyed by user, view and
+key. Later attempts get that response replayed, with an
+`Idempotent-Replayed: true` header, and do not run the view again.
+
+Attempts that arrive while the first one is still running wait on a short
+cache lock for its response, so concurrent duplicates still execute only once.
+Reusing a key with a different request body is rejected with 422.
+Requests without the header are not affected, and neither are anonymous
+requests: keys are scoped per user, and anonymous callers have no user to
+keep their keys apart.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+LOCK_TIMEOUT = 30  # seconds a first attempt may hold the key
+WAIT_TIMEOUT = 10  # seconds a duplicate waits for the first attempt's response
+POLL_INTERVAL = 0.1
+
+
+def key_ttl():
+    return getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+
+
+def fingerprint(request):
+    try:
+        body = json.dumps(request.data, sort_keys=True, default=str)
+    except TypeError:
+        body = repr(request.data)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def replay(stored):
+    response = Response(stored["data"], status=stored["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def wait_for(cache_key, lock_key):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        stored = cache.get(cache_key)
+        if stored is not None or cache.get(lock_key) is None:
+            # Stored, or the first attempt ended without storing a response
+            return stored
+    return None
+
+
+def idempotent(view_method):
+    """Decorator for viewset actions: honour the Idempotency-Key header."""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not (request.user and request.user.is_authenticated):
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = request.user.pk
+        key_hash = hashlib.sha256(key.encode()).hexdigest()
+        cache_key = f"idempotency:{user}:{self.__class__.__name__}.{view_method.__name__}:{key_hash}"
+        lock_key = f"{cache_key}:lock"
+        request_fingerprint = fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is None:
+            if cache.add(lock_key, request_fingerprint, timeout=LOCK_TIMEOUT):
+                # The first attempt may have finished between the read and the lock
+                stored = cache.get(cache_key)
+                if stored is not None:
+                    cache.delete(lock_key)
+            elif cache.get(lock_key) not in (None, request_fingerprint):
+                stored = {"fingerprint": None}  # another request is running under this key
+            else:
+                stored = wait_for(cache_key, lock_key)
+                if stored is None:
+                    return Response(
+                        {"detail": "A request with this Idempotency-Key has not completed yet; retry shortly."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+        if stored is not None:
+            if stored["fingerprint"] != request_fingerprint:
+                return Response(
+                    {"detail": f"This {HEADER} was already used with a different request."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            return replay(stored)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code < 500 and hasattr(response, "data"):
+                cache.set(
+                    cache_key,
+                    {"fingerprint": request_fingerprint, "status": response.status_code, "data": response.data},
+                    timeout=key_ttl(),
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
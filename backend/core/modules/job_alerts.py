@@ -0,0 +1,217 @@
+"""
+New-job alerts: in-app notifications and emails to tutors whose gigs match a job.
+
+Runs in a Celery task queued when the job is committed (JobViewSet.perform_create),
+so posting a job costs the same however many tutors match. Matching tutors come
+ranked from the subject index (most points spent first) and are loaded in
+chunks, skipping tutors who turned job_notifications off.
+
+With settings.JOB_ALERT_DIGEST_WINDOW > 0 (the default) each alert is only
+buffered as a JobAlertDigestItem; a flush task scheduled once per window turns
+everything buffered for a tutor into one notification and one email. With 0,
+each chunk is written straight away as notifications plus staggered emails.
+Either way only the tutors ranked within JOB_EMAIL_POLICY's batches are
+emailed about a job; every matching tutor gets the in-app notification.
+"""
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.html import escape
+
+from ..models import Job, JobAlertDigestItem, Notification, User, UserSettings
+from ..utils import JOB_EMAIL_POLICY, schedule_job_emails
+from . import subject_index
+
+TUTOR_CHUNK_SIZE = 500
+NOTIFICATION_BATCH_SIZE = 500
+DIGEST_EMAIL_BATCH_SIZE = 100
+DIGEST_MAX_LISTED = 5  # jobs named in a digest notification
+DIGEST_SCHEDULED_KEY = "job_alerts:digest_flush_scheduled"
+
+
+def matching_tutors(subject_ids, chunk_size):
+    """
+    Tutors with gigs in subject_ids, most points spent on those gigs first, yielded in
+    chunks: the ranking comes from the subject index, rows are loaded a chunk at a time.
+    """
+    ranked_ids = subject_index.ranked_tutor_ids(subject_ids)
+    for chunk_ids in chunks(ranked_ids, chunk_size):
+        tutors = User.objects.filter(user_type="tutor").only("id", "email", "username").in_bulk(chunk_ids)
+        yield [tutors[tutor_id] for tutor_id in chunk_ids if tutor_id in tutors]
+
+
+def job_email_templates(job, subject_names):
+    """HTML and text templates for send_job_email_batch ($username is filled in per tutor)."""
+    def literal(value):
+        return str(value).replace("$", "$$")
+
+    verify_url = f"{settings.FRONTEND_SITE_URL}/jobs/{job.id}/"
+    html_template = f"""
+    <html><body style="font-family: Arial, sans-serif; padding: 40px;">
+    <h2>New Job Matching Your Gig!</h2>
+    <p>Hi $username,</p>
+    <p>{literal(escape(job.description))}</p>
+    <p>Location: {literal(escape(job.location))}, Budget: {job.budget} USD</p>
+    <p>Subjects: {literal(escape(', '.join(subject_names)))}</p>
+    <a href="{verify_url}">View Job & Apply</a>
+    </body></html>
+    """
+    text_template = f"Hi $username,\nNew job posted: {literal(job.description)}\nView & apply here: {verify_url}"
+    return html_template, text_template
+
+
+def digest_window():
+    return getattr(settings, "JOB_ALERT_DIGEST_WINDOW", 0)
+
+
+def alert_preferences(tutor_ids):
+    """{tutor_id: (job_notifications, email_notifications)}; tutors without UserSettings get the defaults."""
+    prefs = {tutor_id: (True, True) for tutor_id in tutor_ids}
+    rows = UserSettings.objects.filter(user_id__in=tutor_ids).values_list(
+        "user_id", "job_notifications", "email_notifications"
+    )
+    for user_id, job_notifications, email_notifications in rows:
+        prefs[user_id] = (job_notifications, email_notifications)
+    return prefs
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def notify_tutors_of_job(job_id):
+    """Notify and email every tutor with an active gig subject matching the job. Returns tutors notified."""
+    job = Job.objects.filter(id=job_id).select_related("student").first()
+    if job is None:
+        return 0
+    subjects = list(job.subjects.filter(is_active=True).values_list("id", "name"))
+    if not subjects:
+        return 0
+    subject_names = [name for _, name in subjects]
+
+    html_template, text_template = job_email_templates(job, subject_names)
+    message = f"New job posted matching your subjects: {', '.join(subject_names)}"
+
+    digest = digest_window() > 0
+    notified = 0
+    email_rank = 0
+    for chunk in matching_tutors([subject_id for subject_id, _ in subjects], TUTOR_CHUNK_SIZE):
+        prefs = alert_preferences([tutor.id for tutor in chunk])
+        chunk = [tutor for tutor in chunk if prefs[tutor.id][0]]
+        notified += len(chunk)
+        emailable = [tutor for tutor in chunk if tutor.email and prefs[tutor.id][1]]
+
+        if digest:
+            # The same ranked cap as immediate alerts decides whose digest mentions this job by email
+            capped = {
+                tutor.id for rank, tutor in enumerate(emailable, email_rank)
+                if JOB_EMAIL_POLICY.countdown(rank) is not None
+            }
+            email_rank += len(emailable)
+            JobAlertDigestItem.objects.bulk_create(
+                [JobAlertDigestItem(tutor=tutor, job=job, send_email=tutor.id in capped) for tutor in chunk],
+                batch_size=NOTIFICATION_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            continue
+
+        Notification.objects.bulk_create(
+            [Notification(from_user=job.student, to_user=tutor, message=message) for tutor in chunk],
+            batch_size=NOTIFICATION_BATCH_SIZE,
+        )
+        recipients = [{'email': tutor.email, 'username': tutor.username} for tutor in emailable]
+        schedule_job_emails(recipients, html_template, text_template, start=email_rank)
+        email_rank += len(recipients)
+
+    if digest and notified:
+        schedule_digest_flush()
+    return notified
+
+
+# --- Digests ---
+
+DIGEST_HTML_TEMPLATE = """
+<html><body style="font-family: Arial, sans-serif; padding: 40px;">
+<h2>$count New Jobs Matching Your Gigs</h2>
+<p>Hi $username,</p>
+<ul>$jobs_html</ul>
+</body></html>
+"""
+DIGEST_TEXT_TEMPLATE = "Hi $username,\n$count new jobs match your gigs:\n$jobs_text"
+DIGEST_EMAIL_SUBJECT = "New jobs matching your gigs"
+
+
+def schedule_digest_flush():
+    """Queue one flush per window, however many jobs are posted during it."""
+    from ..tasks import flush_job_alert_digests
+    window = digest_window()
+    # The flag outlives a lost task by one window at most
+    if cache.add(DIGEST_SCHEDULED_KEY, True, timeout=window * 2):
+        flush_job_alert_digests.apply_async(countdown=window)
+
+
+def digest_message(jobs):
+    listed = "; ".join(job.description[:60] for job in jobs[:DIGEST_MAX_LISTED])
+    more = len(jobs) - DIGEST_MAX_LISTED
+    suffix = f" and {more} more" if more > 0 else ""
+    if len(jobs) == 1:
+        return f"New job posted matching your subjects: {listed}"
+    return f"{len(jobs)} new jobs posted matching your subjects: {listed}{suffix}"
+
+
+def digest_recipient(tutor, jobs):
+    urls = [f"{settings.FRONTEND_SITE_URL}/jobs/{job.id}/" for job in jobs]
+    return {
+        "email": tutor.email,
+        "username": tutor.username,
+        "count": len(jobs),
+        "jobs_html": "".join(
+            f'<li><a href="{url}">{escape(job.description)}</a> ({escape(job.location)})</li>'
+            for job, url in zip(jobs, urls)
+        ),
+        "jobs_text": "\n".join(f"- {job.description}: {url}" for job, url in zip(jobs, urls)),
+    }
+
+
+def flush_digests():
+    """
+    Send one notification per tutor for everything buffered, and one email listing the
+    jobs the tutor ranked within the email cap for. Returns tutors notified.
+    """
+    from ..tasks import send_job_email_batch
+    # Cleared first: alerts buffered from here on schedule the next flush
+    cache.delete(DIGEST_SCHEDULED_KEY)
+
+    items = (
+        JobAlertDigestItem.objects
+        .select_related("tutor", "job", "job__student")
+        .order_by("tutor_id", "-job__created_at")
+        .iterator(chunk_size=TUTOR_CHUNK_SIZE)
+    )
+    per_tutor = (list(tutor_items) for _, tutor_items in groupby(items, key=lambda item: item.tutor_id))
+
+    flushed = 0
+    for batch in chunks(per_tutor, TUTOR_CHUNK_SIZE):
+        # Preferences are re-read here in case they changed while the alerts waited
+        prefs = alert_preferences([tutor_items[0].tutor_id for tutor_items in batch])
+        notifications, recipients = [], []
+        for tutor_items in batch:
+            tutor = tutor_items[0].tutor
+            jobs = [item.job for item in tutor_items]
+            job_notifications, email_notifications = prefs[tutor.id]
+            if not job_notifications:
+                continue
+            notifications.append(Notification(from_user=jobs[0].student, to_user=tutor, message=digest_message(jobs)))
+            emailed_jobs = [item.job for item in tutor_items if item.send_email]
+            if tutor.email and email_notifications and emailed_jobs:
+                recipients.append(digest_recipient(tutor, emailed_jobs))
+
+        Notification.objects.bulk_create(notifications, batch_size=NOTIFICATION_BATCH_SIZE)
+        for email_batch in chunks(recipients, DIGEST_EMAIL_BATCH_SIZE):
+            send_job_email_batch.delay(email_batch, DIGEST_HTML_TEMPLATE, DIGEST_TEXT_TEMPLATE, DIGEST_EMAIL_SUBJECT)
+        JobAlertDigestItem.objects.filter(id__in=[item.id for tutor_items in batch for item in tutor_items]).delete()
+        flushed += len(notifications)
+    return flushed
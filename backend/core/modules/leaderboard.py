@@ -0,0 +1,245 @@
+"""
+Per-subject gig leaderboard (GigViewSet.rank / predicted_rank).
+
+Gigs compete with the other gigs in their subject: more used_credits first,
+then the newer gig. With the cache on Redis every subject has a sorted set
+`gig_leaderboard:<subject_id>` (member gig id) whose score packs both keys:
+
+    used_credits * CREDIT_SCALE + created_at (epoch seconds)
+
+so rank is one ZREVRANK and a what-if rank one ZCOUNT above the simulated
+score, both O(log n). Redis scores are doubles, so created_at is kept to whole
+seconds: two gigs with equal credits created in the same second tie in Redis
+(broken by gig id), while the database fallback still orders them by the full
+timestamp.
+
+A subject's set is loaded from the database the first time it is read and
+expires after LEADERBOARD_TTL, so a missed update is corrected by the next
+load at the latest; rebuild_gig_leaderboard drops every set at once. In
+between, gig saves, boosts and deletes update loaded sets after commit
+(core.signals) and bump the subject's version key. A load holds a short lock
+and WATCHes that version key, so an update committed while it was reading
+the database aborts the load instead of being overwritten by stale scores.
+Without Redis (or while a set is being loaded) the same answers come from
+indexed COUNT queries.
+
+boost_curve() answers "how many points for each rank" in one go: the subject's
+scores are kept as one ascending array in the cache (CURVE_KEY, dropped after
+commit whenever a gig in the subject is saved, boosted or deleted), and the
+gigs ahead of a gig are the tail of that array above its score.
+"""
+from bisect import bisect_right
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from ..models import Gig
+from .subject_index import CACHE_ERRORS, RedisError, redis_client
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # redis is only needed with django_redis
+    WatchError = RedisError
+
+REDIS_KEY = "gig_leaderboard:{}"
+VERSION_KEY = "gig_leaderboard:{}:version"
+LOAD_LOCK_KEY = "gig_leaderboard:{}:loading"
+LEADERBOARD_TTL = 60 * 60  # seconds a loaded set is trusted before it is reloaded
+LOAD_LOCK_TIMEOUT = 10  # seconds
+CURVE_KEY = "gig_boost_curve:{}"
+CURVE_TTL = 10 * 60  # seconds; invalidation after commit keeps it current before that
+CREDIT_SCALE = 10 ** 10  # above any epoch-seconds timestamp
+
+
+def score(used_credits, created_at):
+    # Whole seconds: used_credits * CREDIT_SCALE + milliseconds would pass 2**53 and lose precision
+    return used_credits * CREDIT_SCALE + int(created_at.timestamp())
+
+
+def subject_key(subject_id, pattern=REDIS_KEY):
+    return pattern.format(subject_id if subject_id is not None else "none")
+
+
+def subject_gigs(subject_id):
+    return Gig.objects.filter(subject_id=subject_id) if subject_id is not None else Gig.objects.filter(subject=None)
+
+
+def loaded_key(client, subject_id):
+    """
+    The subject's sorted set, loaded from the database if Redis does not have it yet.
+    None when it cannot be loaded right now (another load is running, an update raced
+    this one, or the subject has no gigs): use the database.
+    """
+    key = subject_key(subject_id)
+    if client.exists(key):
+        return key
+    lock_key = subject_key(subject_id, LOAD_LOCK_KEY)
+    if not client.set(lock_key, 1, nx=True, ex=LOAD_LOCK_TIMEOUT):
+        return None
+    try:
+        with client.pipeline() as pipe:
+            # Any sync_gig committed after this point changes the version and aborts the load
+            pipe.watch(subject_key(subject_id, VERSION_KEY))
+            scores = {
+                gig_id: score(used_credits, created_at)
+                for gig_id, used_credits, created_at in subject_gigs(subject_id).values_list("id", "used_credits", "created_at")
+            }
+            if not scores:
+                return None
+            pipe.multi()
+            pipe.zadd(key, scores)
+            pipe.expire(key, LEADERBOARD_TTL)
+            pipe.execute()
+        return key
+    except WatchError:
+        return None
+    finally:
+        client.delete(lock_key)
+
+
+def sync_gig(gig_id, left_subject_ids=()):
+    """Mirror one gig's current score into Redis, dropping it from subjects it has left (or all, once deleted)."""
+    client = redis_client()
+    if client is None:
+        return
+    gig = Gig.objects.filter(id=gig_id).values("subject_id", "used_credits", "created_at").first()
+    subject_ids = set(left_subject_ids) | ({gig["subject_id"]} if gig is not None else set())
+    try:
+        pipe = client.pipeline()
+        for subject_id in subject_ids:
+            version_key = subject_key(subject_id, VERSION_KEY)
+            pipe.incr(version_key)
+            pipe.expire(version_key, LEADERBOARD_TTL)
+        for subject_id in left_subject_ids:
+            pipe.zrem(subject_key(subject_id), gig_id)
+        key = subject_key(gig["subject_id"]) if gig is not None else None
+        # Only sets already loaded are kept current; others load in full on first read
+        update = key is not None and client.exists(key)
+        if update:
+            pipe.zadd(key, {gig_id: score(gig["used_credits"], gig["created_at"])})
+            pipe.ttl(key)
+        results = pipe.execute()
+        if update and results[-1] == -1:
+            # The set expired just before the write, leaving only this gig: let it reload in full
+            client.delete(key)
+    except RedisError as e:
+        print(f"Gig leaderboard: could not update gig {gig_id} ({e})")
+        try:
+            # Drop the sets so they reload; failing that, they expire after LEADERBOARD_TTL
+            client.delete(*[subject_key(subject_id) for subject_id in subject_ids])
+        except RedisError:
+            pass
+
+
+def clear():
+    """Drop every loaded set; each reloads from the database on its next read. Returns sets dropped."""
+    client = redis_client()
+    if client is None:
+        return 0
+    keys = [
+        key for key in client.scan_iter(match=REDIS_KEY.format("*"))
+        if not key.endswith((b":version", b":loading"))
+    ]
+    if keys:
+        client.delete(*keys)
+    return len(keys)
+
+
+def ahead_q(used_credits, created_at):
+    return Q(used_credits__gt=used_credits) | Q(used_credits=used_credits, created_at__gt=created_at)
+
+
+def rank(gig):
+    """(1-based rank of the gig in its subject, number of gigs in the subject)."""
+    client = redis_client()
+    if client is not None:
+        try:
+            key = loaded_key(client, gig.subject_id)
+            if key is not None:
+                pipe = client.pipeline()
+                pipe.zrevrank(key, gig.id)
+                pipe.zcard(key)
+                position, total = pipe.execute()
+                if position is not None:
+                    return position + 1, total
+        except RedisError as e:
+            print(f"Gig leaderboard: Redis lookup failed, using the database ({e})")
+    gigs = subject_gigs(gig.subject_id)
+    return gigs.filter(ahead_q(gig.used_credits, gig.created_at)).count() + 1, gigs.count()
+
+
+def predicted_rank(gig, simulated_used_credits):
+    """(rank the gig would have with simulated_used_credits, number of gigs in the subject)."""
+    client = redis_client()
+    if client is not None:
+        try:
+            key = loaded_key(client, gig.subject_id)
+            if key is not None:
+                pipe = client.pipeline()
+                pipe.zcount(key, f"({score(simulated_used_credits, gig.created_at)}", "+inf")
+                pipe.zcard(key)
+                ahead, total = pipe.execute()
+                return ahead + 1, total
+        except RedisError as e:
+            print(f"Gig leaderboard: Redis lookup failed, using the database ({e})")
+    gigs = subject_gigs(gig.subject_id)
+    ahead = gigs.exclude(id=gig.id).filter(ahead_q(simulated_used_credits, gig.created_at)).count()
+    return ahead + 1, gigs.count()
+
+
+def invalidate_curves(subject_ids):
+    keys = [subject_key(subject_id, CURVE_KEY) for subject_id in subject_ids]
+    try:
+        cache.delete_many(keys)
+    except CACHE_ERRORS as e:
+        # Runs after commit: a missed drop only leaves the curve stale until CURVE_TTL
+        print(f"Gig leaderboard: could not drop cached curves {keys} ({e})")
+
+
+def subject_scores(subject_id):
+    """Every score in the subject, ascending, from the cache, Redis or the database."""
+    cache_key = subject_key(subject_id, CURVE_KEY)
+    try:
+        scores = cache.get(cache_key)
+    except CACHE_ERRORS as e:
+        print(f"Gig leaderboard: cache unavailable, using the database ({e})")
+        scores = None
+    if scores is not None:
+        return scores
+    client = redis_client()
+    if client is not None:
+        try:
+            key = loaded_key(client, subject_id)
+            if key is not None:
+                scores = [int(value) for _, value in client.zrange(key, 0, -1, withscores=True)]
+        except RedisError as e:
+            print(f"Gig leaderboard: Redis lookup failed, using the database ({e})")
+    if scores is None:
+        scores = sorted(
+            score(used_credits, created_at)
+            for used_credits, created_at in subject_gigs(subject_id).values_list("used_credits", "created_at")
+        )
+    try:
+        cache.set(cache_key, scores, timeout=CURVE_TTL)
+    except CACHE_ERRORS:
+        pass
+    return scores
+
+
+def boost_curve(gig):
+    """
+    (rank, total, [(rank, points needed), ...]) for a gig: for every rank above its current one, the
+    fewest extra used_credits that reach it, from the rank just above down to rank 1.
+    """
+    scores = subject_scores(gig.subject_id)
+    own = score(gig.used_credits, gig.created_at)
+    created = int(gig.created_at.timestamp())
+    ahead = scores[bisect_right(scores, own):]
+    curve = []
+    # ahead is ascending, so walking it gives ranks from just above the gig up to 1
+    for position, competitor in enumerate(ahead):
+        credits, competitor_created = divmod(competitor, CREDIT_SCALE)
+        # Equal credits only put the newer gig ahead; an older competitor needs one more
+        needed = credits - gig.used_credits + (1 if competitor_created > created else 0)
+        curve.append((len(ahead) - position, needed))
+    return len(ahead) + 1, len(scores), curve
@@ -0,0 +1,148 @@
+"""
+Point balance changes and the points ledger.
+
+Credit.balance is the spendable balance. Every spend is one conditional UPDATE:
+
+    UPDATE core_credit SET balance = balance - n WHERE user_id = ? AND balance >= n
+
+The check and the deduction happen in the same statement, so two concurrent
+spends can never both pass a stale balance check, and there is no
+read-then-save window to hold a lock across. Call spend() inside the
+transaction that records what was bought, so that a failure after it rolls
+the points back.
+
+Every change also appends a PointsTransaction (user, delta, reason, ref) in
+the same transaction, so the ledger is the full history. PointsSnapshot keeps
+each user's ledger total up to some transaction id (take_snapshots(), run
+periodically). A ledger balance is then that snapshot plus a sum over the
+transactions after it, and reconcile() checks every user's ledger against
+Credit.balance in a couple of grouped queries.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Credit, PointsSnapshot, PointsTransaction
+
+# Snapshots stop short of the newest transactions: an id handed out to a
+# transaction that has not committed yet must not end up below a snapshot
+SNAPSHOT_LAG = timedelta(minutes=5)
+
+
+def record(user, delta, reason, ref=""):
+    PointsTransaction.objects.create(user=user, delta=delta, reason=reason, ref=ref)
+
+
+def spend(user, amount, reason, ref=""):
+    """Deduct amount points from user if they have them. Returns whether it succeeded."""
+    if amount < 0:
+        raise ValueError("amount must not be negative")
+    with transaction.atomic():
+        updated = Credit.objects.filter(user=user, balance__gte=amount).update(balance=F("balance") - amount)
+        if updated != 1:
+            return False
+        record(user, -amount, reason, ref)
+    return True
+
+
+def grant(user, amount, reason, ref=""):
+    """Add amount points to user, creating their Credit row if needed."""
+    if amount < 0:
+        raise ValueError("amount must not be negative")
+    with transaction.atomic():
+        if not Credit.objects.filter(user=user).update(balance=F("balance") + amount):
+            credit, created = Credit.objects.get_or_create(user=user, defaults={"balance": amount})
+            if not created:
+                Credit.objects.filter(pk=credit.pk).update(balance=F("balance") + amount)
+        record(user, amount, reason, ref)
+
+
+def open_account(user, amount, reason="signup"):
+    """Create the user's Credit row with a starting balance, unless they already have one."""
+    with transaction.atomic():
+        credit, created = Credit.objects.get_or_create(user=user, defaults={"balance": amount})
+        if created and amount:
+            record(user, amount, reason)
+    return credit
+
+
+def set_balance(credit, new_balance, reason="adjustment", ref=""):
+    """Overwrite a balance (admin corrections), recording the difference."""
+    with transaction.atomic():
+        old_balance = Credit.objects.select_for_update().values_list("balance", flat=True).get(pk=credit.pk)
+        Credit.objects.filter(pk=credit.pk).update(balance=new_balance)
+        if new_balance != old_balance:
+            record(credit.user, new_balance - old_balance, reason, ref)
+    credit.balance = new_balance
+
+
+def balance(user):
+    return Credit.objects.filter(user=user).values_list("balance", flat=True).first() or 0
+
+
+# --- Ledger reads ---
+
+def _snapshot(field):
+    return Subquery(PointsSnapshot.objects.filter(user_id=OuterRef("user_id")).values(field)[:1])
+
+
+def ledger_tails(upto=None):
+    """
+    {user_id: (snapshot balance + sum of later deltas, last transaction id)} for users with
+    transactions after their snapshot, in one grouped query.
+    """
+    rows = PointsTransaction.objects.annotate(
+        snapshot_last=Coalesce(_snapshot("last_transaction_id"), Value(0), output_field=IntegerField()),
+        snapshot_balance=Coalesce(_snapshot("balance"), Value(0), output_field=IntegerField()),
+    ).filter(id__gt=F("snapshot_last"))
+    if upto is not None:
+        rows = rows.filter(id__lte=upto)
+    rows = rows.values("user_id", "snapshot_balance").annotate(tail=Sum("delta"), last=Max("id"))
+    return {row["user_id"]: (row["snapshot_balance"] + row["tail"], row["last"]) for row in rows}
+
+
+def ledger_balance(user):
+    """The user's balance per the ledger: their snapshot plus the transactions after it."""
+    snapshot = PointsSnapshot.objects.filter(user=user).values_list("balance", "last_transaction_id").first()
+    snapshot_balance, last_id = snapshot or (0, 0)
+    tail = PointsTransaction.objects.filter(user=user, id__gt=last_id).aggregate(total=Sum("delta"))["total"]
+    return snapshot_balance + (tail or 0)
+
+
+def take_snapshots(batch_size=1000):
+    """Fold every user's new transactions into their snapshot. Returns snapshots written."""
+    settled = PointsTransaction.objects.filter(created_at__lt=timezone.now() - SNAPSHOT_LAG)
+    upto = settled.aggregate(last=Max("id"))["last"]
+    if upto is None:
+        return 0
+    snapshots = [
+        PointsSnapshot(user_id=user_id, balance=total, last_transaction_id=last)
+        for user_id, (total, last) in ledger_tails(upto).items()
+    ]
+    PointsSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["balance", "last_transaction_id", "taken_at"],
+    )
+    return len(snapshots)
+
+
+def reconcile():
+    """Yield (user_id, Credit.balance, ledger balance) for every user where the two differ."""
+    tails = ledger_tails()
+    snapshots = PointsSnapshot.objects.values_list("user_id", "balance")
+    ledger = {user_id: total for user_id, total in snapshots.iterator()}
+    ledger.update({user_id: total for user_id, (total, _) in tails.items()})
+
+    for user_id, credit_balance in Credit.objects.values_list("user_id", "balance").order_by("user_id").iterator():
+        expected = ledger.pop(user_id, 0)
+        if expected != credit_balance:
+            yield user_id, credit_balance, expected
+    for user_id, expected in sorted(ledger.items()):  # ledger entries without a Credit row
+        if expected:
+            yield user_id, None, expected
@@ -0,0 +1,186 @@
+"""
+Unlock pricing engine.
+
+The static pricing tables (UnlockPricingTier, CountryGroup, CountryGroupPoint)
+are loaded once per process into a PricingTable: tiers as arrays searched with
+bisect, countries as a dict. Every save/delete on those tables bumps a version
+key in the shared cache (core.signals), and each process reloads its table when
+the version it holds is no longer current, so a quote costs one cache read and
+no queries for the static tables.
+"""
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from ..models import CountryGroup, CountryGroupPoint, JobUnlock, UnlockPricingTier
+
+PRICING_VERSION_KEY = "pricing:version"
+DEFAULT_POINTS = 100  # no tier / country group configured
+MAX_QUOTE_JOBS = 50
+
+MAX_BID_UNLOCKS = 10
+BID_STEP = 1.1
+DECAY_AFTER = timedelta(hours=36)
+DECAY_BLOCK = timedelta(hours=5)
+DECAY_STEP = 0.95
+FLOOR_RATIO = 0.20
+
+
+class PricingTable:
+    def __init__(self, tiers, country_points):
+        # tiers: (min_rate, max_rate or None, points), sorted by min_rate
+        self.tiers = tiers
+        self.min_rates = [t[0] for t in tiers]
+        # Running max of max_rate: the first tier whose range reaches a rate is
+        # the first index where this reaches it (None = open-ended)
+        self.reach = []
+        reach = float("-inf")
+        for _, max_rate, _ in tiers:
+            reach = max(reach, float("inf") if max_rate is None else max_rate)
+            self.reach.append(reach)
+        self.country_points = country_points
+
+    @classmethod
+    def load(cls):
+        tiers = [
+            (float(t.min_rate), None if t.max_rate is None else float(t.max_rate), t.points)
+            for t in UnlockPricingTier.objects.order_by("min_rate", "id")
+        ]
+        group_points = dict(CountryGroupPoint.objects.values_list("group", "points"))
+        country_points = {
+            name.lower(): group_points[group]
+            for name, group in CountryGroup.objects.values_list("name", "group")
+            if group in group_points
+        }
+        return cls(tiers, country_points)
+
+    def points_for_hourly(self, hourly_rate):
+        """
+        Points of the first tier (by min_rate) whose range contains hourly_rate.
+        Out-of-range rates clamp to the lowest tier, or the highest one above its max_rate.
+        """
+        if not self.tiers:
+            return DEFAULT_POINTS
+        started = bisect_right(self.min_rates, hourly_rate)  # tiers with min_rate <= rate
+        first = bisect_left(self.reach, hourly_rate)          # first tier with max_rate >= rate
+        if first < started:
+            return self.tiers[first][2]
+
+        lowest, highest = self.tiers[0], self.tiers[-1]
+        if highest[1] and hourly_rate > highest[1] and hourly_rate >= lowest[0]:
+            return highest[2]
+        return lowest[2]
+
+    def points_for_country(self, country):
+        return self.country_points.get((country or "").lower(), DEFAULT_POINTS)
+
+
+_loaded = (None, None)  # (version, PricingTable) held by this process
+
+
+def current_version():
+    return cache.get_or_set(PRICING_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_pricing_table():
+    global _loaded
+    version = current_version()
+    loaded_version, table = _loaded
+    if table is None or loaded_version != version:
+        table = PricingTable.load()
+        _loaded = (version, table)
+    return table
+
+
+def invalidate():
+    """Make every process reload the pricing tables on its next quote."""
+    cache.set(PRICING_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def normalize_hourly_rate(job):
+    """
+    Convert any job budget type (Per Hour, Per Day, Per Week, etc.) to hourly.
+    """
+    total_hours = job.total_hours or 1
+    budget = float(job.budget or 0)
+
+    if job.budget_type == "Per Hour":
+        return budget
+    return budget / total_hours
+
+
+def base_points(job, table=None):
+    """Budget → hourly rate → tier points; jobs without a budget are priced by country."""
+    table = table or get_pricing_table()
+    if job.budget and job.total_hours:
+        return table.points_for_hourly(normalize_hourly_rate(job))
+    return table.points_for_country(job.country)
+
+
+def dynamic_price(job, base_price, unlock_count, now=None):
+    """
+    Apply bidding increase & decay decrease.
+    """
+    price = base_price
+
+    # 1. Increment per unlock (10% each, cap at 10)
+    effective_unlocks = min(unlock_count, MAX_BID_UNLOCKS)
+    if effective_unlocks > 0:
+        price = int(price * (BID_STEP ** effective_unlocks))
+
+    # 2. Decay if idle for 36h: -5% per 5h block, compounded in closed form
+    if unlock_count == 0 and job.created_at:
+        idle_time = (now or timezone.now()) - job.created_at
+        if idle_time > DECAY_AFTER:
+            five_hour_blocks = (idle_time - DECAY_AFTER) // DECAY_BLOCK
+            price = int(price * DECAY_STEP ** five_hour_blocks)
+
+    # 3. Floor = 20% of base
+    min_price = int(base_price * FLOOR_RATIO)
+    return max(price, min_price)
+
+
+def unlock_points(job, unlock_count=None):
+    """
+    Full calculation pipeline:
+    1. Use budget → normalize hourly → tier → base points
+    2. If no budget, fallback to country points
+    3. Apply bidding (10% increase per unlock, max 10 unlocks)
+    4. Apply decay (after 36h idle, -5% per 5h, min 20% of base)
+    """
+    if unlock_count is None:
+        unlock_count = getattr(job, "applicants_count", None)
+    if unlock_count is None:
+        unlock_count = job.unlocks.count()
+    return max(dynamic_price(job, base_points(job), unlock_count), 1)
+
+
+def quote_jobs(jobs, tutor):
+    """
+    {job_id: {"unlocked", "points_needed"}} for a list of jobs, priced together:
+    one grouped query for unlock counts and one for the tutor's own unlocks.
+    """
+    job_ids = [job.id for job in jobs]
+    unlock_counts = dict(
+        JobUnlock.objects.filter(job_id__in=job_ids)
+        .values("job_id").annotate(count=Count("id")).values_list("job_id", "count")
+    )
+    unlocked_ids = set(
+        JobUnlock.objects.filter(job_id__in=job_ids, tutor=tutor).values_list("job_id", flat=True)
+    )
+    table = get_pricing_table()
+    now = timezone.now()
+
+    quotes = {}
+    for job in jobs:
+        unlocked = job.id in unlocked_ids
+        points_needed = 0
+        if not unlocked:
+            base = base_points(job, table)
+            points_needed = max(dynamic_price(job, base, unlock_counts.get(job.id, 0), now), 1)
+        quotes[job.id] = {"unlocked": unlocked, "points_needed": points_needed}
+    return quotes
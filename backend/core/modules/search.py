@@ -0,0 +1,148 @@
+"""
+Full-text search over jobs, gigs and tutor profiles.
+
+Every indexed object has one SearchDocument row (kept current by core.signals).
+The backend is picked from the database vendor, or settings.SEARCH_BACKEND:
+  - SQLite: FTS5 table core_searchdocument_fts, ranked with bm25()
+  - MySQL: FULLTEXT index on core_searchdocument.body, ranked by MATCH score
+  - anything else: icontains over SearchDocument, unranked
+"""
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, When
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+
+from ..models import SearchDocument
+
+SEARCH_MAX_RESULTS = 500
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query):
+    return _TOKEN.findall((query or "").lower())
+
+
+# --- Document bodies ---
+
+def job_body(job):
+    subjects = " ".join(subject.name for subject in job.subjects.all())
+    return " ".join(filter(None, [job.description, job.location, subjects]))
+
+
+def gig_body(gig):
+    return " ".join(filter(None, [gig.title, gig.description, gig.subject.name if gig.subject else ""]))
+
+
+def tutor_body(user):
+    return " ".join(filter(None, [user.bio, user.education, user.experience]))
+
+
+def index_document(kind, object_id, body):
+    if not body.strip():
+        remove_document(kind, object_id)
+        return
+    SearchDocument.objects.update_or_create(kind=kind, object_id=object_id, defaults={"body": body})
+
+
+def remove_document(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+# --- Backends ---
+
+class SimpleSearchBackend:
+    """Portable fallback: every term must appear somewhere in the body."""
+
+    def search(self, kind, query, limit=SEARCH_MAX_RESULTS):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        qs = SearchDocument.objects.filter(kind=kind)
+        for term in terms:
+            qs = qs.filter(body__icontains=term)
+        return list(qs.order_by("-updated_at").values_list("object_id", flat=True)[:limit])
+
+
+class SQLiteFTS5Backend:
+    def search(self, kind, query, limit=SEARCH_MAX_RESULTS):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Quoted prefix terms, implicitly AND-ed: "math"* "tutor"*
+        match = " ".join(f'"{term}"*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT d.object_id FROM core_searchdocument_fts f "
+                "JOIN core_searchdocument d ON d.id = f.rowid "
+                "WHERE core_searchdocument_fts MATCH %s AND d.kind = %s "
+                "ORDER BY bm25(core_searchdocument_fts) LIMIT %s",
+                [match, kind, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class MySQLFullTextBackend:
+    def search(self, kind, query, limit=SEARCH_MAX_RESULTS):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " ".join(f"+{term}*" for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT object_id FROM core_searchdocument "
+                "WHERE kind = %s AND MATCH(body) AGAINST (%s IN BOOLEAN MODE) "
+                "ORDER BY MATCH(body) AGAINST (%s IN BOOLEAN MODE) DESC LIMIT %s",
+                [kind, match, match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteFTS5Backend,
+    "mysql": MySQLFullTextBackend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, "SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
+
+
+def search_ids(kind, query, limit=SEARCH_MAX_RESULTS):
+    """Object ids of `kind` matching query, most relevant first."""
+    return get_search_backend().search(kind, query, limit)
+
+
+def capped_search_ids(kind, query):
+    """(up to SEARCH_MAX_RESULTS ids, whether more documents matched than that)."""
+    ids = search_ids(kind, query, SEARCH_MAX_RESULTS + 1)
+    return ids[:SEARCH_MAX_RESULTS], len(ids) > SEARCH_MAX_RESULTS
+
+
+def order_by_ids(queryset, ids):
+    """Restrict queryset to ids and keep their order."""
+    if not ids:
+        return queryset.none()
+    rank = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(rank)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    `?search=` filter backed by the full-text index, ordered by relevance.
+    Views declare which documents to search with `search_kind`. Only the best
+    SEARCH_MAX_RESULTS matches are kept; request.search_truncated records whether
+    any were cut (RankedPagination reports it as `truncated`).
+    """
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        ids, request.search_truncated = capped_search_ids(view.search_kind, query)
+        return order_by_ids(queryset, ids)
@@ -0,0 +1,167 @@
+"""
+Geohash spatial index helpers.
+
+Rows store a geohash next to their latitude/longitude. A radius query is turned
+into the 3x3 block of cells around the centre (sized so the block covers the
+circle), each cell becomes an indexed prefix scan, and only the rows found there
+are checked with the exact haversine distance. That check runs in one
+vectorized NumPy pass over flat id/coordinate arrays; model rows are only
+loaded for the ids that survive.
+"""
+import math
+import numpy as np
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON = 111.320
+
+GEOHASH_PRECISION = 9  # ~5m cells, plenty for stored points
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """
+    Calculate the great-circle distance between two points
+    on the Earth specified by longitude and latitude in decimal degrees.
+    Returns distance in kilometers.
+    """
+    lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def geohash_encode(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision):
+    """(height, width) of a geohash cell in degrees."""
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def precision_for_radius(lat, radius_km):
+    """
+    Longest geohash precision whose cells are at least radius_km tall and wide
+    everywhere inside the circle, so the 3x3 block around the centre covers it.
+    Returns None when even precision-1 cells are too small.
+    """
+    extreme_lat = min(90.0, abs(lat) + radius_km / KM_PER_DEGREE_LAT)
+    lon_scale = KM_PER_DEGREE_LON * math.cos(math.radians(extreme_lat))
+    best = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size_degrees(precision)
+        if height * KM_PER_DEGREE_LAT >= radius_km and width * lon_scale >= radius_km:
+            best = precision
+        else:
+            break
+    return best
+
+
+def covering_cells(lat, lon, radius_km):
+    """Geohash prefixes whose union contains every point within radius_km, or None."""
+    precision = precision_for_radius(lat, radius_km)
+    if precision is None:
+        return None
+    height, width = cell_size_degrees(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        cell_lat = lat + dlat
+        if not -90 <= cell_lat <= 90:
+            continue
+        for dlon in (-width, 0, width):
+            cell_lon = (lon + dlon + 180) % 360 - 180
+            cells.add(geohash_encode(cell_lat, cell_lon, precision))
+    return cells
+
+
+def within_cells_q(cells, field="geohash"):
+    q = Q()
+    for cell in sorted(cells):
+        q |= Q(**{f"{field}__startswith": cell})
+    return q
+
+
+def haversine_expression(lat, lon, lat_field="latitude", lon_field="longitude"):
+    """
+    Database-side great-circle distance in km from (lat, lon), for annotate()/order_by().
+    NULL when the row has no coordinates.
+    """
+    dlat = Radians(F(lat_field) - Value(lat)) / 2
+    dlon = Radians(F(lon_field) - Value(lon)) / 2
+    a = Power(Sin(dlat), 2) + Cos(Value(math.radians(lat))) * Cos(Radians(F(lat_field))) * Power(Sin(dlon), 2)
+    # Least() guards asin against rounding just above 1
+    return ExpressionWrapper(
+        2 * EARTH_RADIUS_KM * ASin(Least(Sqrt(a), Value(1.0))),
+        output_field=FloatField(),
+    )
+
+
+def haversine_many(lat, lon, lats, lons):
+    """Vectorized haversine: km from (lat, lon) to every point in the lats/lons arrays."""
+    lat_r, lon_r = math.radians(lat), math.radians(lon)
+    lats_r, lons_r = np.radians(lats), np.radians(lons)
+    a = np.sin((lats_r - lat_r) / 2) ** 2 + math.cos(lat_r) * np.cos(lats_r) * np.sin((lons_r - lon_r) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(a), 1.0))
+
+
+def nearby_ids(queryset, lat, lon, radius_km):
+    """
+    (ids, distances) of queryset rows within radius_km of (lat, lon), nearest first.
+    Only id/latitude/longitude of the geohash candidates are read from the database.
+    """
+    cells = covering_cells(lat, lon, radius_km)
+    if cells is None:
+        candidates = queryset.filter(latitude__isnull=False, longitude__isnull=False)
+    else:
+        candidates = queryset.filter(within_cells_q(cells))
+
+    rows = np.array(list(candidates.values_list("id", "latitude", "longitude")), dtype=float).reshape(-1, 3)
+    if not len(rows):
+        return [], []
+    distances = haversine_many(lat, lon, rows[:, 1], rows[:, 2])
+    inside = np.flatnonzero(distances <= radius_km)
+    order = inside[np.argsort(distances[inside], kind="stable")]
+    return rows[order, 0].astype(int).tolist(), distances[order].tolist()
+
+
+def fetch_in_order(queryset, ids, distances=None):
+    """Load rows for ids (one IN query) preserving order, optionally setting distance_km."""
+    by_id = queryset.in_bulk(ids)
+    objs = []
+    for i, obj_id in enumerate(ids):
+        obj = by_id.get(obj_id)
+        if obj is None:
+            continue
+        if distances is not None:
+            obj.distance_km = distances[i]
+        objs.append(obj)
+    return objs
+
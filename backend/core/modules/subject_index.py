@@ -0,0 +1,213 @@
+"""
+Inverted index from subject to the tutors teaching it.
+
+SubjectTutorIndex rows are the source of truth: one per (active subject, tutor
+with a gig in it), scored by the points spent on those gigs, and written in the
+same transaction as the Gig/Subject change (core.signals). When the cache is
+Redis, every subject is also mirrored after commit as a sorted set
+`subject_tutors:<subject_id>` (member tutor id, score points spent), and
+lookups become set operations there. Until rebuild_subject_index has loaded
+Redis (or when the cache is not Redis) lookups read the table instead, and a
+Redis update that fails sends them back to the table until the next rebuild.
+
+Gigs point at their Subject by foreign key, so every step is an integer-key lookup.
+"""
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from ..models import Gig, Subject, SubjectTutorIndex
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # redis is only needed with django_redis
+    RedisError = OSError
+
+try:
+    from django_redis.exceptions import ConnectionInterrupted
+except ImportError:
+    ConnectionInterrupted = RedisError
+
+CACHE_ERRORS = (RedisError, ConnectionInterrupted)  # what the cache raises while Redis is down
+
+REDIS_KEY = "subject_tutors:{}"
+READY_KEY = "subject_index:ready"
+
+
+def redis_client():
+    """The django_redis connection behind the default cache, or None."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def loaded_redis():
+    """Redis client if the index has been loaded into it, else None (use the table)."""
+    client = redis_client()
+    if client is None:
+        return None
+    try:
+        return client if client.exists(READY_KEY) else None
+    except RedisError as e:
+        print(f"Subject index: Redis unavailable, using the database ({e})")
+        return None
+
+
+# --- Maintenance ---
+
+def reindex_tutor_subject(tutor_id, subject_id):
+    """Recompute one tutor's entry under one subject (after a gig in it changed)."""
+    if subject_id is None:
+        return
+    subject = Subject.objects.filter(id=subject_id).first()
+    if subject is None:
+        return
+    totals = Gig.objects.filter(
+        tutor_id=tutor_id, tutor__user_type="tutor", subject_id=subject_id
+    ).aggregate(gigs=Count("id"), points=Sum("used_credits"))
+
+    score = None
+    if subject.is_active and totals["gigs"]:
+        score = totals["points"] or 0
+        SubjectTutorIndex.objects.update_or_create(
+            subject=subject, tutor_id=tutor_id, defaults={"points_spent": score}
+        )
+    else:
+        SubjectTutorIndex.objects.filter(subject=subject, tutor_id=tutor_id).delete()
+    transaction.on_commit(lambda: mirror_member(subject_id, tutor_id, score))
+
+
+def reindex_subject(subject):
+    """Rebuild every entry of one subject (after it is (de)activated)."""
+    SubjectTutorIndex.objects.filter(subject=subject).delete()
+    if subject.is_active:
+        rows = (
+            Gig.objects.filter(subject=subject, tutor__user_type="tutor")
+            .values("tutor_id").annotate(points=Sum("used_credits"))
+        )
+        SubjectTutorIndex.objects.bulk_create(
+            [SubjectTutorIndex(subject=subject, tutor_id=row["tutor_id"], points_spent=row["points"] or 0) for row in rows],
+            batch_size=1000,
+        )
+    subject_id = subject.id
+    transaction.on_commit(lambda: mirror_subject(subject_id))
+
+
+def remove_subject(subject_id):
+    transaction.on_commit(lambda: mirror_subject(subject_id))
+
+
+def mirror_member(subject_id, tutor_id, score):
+    client = loaded_redis()
+    if client is None:
+        return
+    key = REDIS_KEY.format(subject_id)
+    try:
+        if score is None:
+            client.zrem(key, tutor_id)
+        else:
+            client.zadd(key, {tutor_id: score})
+    except RedisError as e:
+        mark_not_ready(client, key, e)
+
+
+def mirror_subject(subject_id, client=None):
+    """Replace the subject's sorted set with the table's rows. Returns whether Redis took it."""
+    client = client or loaded_redis()
+    if client is None:
+        return False
+    key = REDIS_KEY.format(subject_id)
+    scores = dict(SubjectTutorIndex.objects.filter(subject_id=subject_id).values_list("tutor_id", "points_spent"))
+    try:
+        pipe = client.pipeline()
+        pipe.delete(key)
+        if scores:
+            pipe.zadd(key, scores)
+        pipe.execute()
+        return True
+    except RedisError as e:
+        mark_not_ready(client, key, e)
+        return False
+
+
+def mark_not_ready(client, key, error):
+    """A set missed an update: send lookups to the table until rebuild_subject_index reloads Redis."""
+    print(f"Subject index: could not update {key}, using the database until rebuilt ({error})")
+    try:
+        client.delete(READY_KEY)
+    except RedisError:
+        pass  # Redis is down, so loaded_redis() already falls back to the table
+
+
+def rebuild():
+    """
+    Recompute the table for every subject and load it into Redis. Returns entries written.
+    If Redis fails part-way it is left marked not ready, so lookups keep using the table.
+    """
+    with transaction.atomic():
+        for subject in Subject.objects.all():
+            reindex_subject(subject)
+    client = redis_client()
+    if client is not None:
+        try:
+            client.delete(READY_KEY)
+            loaded = all([mirror_subject(subject_id, client) for subject_id in Subject.objects.values_list("id", flat=True)])
+            if loaded:
+                client.set(READY_KEY, 1)
+        except RedisError as e:
+            print(f"Subject index: Redis unavailable, lookups use the database ({e})")
+    return SubjectTutorIndex.objects.count()
+
+
+# --- Lookups ---
+
+def ranked_tutor_ids(subject_ids):
+    """Tutor ids indexed under any of subject_ids, most points spent (summed) first."""
+    subject_ids = list(subject_ids)
+    if not subject_ids:
+        return []
+    client = loaded_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            for subject_id in subject_ids:
+                pipe.zrange(REDIS_KEY.format(subject_id), 0, -1, withscores=True)
+            points = {}
+            for members in pipe.execute():
+                for tutor_id, score in members:
+                    points[int(tutor_id)] = points.get(int(tutor_id), 0) + score
+            return sorted(points, key=lambda tutor_id: (-points[tutor_id], tutor_id))
+        except RedisError as e:
+            print(f"Subject index: Redis lookup failed, using the database ({e})")
+    return list(
+        SubjectTutorIndex.objects.filter(subject_id__in=subject_ids)
+        .values("tutor_id").annotate(points=Sum("points_spent"))
+        .order_by("-points", "tutor_id").values_list("tutor_id", flat=True)
+    )
+
+
+def tutor_ids(subject_ids):
+    return set(ranked_tutor_ids(subject_ids))
+
+
+def teaches_any(tutor_id, subject_ids):
+    """Whether the tutor has a gig in any of the (active) subjects."""
+    subject_ids = list(subject_ids)
+    if not subject_ids:
+        return False
+    client = loaded_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            for subject_id in subject_ids:
+                pipe.zscore(REDIS_KEY.format(subject_id), tutor_id)
+            return any(score is not None for score in pipe.execute())
+        except RedisError as e:
+            print(f"Subject index: Redis lookup failed, using the database ({e})")
+    return SubjectTutorIndex.objects.filter(subject_id__in=subject_ids, tutor_id=tutor_id).exists()
+
+
+def subject_ids_for_tutor(tutor_id):
+    """Active subject ids the tutor has gigs in (one indexed query)."""
+    return set(SubjectTutorIndex.objects.filter(tutor_id=tutor_id).values_list("subject_id", flat=True))
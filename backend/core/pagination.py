@@ -0,0 +1,42 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class RankedPagination(PageNumberPagination):
+    """
+    Pages over an already ranked, bounded result list (distance or search relevance).
+    `truncated` is true when full-text search matched more than SEARCH_MAX_RESULTS,
+    in which case `count` is that cap rather than the number of matches.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['truncated'] = getattr(self.request, 'search_truncated', False)
+        return response
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination, newest first. The opaque cursor holds the last created_at
+    seen, so every page is an indexed `created_at < cursor` range scan no matter
+    how deep it is; id breaks ties so the order is stable.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class JobCursorPagination(CreatedAtCursorPagination):
+    max_page_size = 50
+
+
+class NotificationCursorPagination(CreatedAtCursorPagination):
+    max_page_size = 100
+
+
+class UserCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-date_joined', '-id')
+    max_page_size = 50
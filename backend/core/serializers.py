@@ -2,6 +2,8 @@
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import (
@@ -9,6 +11,7 @@ from .models import (
     UserSettings, Review, Subject, EscrowPayment, AbuseReport,
     Order, Payment, JobUnlock,
 )
+from .modules import subject_index
 
 User = get_user_model()
 
@@ -31,7 +34,7 @@ class TeacherProfileSerializer(serializers.ModelSerializer):
         ]
 
     def get_gigs(self, obj):
-        gigs_qs = Gig.objects.filter(teacher=obj)
+        gigs_qs = Gig.objects.filter(tutor=obj).select_related('subject')
         return GigSerializer(gigs_qs, many=True).data
 
     def get_reviews(self, obj):
@@ -69,6 +72,10 @@ class UserSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def get_unlocked(self, obj):
+        # List views pass the viewer's unlocked ids so this is not a query per row
+        unlocked_ids = self.context.get("unlocked_ids")
+        if unlocked_ids is not None:
+            return obj.id in unlocked_ids
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             # Check if the current user unlocked this tutor
@@ -183,20 +190,69 @@ class SubjectSerializer(serializers.ModelSerializer):
 # === GIG SERIALIZER ===
 
 
+class SubjectNameField(serializers.RelatedField):
+    """
+    A Subject read and written by name. Names are canonicalized through
+    Subject.aliases; names not seen before validate to an unsaved, inactive
+    Subject, which the serializer creates when it saves (see GigSerializer),
+    so a request that fails later leaves no subject behind.
+    """
+    default_error_messages = {'blank': 'This field may not be blank.'}
+
+    def get_queryset(self):
+        return Subject.objects.all()
+
+    def to_representation(self, value):
+        return value.name
+
+    def to_internal_value(self, data):
+        name = str(data).strip()
+        if not name:
+            self.fail('blank')
+        name = name[:100]
+        return Subject.objects.canonical(name) or Subject(name=name, is_active=False)
+
+
+class GigListSerializer(serializers.ListSerializer):
+    """
+    Loads the subjects (name and is_active) of every gig on the page in one
+    IN query before serializing, instead of one query per gig. Querysets that
+    already select_related('subject') are left as they are.
+    """
+    def to_representation(self, data):
+        gigs = list(data.all() if hasattr(data, 'all') else data)
+        prefetch_related_objects(gigs, 'subject')
+        return super().to_representation(gigs)
+
+
 class GigSerializer(serializers.ModelSerializer):
+    subject = SubjectNameField()
     subject_active = serializers.SerializerMethodField()
 
     class Meta:
         model = Gig
         fields = '__all__'
         read_only_fields = ['tutor', 'used_credits']
+        list_serializer_class = GigListSerializer
 
     def get_subject_active(self, obj):
-        try:
-            subject = Subject.objects.get(name__iexact=obj.subject)
-            return subject.is_active
-        except Subject.DoesNotExist:
-            return False
+        return bool(obj.subject and obj.subject.is_active)
+
+    def resolve_subject(self, validated_data):
+        subject = validated_data.get('subject')
+        if subject is not None and subject.pk is None:
+            validated_data['subject'] = Subject.objects.resolve(subject.name)
+
+    def create(self, validated_data):
+        # A new subject is written in the same transaction as the gig
+        with transaction.atomic():
+            self.resolve_subject(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.resolve_subject(validated_data)
+            return super().update(instance, validated_data)
 
 # === JOB UNLOCK SERIALIZER ===
 class JobUnlockSerializer(serializers.ModelSerializer):
@@ -280,22 +336,32 @@ class JobSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'student', 'created_at', 'updated_at']
 
     def get_applicants_count(self, obj):
+        # JobViewSet annotates this; fall back to a count for unannotated instances
+        if hasattr(obj, 'applicants_count'):
+            return obj.applicants_count
         return obj.unlocks.count()
 
-    def get_can_unlock(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
+    def tutor_subject_ids(self):
+        """
+        Active subject ids the requesting tutor has gigs in, or None for non-tutors.
+        Computed once and kept in the (shared) context, so a list costs one query.
+        """
+        if 'tutor_subject_ids' not in self.context:
+            request = self.context.get('request')
+            user = getattr(request, 'user', None)
+            if user is None or not user.is_authenticated or user.user_type != "tutor":
+                subject_ids = None
+            else:
+                subject_ids = subject_index.subject_ids_for_tutor(user.id)
+            self.context['tutor_subject_ids'] = subject_ids
+        return self.context['tutor_subject_ids']
 
-        user = request.user
-        if user.user_type != "tutor":
+    def get_can_unlock(self, obj):
+        subject_ids = self.tutor_subject_ids()
+        if not subject_ids:
             return False
-
-        # Get all subject names from tutor's gigs (string field)
-        gig_subjects = user.gigs.values_list("subject", flat=True)
-
-        # Check if any of the job's subjects match tutor's gig subjects
-        return obj.subjects.filter(name__in=gig_subjects, is_active=True).exists()
+        # Any job subject the tutor teaches (the index only holds active subjects)
+        return any(subject.id in subject_ids for subject in obj.subjects.all())
 
     def get_subject_details(self, obj):
         return [subject.name for subject in obj.subjects.all()]
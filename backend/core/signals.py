@@ -0,0 +1,254 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    User, Job, Gig, Subject, UnlockPricingTier, CountryGroup, CountryGroupPoint, JobUnlock, ContactUnlock,
+)
+from .modules import applicants, autocomplete, leaderboard, pricing, search, subject_index
+from .modules.geocoding import NOT_CACHED, lookup_cached, normalize_location
+from .modules.spatial import geohash_encode
+
+
+# --- Location → coordinates + geohash (User, Job) ---
+
+def remember_geocode_query(sender, instance, **kwargs):
+    # Only read already-loaded values so deferred fields are not fetched here
+    if all(f in instance.__dict__ for f in sender.GEOCODE_FIELDS):
+        instance._loaded_geocode_query = instance.geocode_query()
+    else:
+        instance._loaded_geocode_query = None
+
+
+def geocode_on_location_change(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(sender.GEOCODE_FIELDS) & set(update_fields):
+        return
+    query = instance.geocode_query()
+    if created:
+        if not query:
+            return
+    elif normalize_location(query) == normalize_location(instance._loaded_geocode_query):
+        return
+    instance._loaded_geocode_query = query
+
+    coords = lookup_cached(query) if query else None
+    if coords is NOT_CACHED:
+        from .tasks import geocode_coordinates
+        coords = None
+        label = sender._meta.label
+        transaction.on_commit(lambda: geocode_coordinates.delay(label, instance.pk))
+
+    instance.latitude, instance.longitude = coords if coords else (None, None)
+    instance.geohash = geohash_encode(*coords) if coords else ""
+    sender.objects.filter(pk=instance.pk).update(
+        latitude=instance.latitude, longitude=instance.longitude, geohash=instance.geohash
+    )
+
+
+for _model in (User, Job):
+    post_init.connect(remember_geocode_query, sender=_model, dispatch_uid=f"geocode_init_{_model.__name__}")
+    post_save.connect(geocode_on_location_change, sender=_model, dispatch_uid=f"geocode_save_{_model.__name__}")
+
+
+# --- Full-text search documents ---
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_document("job", instance.pk, search.job_body(instance))
+
+
+@receiver(m2m_changed, sender=Job.subjects.through)
+def index_job_subjects(sender, instance, action, reverse, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        search.index_document("job", instance.pk, search.job_body(instance))
+
+
+@receiver(post_save, sender=Gig)
+def index_gig(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_document("gig", instance.pk, search.gig_body(instance))
+
+
+@receiver(post_save, sender=User)
+def index_tutor(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"bio", "education", "experience", "user_type"} & set(update_fields):
+        return
+    if instance.user_type == "tutor":
+        search.index_document("tutor", instance.pk, search.tutor_body(instance))
+    else:
+        search.remove_document("tutor", instance.pk)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    search.remove_document("job", instance.pk)
+
+
+@receiver(post_delete, sender=Gig)
+def unindex_gig(sender, instance, **kwargs):
+    search.remove_document("gig", instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def unindex_tutor(sender, instance, **kwargs):
+    search.remove_document("tutor", instance.pk)
+
+
+# --- Loaded state of Gigs and Subjects, compared by the save handlers below ---
+
+LOADED_FIELDS = {Gig: ("subject_id",), Subject: ("is_active",)}
+
+
+def remember_loaded_state(sender, instance, **kwargs):
+    # Only read already-loaded values so deferred fields are not fetched here
+    instance._loaded_state = {field: instance.__dict__.get(field) for field in LOADED_FIELDS[sender]}
+
+
+for _model in LOADED_FIELDS:
+    post_init.connect(remember_loaded_state, sender=_model, dispatch_uid=f"loaded_state_init_{_model.__name__}")
+
+
+# --- Subject -> tutors inverted index (see core.modules.subject_index) ---
+
+@receiver(post_save, sender=Gig)
+def index_gig_subject(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Always recomputed: used_credits (boosts) changes the tutor's score
+    subject_index.reindex_tutor_subject(instance.tutor_id, instance.subject_id)
+    loaded_subject_id = instance._loaded_state["subject_id"]
+    if loaded_subject_id != instance.subject_id:
+        subject_index.reindex_tutor_subject(instance.tutor_id, loaded_subject_id)
+
+
+@receiver(post_delete, sender=Gig)
+def unindex_gig_subject(sender, instance, **kwargs):
+    subject_index.reindex_tutor_subject(instance.tutor_id, instance.subject_id)
+
+
+@receiver(post_save, sender=Subject)
+def index_subject(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if (created and instance.is_active) or (not created and instance.is_active != instance._loaded_state["is_active"]):
+        subject_index.reindex_subject(instance)
+
+
+@receiver(post_delete, sender=Subject)
+def unindex_subject(sender, instance, **kwargs):
+    subject_index.remove_subject(instance.id)
+
+
+# --- Tutor job feed (fan-out on write, see core.modules.feed) ---
+
+@receiver(m2m_changed, sender=Job.subjects.through)
+def queue_job_feed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    from .tasks import sync_job_feed
+    job_ids = [instance.pk] if not reverse else list(pk_set or ())
+    for job_id in job_ids:
+        transaction.on_commit(lambda job_id=job_id: sync_job_feed.delay(job_id))
+
+
+@receiver(post_save, sender=Gig)
+def queue_gig_feed(sender, instance, created, raw=False, **kwargs):
+    if raw or (not created and instance.subject_id == instance._loaded_state["subject_id"]):
+        return
+    from .tasks import sync_tutor_feed
+    tutor_id = instance.tutor_id
+    transaction.on_commit(lambda: sync_tutor_feed.delay(tutor_id))
+
+
+@receiver(post_delete, sender=Gig)
+def queue_gig_delete_feed(sender, instance, **kwargs):
+    from .tasks import sync_tutor_feed
+    tutor_id = instance.tutor_id
+    transaction.on_commit(lambda: sync_tutor_feed.delay(tutor_id))
+
+
+@receiver(post_save, sender=Subject)
+def queue_subject_feed(sender, instance, created, raw=False, **kwargs):
+    # A new subject has no jobs yet; they arrive through queue_job_feed
+    if raw or created or instance.is_active == instance._loaded_state["is_active"]:
+        return
+    from .tasks import sync_subject_feed
+    subject_id = instance.pk
+    transaction.on_commit(lambda: sync_subject_feed.delay(subject_id))
+
+
+@receiver(pre_delete, sender=Subject)
+def queue_subject_delete_feed(sender, instance, **kwargs):
+    # Read before the delete: it unlinks the gigs (SET_NULL) and drops the job links
+    from .tasks import sync_tutor_feed
+    tutor_ids = list(Gig.objects.filter(subject=instance).values_list("tutor_id", flat=True).distinct())
+    for tutor_id in tutor_ids:
+        transaction.on_commit(lambda tutor_id=tutor_id: sync_tutor_feed.delay(tutor_id))
+
+
+# --- Pricing tables (cached per process, see core.modules.pricing) ---
+
+def invalidate_pricing(sender, **kwargs):
+    transaction.on_commit(pricing.invalidate)
+
+
+for _model in (UnlockPricingTier, CountryGroup, CountryGroupPoint):
+    post_save.connect(invalidate_pricing, sender=_model, dispatch_uid=f"pricing_save_{_model.__name__}")
+    post_delete.connect(invalidate_pricing, sender=_model, dispatch_uid=f"pricing_delete_{_model.__name__}")
+
+
+# --- Subject autocomplete (loaded per process, see core.modules.autocomplete) ---
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_autocomplete(sender, **kwargs):
+    transaction.on_commit(autocomplete.invalidate)
+
+
+# --- Job applicants listing (cached, see core.modules.applicants) ---
+
+@receiver(post_save, sender=JobUnlock)
+@receiver(post_delete, sender=JobUnlock)
+def invalidate_job_applicants(sender, instance, **kwargs):
+    job_id = instance.job_id
+    transaction.on_commit(lambda: applicants.invalidate_job(job_id))
+
+
+@receiver(post_save, sender=ContactUnlock)
+@receiver(post_delete, sender=ContactUnlock)
+def invalidate_contact_unlocks(sender, instance, **kwargs):
+    unlocker_id = instance.unlocker_id
+    transaction.on_commit(lambda: applicants.invalidate_contacts(unlocker_id))
+
+
+# --- Gig leaderboard (Redis sorted sets, see core.modules.leaderboard) ---
+
+@receiver(post_save, sender=Gig)
+def update_gig_leaderboard(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Scores are read back after commit: boosts save used_credits as an F() expression
+    gig_id = instance.pk
+    loaded_subject_id = instance._loaded_state["subject_id"]
+    left = [] if created or loaded_subject_id == instance.subject_id else [loaded_subject_id]
+    subject_ids = [instance.subject_id, *left]
+    transaction.on_commit(lambda: leaderboard.sync_gig(gig_id, left))
+    transaction.on_commit(lambda: leaderboard.invalidate_curves(subject_ids))
+
+
+@receiver(post_delete, sender=Gig)
+def remove_gig_from_leaderboard(sender, instance, **kwargs):
+    gig_id, subject_id = instance.pk, instance.subject_id
+    transaction.on_commit(lambda: leaderboard.sync_gig(gig_id, [subject_id]))
+    transaction.on_commit(lambda: leaderboard.invalidate_curves([subject_id]))
+
+
+# --- Refresh the loaded state once every save handler above has compared against it ---
+
+for _model in LOADED_FIELDS:
+    post_save.connect(remember_loaded_state, sender=_model, dispatch_uid=f"loaded_state_save_{_model.__name__}")
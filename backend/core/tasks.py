@@ -1,5 +1,7 @@
+import smtplib
+from string import Template
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
 from django.utils import timezone
 from core.models import User
@@ -16,6 +18,49 @@ def send_job_email(email, html_content, text_content):
     msg.send()
 
 
+
+JOB_EMAIL_SUBJECT = "New Job Matching Your Gig"
+EMAIL_RETRY_DELAY = 5 * 60  # seconds
+
+
+@shared_task(bind=True, max_retries=3)
+def send_job_email_batch(self, recipients, html_template, text_template, subject=JOB_EMAIL_SUBJECT):
+    """
+    Send one email per recipient ({"email", "username"}) over a single SMTP connection.
+    The templates are string.Template text rendered with each recipient's fields
+    ($username, $email). Recipients whose send fails are retried together later.
+    """
+    html, text = Template(html_template), Template(text_template)
+    connection = get_connection()
+    try:
+        connection.open()
+    except (OSError, smtplib.SMTPException) as exc:
+        raise self.retry(exc=exc, countdown=EMAIL_RETRY_DELAY)
+
+    failed = []
+    try:
+        for recipient in recipients:
+            msg = EmailMultiAlternatives(
+                subject=subject,
+                body=text.safe_substitute(recipient),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[recipient["email"]],
+                connection=connection,
+            )
+            msg.attach_alternative(html.safe_substitute(recipient), "text/html")
+            try:
+                msg.send()
+            except (OSError, smtplib.SMTPException) as e:
+                print(f"Job email to {recipient['email']} failed: {e}")
+                failed.append(recipient)
+    finally:
+        connection.close()
+
+    if failed and self.request.retries < self.max_retries:
+        raise self.retry(args=[failed, html_template, text_template, subject], countdown=EMAIL_RETRY_DELAY)
+    return len(recipients) - len(failed)
+
+
 @shared_task
 def expire_single_user_premium(user_id):
     try:
@@ -26,3 +71,63 @@ def expire_single_user_premium(user_id):
             user.save(update_fields=['is_premium', 'premium_expires'])
     except User.DoesNotExist:
         pass
+
+
+@shared_task
+def geocode_coordinates(model_label, obj_id):
+    """Geocode a User/Job location (see core.signals) and store coordinates + geohash."""
+    from django.apps import apps
+    from core.modules.geocoding import geocode_location
+    from core.modules.spatial import geohash_encode
+
+    model = apps.get_model(model_label)
+    obj = model.objects.filter(id=obj_id).only(*model.GEOCODE_FIELDS).first()
+    if obj is None or not obj.geocode_query():
+        return
+    coords = geocode_location(obj.geocode_query())
+    if coords:
+        # Guard on the source fields so a newer edit is not overwritten with stale coordinates
+        current = {f: getattr(obj, f) for f in model.GEOCODE_FIELDS}
+        model.objects.filter(id=obj_id, **current).update(
+            latitude=coords[0], longitude=coords[1], geohash=geohash_encode(*coords)
+        )
+
+
+@shared_task
+def sync_job_feed(job_id):
+    """Fan a job out to the feeds of tutors with a matching gig (see core.modules.feed)."""
+    from core.modules import feed
+    feed.sync_job(job_id)
+
+
+@shared_task
+def sync_tutor_feed(tutor_id):
+    from core.modules import feed
+    feed.sync_tutor(tutor_id)
+
+
+@shared_task
+def sync_subject_feed(subject_id):
+    from core.modules import feed
+    feed.sync_subject(subject_id)
+
+
+@shared_task
+def notify_tutors_of_new_job(job_id):
+    """Fan a new job out as notifications and emails (see core.modules.job_alerts)."""
+    from core.modules import job_alerts
+    return job_alerts.notify_tutors_of_job(job_id)
+
+
+@shared_task
+def flush_job_alert_digests():
+    """Send the buffered new-job alerts as one digest per tutor (see core.modules.job_alerts)."""
+    from core.modules import job_alerts
+    return job_alerts.flush_digests()
+
+
+@shared_task
+def snapshot_point_balances():
+    """Fold new ledger transactions into the per-user snapshots (see core.modules.points)."""
+    from core.modules import points
+    return points.take_snapshots()
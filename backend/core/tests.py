@@ -1,10 +1,53 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+from importlib import import_module
+import smtplib
+import threading
+import time
+from io import StringIO
+from string import Template
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import Max
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
 from rest_framework import status
+from django.apps import apps as django_apps
 from django.contrib.auth import get_user_model
-from .models import Gig, Credit, Job, Application, Message
+from django.contrib.auth.models import AnonymousUser
+from .models import ContactUnlock, Conversation, ConversationParticipant, Gig, Credit, Job, JobAlertDigestItem, SubjectTutorIndex, JobUnlock, Notification, UserSettings, UnlockPricingTier, CountryGroup, CountryGroupPoint, Application, Message, MessageRead, GeocodeCache, SearchDocument, Subject, TutorJobFeed, PointsSnapshot, PointsTransaction
+from .modules import autocomplete, chat, idempotency, job_alerts, leaderboard, points, pricing, search, subject_index
+from .serializers import GigSerializer, TeacherProfileSerializer
+from .consumers import ChatConsumer
+from .modules.spatial import covering_cells, geohash_encode, haversine
+from .pagination import JobCursorPagination
+from .tasks import send_job_email_batch
+from .utils import JOB_EMAIL_POLICY, StaggeredBatchPolicy
 from django.utils import timezone
+from datetime import timedelta
+
+
+def drop_redis_keys(*patterns):
+    """Delete keys earlier tests left in the Redis behind the cache; nothing to do without Redis."""
+    client = subject_index.redis_client()
+    if client is None:
+        return
+    try:
+        for pattern in patterns:
+            keys = list(client.scan_iter(match=pattern))
+            if keys:
+                client.delete(*keys)
+    except subject_index.RedisError:
+        pass
 
 class UserTests(APITestCase):
     def setUp(self):
@@ -134,3 +177,1017 @@ class MessageTests(APITestCase):
         self.assertEqual(message.sender, self.user1)
         self.assertEqual(message.receiver, self.user2)
         self.assertEqual(message.content, 'Hello, this is a test message')
+
+class TutorSearchTests(APITestCase):
+    def setUp(self):
+        GeocodeCache.objects.create(query='dhaka, bangladesh', latitude=23.81, longitude=90.41)
+        GeocodeCache.objects.create(query='chittagong, bangladesh', latitude=22.36, longitude=91.78)
+        self.far = get_user_model().objects.create_user(
+            username='far', password='pass123', user_type='tutor', location='Chittagong, Bangladesh'
+        )
+        self.near = get_user_model().objects.create_user(
+            username='near', password='pass123', user_type='tutor', location='Dhaka,  Bangladesh'
+        )
+
+    def test_coordinates_come_from_cache_on_save(self):
+        self.near.refresh_from_db()
+        self.assertEqual((self.near.latitude, self.near.longitude), (23.81, 90.41))
+
+    @mock.patch('core.modules.geocoding.Nominatim')
+    def test_search_makes_no_geocoder_calls(self, nominatim):
+        response = self.client.post(reverse('tutor-search'), {'location': 'Dhaka, Bangladesh'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['username'] for t in response.data['results']], ['near', 'far'])
+        response = self.client.post(
+            reverse('tutor-search'), {'location': 'Dhaka, Bangladesh', 'radius_km': 50}, format='json'
+        )
+        self.assertEqual([t['username'] for t in response.data['results']], ['near'])
+        nominatim.assert_not_called()
+
+    def test_search_ranks_by_points_in_constant_queries(self):
+        physics = Subject.objects.create(name='Physics')
+        chemistry = Subject.objects.create(name='Chemistry')
+        Gig.objects.create(tutor=self.far, subject=physics, used_credits=5)
+        Gig.objects.create(tutor=self.near, subject=physics, used_credits=1)
+        for i in range(10):
+            tutor = get_user_model().objects.create_user(username=f'extra{i}', password='pass123', user_type='tutor')
+            Gig.objects.create(tutor=tutor, subject=chemistry)
+        # geocode cache, count, page, groups + permissions prefetch
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                reverse('tutor-search'), {'location': 'Dhaka, Bangladesh', 'subject': 'phys'}, format='json'
+            )
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([t['username'] for t in response.data['results']], ['far', 'near'])
+
+class SpatialIndexTests(APITestCase):
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(username='student1', password='pass123')
+        points = {'dhaka': (23.81, 90.41), 'savar': (23.85, 90.26), 'chittagong': (22.36, 91.78)}
+        for name, (lat, lon) in points.items():
+            Job.objects.create(
+                student=self.student, description=name, latitude=lat, longitude=lon,
+                geohash=geohash_encode(lat, lon),
+            )
+
+    def test_geohash_encode(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_covering_cells_contain_circle(self):
+        lat, lon, radius = 23.81, 90.41, 25
+        cells = covering_cells(lat, lon, radius)
+        for bearing_lat, bearing_lon in [(0.22, 0), (-0.22, 0), (0, 0.24), (0, -0.24)]:
+            point = (lat + bearing_lat, lon + bearing_lon)
+            self.assertLessEqual(haversine(lon, lat, point[1], point[0]), radius)
+            self.assertTrue(any(geohash_encode(*point).startswith(c) for c in cells))
+
+    def test_radius_query_sorted_nearest_first(self):
+        response = self.client.get(reverse('job-list'), {'lat': 23.80, 'lng': 90.40, 'radius_km': 30})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([j['description'] for j in response.data['results']], ['dhaka', 'savar'])
+
+class FullTextSearchTests(APITestCase):
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(username='student1', password='pass123')
+        physics = Subject.objects.create(name='Physics')
+        self.physics_job = Job.objects.create(student=self.student, description='Need help before exams', location='Dhaka')
+        self.physics_job.subjects.add(physics)
+        self.math_job = Job.objects.create(
+            student=self.student, description='Mathematics tutor wanted, mathematics and some physics', location='Dhaka',
+        )
+        self.tutor = get_user_model().objects.create_user(
+            username='tutor1', password='pass123', user_type='tutor', bio='Chemistry specialist',
+        )
+        Gig.objects.create(tutor=self.tutor, subject=Subject.objects.resolve('Chemistry'), title='Organic chemistry classes')
+
+    def test_documents_follow_saves(self):
+        self.assertTrue(SearchDocument.objects.filter(kind='job', object_id=self.physics_job.id, body__icontains='physics').exists())
+        self.math_job.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='job', object_id=self.math_job.id).exists())
+
+    def test_job_search_ranked_by_relevance(self):
+        response = self.client.get(reverse('job-list'), {'search': 'mathematics'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([j['id'] for j in response.data['results']], [self.math_job.id])
+
+        # Both match; the short physics job is the stronger hit
+        response = self.client.get(reverse('job-list'), {'search': 'phys'})
+        self.assertEqual([j['id'] for j in response.data['results']], [self.physics_job.id, self.math_job.id])
+
+    def test_job_search_reports_the_result_cap(self):
+        response = self.client.get(reverse('job-list'), {'search': 'dhaka'})
+        self.assertEqual((response.data['count'], response.data['truncated']), (2, False))
+        with mock.patch.object(search, 'SEARCH_MAX_RESULTS', 1):
+            response = self.client.get(reverse('job-list'), {'search': 'dhaka'})
+        self.assertEqual((response.data['count'], response.data['truncated']), (1, True))
+
+    def test_tutor_search_uses_gigs_and_profile(self):
+        response = self.client.get(reverse('user-search'), {'subject': 'organic'})
+        self.assertEqual([u['username'] for u in response.data], ['tutor1'])
+        response = self.client.get(reverse('user-search'), {'subject': 'specialist'})
+        self.assertEqual([u['username'] for u in response.data], ['tutor1'])
+        response = self.client.get(reverse('user-search'), {'subject': 'biology'})
+        self.assertEqual(response.data, [])
+
+class JobListQueryTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        student = User.objects.create_user(username='student1', password='pass123')
+        self.tutor = User.objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        other_tutor = User.objects.create_user(username='tutor2', password='pass123', user_type='tutor')
+        physics = Subject.objects.create(name='Physics', is_active=True)
+        chemistry = Subject.objects.create(name='Chemistry', is_active=True)
+        Gig.objects.create(tutor=self.tutor, subject=physics, title='Physics')
+        for i in range(50):
+            job = Job.objects.create(student=student, description=f'job {i}')
+            job.subjects.add(physics if i % 2 else chemistry)
+            JobUnlock.objects.create(job=job, tutor=other_tutor, points_spent=1)
+
+    def test_job_list_query_count_is_constant(self):
+        self.client.force_authenticate(self.tutor)
+        # jobs (+student, review, unlock count) / subjects prefetch / tutor gig subjects
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('job-list'), {'page_size': 50})
+        self.assertEqual(len(response.data['results']), 50)
+        for job in response.data['results']:
+            self.assertEqual(job['applicants_count'], 1)
+            self.assertEqual(job['can_unlock'], job['subject_details'] == ['Physics'])
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        student = User.objects.create_user(username='student1', password='pass123')
+        self.jobs = [Job.objects.create(student=student, description=f'job {i}') for i in range(7)]
+        # Identical timestamps must still page deterministically
+        Job.objects.filter(id__in=[j.id for j in self.jobs[2:5]]).update(created_at=self.jobs[2].created_at)
+
+    def test_cursor_pages_cover_every_job_once(self):
+        seen = []
+        url, params = reverse('job-list'), {'page_size': 2}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(j['id'] for j in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(len(seen), len(self.jobs))
+        self.assertEqual(set(seen), {j.id for j in self.jobs})
+
+    def test_page_size_is_capped(self):
+        student = self.jobs[0].student
+        Job.objects.bulk_create([Job(student=student, description=f'bulk {i}') for i in range(60)])
+        response = self.client.get(reverse('job-list'), {'page_size': 10000})
+        self.assertEqual(len(response.data['results']), JobCursorPagination.max_page_size)
+
+    def test_my_jobs_first_page_carries_counts(self):
+        student = self.jobs[0].student
+        student.user_type = 'student'
+        student.save()
+        Job.objects.filter(id=self.jobs[0].id).update(status='Completed')
+        Job.objects.filter(id=self.jobs[1].id).update(status='Cancelled')
+        self.client.force_authenticate(student)
+        response = self.client.get(reverse('job-my-jobs'), {'page_size': 2})
+        self.assertEqual(response.data['counts'], {'total': 7, 'active': 5, 'completed': 1})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertNotIn('counts', response.data)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class TutorJobFeedTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.student = User.objects.create_user(username='student1', password='pass123')
+        self.tutor = User.objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        self.physics = Subject.objects.create(name='Physics', is_active=True)
+        self.chemistry = Subject.objects.create(name='Chemistry', is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gig = Gig.objects.create(tutor=self.tutor, subject=self.physics, title='Physics')
+            self.physics_job = self.create_job('physics job', self.physics)
+            self.chemistry_job = self.create_job('chemistry job', self.chemistry)
+
+    def create_job(self, description, subject):
+        job = Job.objects.create(student=self.student, description=description)
+        job.subjects.add(subject)
+        return job
+
+    def feed_job_ids(self):
+        self.client.force_authenticate(self.tutor)
+        response = self.client.get(reverse('job-matched-jobs'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [j['id'] for j in response.data['results']]
+
+    def test_new_job_fans_out_to_matching_tutors(self):
+        self.assertEqual(self.feed_job_ids(), [self.physics_job.id])
+
+    def test_subject_activation_and_gig_edit_update_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chemistry.is_active = True
+            self.chemistry.save()
+        self.assertEqual(self.feed_job_ids(), [self.physics_job.id])  # no chemistry gig yet
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gig.subject = self.chemistry
+            self.gig.save()
+        self.assertEqual(self.feed_job_ids(), [self.chemistry_job.id])
+
+    def test_matched_jobs_query_count(self):
+        self.client.force_authenticate(self.tutor)
+        # feed page / jobs (+student, review, unlock count) / subjects prefetch / tutor gig subjects
+        with self.assertNumQueries(4):
+            self.client.get(reverse('job-matched-jobs'))
+
+    def test_rebuild_command(self):
+        TutorJobFeed.objects.all().delete()
+        call_command('rebuild_job_feed', stdout=StringIO())
+        self.assertEqual(self.feed_job_ids(), [self.physics_job.id])
+
+    def test_migration_backfills_existing_feeds(self):
+        TutorJobFeed.objects.all().delete()
+        backfill = import_module('core.migrations.0052_backfill_tutor_job_feed')
+        backfill.backfill_feeds(django_apps, None)
+        self.assertEqual(self.feed_job_ids(), [self.physics_job.id])
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pricing'}})
+class PricingTableTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            UnlockPricingTier.objects.create(min_rate=0, max_rate=10, points=5)
+            UnlockPricingTier.objects.create(min_rate=10, max_rate=25, points=10)
+            UnlockPricingTier.objects.create(min_rate=20, max_rate=50, points=20)  # overlaps the one before
+            CountryGroupPoint.objects.create(group='G1', points=30)
+            CountryGroup.objects.create(name='Bangladesh', group='G1')
+
+    def test_tier_lookup(self):
+        table = pricing.get_pricing_table()
+        self.assertEqual(table.points_for_hourly(5), 5)
+        self.assertEqual(table.points_for_hourly(10), 5)   # first tier by min_rate wins
+        self.assertEqual(table.points_for_hourly(22), 10)
+        self.assertEqual(table.points_for_hourly(40), 20)
+        self.assertEqual(table.points_for_hourly(99), 20)  # above the top tier
+        self.assertEqual(table.points_for_country('Bangladesh'), 30)
+        self.assertEqual(table.points_for_country('Nowhere'), pricing.DEFAULT_POINTS)
+
+    def test_quote_reads_no_static_tables(self):
+        job = Job(budget=220, total_hours=10, budget_type='Fixed', created_at=timezone.now())
+        pricing.get_pricing_table()
+        with self.assertNumQueries(0):
+            self.assertEqual(pricing.unlock_points(job, unlock_count=0), 10)
+
+    def test_saving_a_tier_invalidates(self):
+        job = Job(budget=5, total_hours=1, budget_type='Per Hour', created_at=timezone.now())
+        self.assertEqual(pricing.unlock_points(job, unlock_count=0), 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            tier = UnlockPricingTier.objects.get(points=5)
+            tier.points = 7
+            tier.save()
+        self.assertEqual(pricing.unlock_points(job, unlock_count=0), 7)
+
+    def test_decay_is_compounded_and_floored(self):
+        created = timezone.now() - timedelta(hours=36 + 5 * 4)
+        job = Job(created_at=created)
+        self.assertEqual(pricing.dynamic_price(job, 100, 0), int(100 * 0.95 ** 4))
+        job.created_at = timezone.now() - timedelta(days=365)
+        self.assertEqual(pricing.dynamic_price(job, 100, 0), 20)
+
+    def test_decay_rounds_once(self):
+        # Rounding down once, not per block: 100 after 4 blocks was 80, 250 after 10 was 145
+        now = timezone.now()
+        for base, blocks, expected in [(100, 4, 81), (250, 10, 149), (37, 3, 31), (90, 1, 85)]:
+            job = Job(created_at=now - timedelta(hours=36 + 5 * blocks))
+            self.assertEqual(pricing.dynamic_price(job, base, 0, now=now), expected)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'quotes'}})
+class UnlockQuoteTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        student = User.objects.create_user(username='student1', password='pass123')
+        self.tutor = User.objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        other = User.objects.create_user(username='tutor2', password='pass123', user_type='tutor')
+        UnlockPricingTier.objects.create(min_rate=0, max_rate=None, points=10)
+        self.jobs = [
+            Job.objects.create(student=student, description=f'job {i}', budget=100, total_hours=10)
+            for i in range(50)
+        ]
+        JobUnlock.objects.create(job=self.jobs[0], tutor=self.tutor, points_spent=10)
+        JobUnlock.objects.create(job=self.jobs[1], tutor=other, points_spent=10)
+
+    def test_batch_quote(self):
+        self.client.force_authenticate(self.tutor)
+        ids = ','.join(str(job.id) for job in self.jobs)
+        self.client.get(reverse('job-unlock-quotes'), {'ids': ids})  # warm the pricing table
+        # jobs / grouped unlock counts / tutor's unlocks
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('job-unlock-quotes'), {'ids': ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(response.data[self.jobs[0].id], {'unlocked': True, 'points_needed': 0})
+        self.assertEqual(response.data[self.jobs[1].id], {'unlocked': False, 'points_needed': 11})
+        self.assertEqual(response.data[self.jobs[2].id], {'unlocked': False, 'points_needed': 10})
+
+    def test_too_many_ids(self):
+        self.client.force_authenticate(self.tutor)
+        response = self.client.get(reverse('job-unlock-quotes'), {'ids': ','.join(str(i) for i in range(1, 60))})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class JobAlertPipelineTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.student = User.objects.create_user(username='student1', password='pass123', user_type='student')
+        Credit.objects.create(user=self.student, balance=5)
+        self.physics = Subject.objects.create(name='Physics', is_active=True)
+        self.tutors = []
+        for i, credits in enumerate([0, 4, 2]):
+            tutor = User.objects.create_user(
+                username=f'tutor{i}', password='pass123', user_type='tutor', email=f'tutor{i}@example.com',
+            )
+            Gig.objects.create(tutor=tutor, subject=self.physics, title='Physics', used_credits=credits)
+            self.tutors.append(tutor)
+
+    def test_post_defers_fan_out_until_commit(self):
+        self.client.force_authenticate(self.student)
+        with mock.patch('core.views.notify_tutors_of_new_job') as task:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(reverse('job-list'), {
+                    'description': 'Physics help', 'subjects': ['Physics'],
+                }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            task.delay.assert_not_called()
+            for callback in callbacks:
+                callback()
+            task.delay.assert_called_once_with(response.data['id'])
+        self.assertFalse(Notification.objects.exists())
+
+    @override_settings(JOB_ALERT_DIGEST_WINDOW=0)
+    def test_fan_out_streams_tutors_in_chunks(self):
+        job = Job.objects.create(student=self.student, description='Physics help')
+        job.subjects.add(self.physics)
+        with mock.patch.object(job_alerts, 'TUTOR_CHUNK_SIZE', 2), \
+                mock.patch('core.utils.send_job_email_batch.apply_async') as send:
+            self.assertEqual(job_alerts.notify_tutors_of_job(job.id), 3)
+
+        self.assertEqual(Notification.objects.filter(from_user=self.student).count(), 3)
+        # Ranked by points spent; stagger continues across chunk boundaries (1, 2, 3, 4 per batch)
+        scheduled = [
+            ([r['email'] for r in c.kwargs['args'][0]], c.kwargs['countdown']) for c in send.call_args_list
+        ]
+        self.assertEqual(scheduled, [
+            (['tutor1@example.com'], 0), (['tutor2@example.com'], 1200), (['tutor0@example.com'], 1200),
+        ])
+
+    def test_job_email_escapes_job_fields(self):
+        job = Job(id=7, student=self.student, description='<b>Algebra</b> for $5', location='Dhaka & <Gulshan>', budget=5)
+        html, text = job_alerts.job_email_templates(job, ['<Physics>'])
+        html = Template(html).safe_substitute(username='tutor0')
+        self.assertIn('&lt;b&gt;Algebra&lt;/b&gt; for $5', html)
+        self.assertIn('Dhaka &amp; &lt;Gulshan&gt;', html)
+        self.assertIn('&lt;Physics&gt;', html)
+        self.assertIn('<b>Algebra</b> for $5', Template(text).safe_substitute(username='tutor0'))
+
+
+@override_settings(
+    JOB_ALERT_DIGEST_WINDOW=600,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'digests'}},
+)
+class JobAlertDigestTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.student = User.objects.create_user(username='student1', password='pass123')
+        physics = Subject.objects.create(name='Physics', is_active=True)
+        self.tutors = {}
+        for name in ['all', 'no_email', 'muted']:
+            tutor = User.objects.create_user(
+                username=name, password='pass123', user_type='tutor', email=f'{name}@example.com',
+            )
+            Gig.objects.create(tutor=tutor, subject=physics, title='Physics')
+            self.tutors[name] = tutor
+        UserSettings.objects.create(user=self.tutors['no_email'], email_notifications=False)
+        UserSettings.objects.create(user=self.tutors['muted'], job_notifications=False)
+        self.jobs = []
+        for i in range(3):
+            job = Job.objects.create(student=self.student, description=f'job {i}')
+            job.subjects.add(physics)
+            self.jobs.append(job)
+
+    def test_alerts_are_buffered_and_flushed_once_per_tutor(self):
+        with mock.patch('core.tasks.flush_job_alert_digests.apply_async') as schedule:
+            for job in self.jobs:
+                job_alerts.notify_tutors_of_job(job.id)
+        schedule.assert_called_once_with(countdown=600)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(JobAlertDigestItem.objects.count(), 6)  # muted tutor is skipped
+
+        with mock.patch('core.tasks.send_job_email_batch.delay') as send:
+            self.assertEqual(job_alerts.flush_digests(), 2)
+        self.assertFalse(JobAlertDigestItem.objects.exists())
+        self.assertEqual(
+            sorted(Notification.objects.values_list('to_user__username', flat=True)), ['all', 'no_email'],
+        )
+        self.assertTrue(Notification.objects.get(to_user=self.tutors['all']).message.startswith('3 new jobs'))
+
+        (recipients, *_), _ = send.call_args
+        self.assertEqual([r['email'] for r in recipients], ['all@example.com'])
+        self.assertEqual(recipients[0]['count'], 3)
+
+    def test_digest_emails_keep_the_ranked_cap(self):
+        User = get_user_model()
+        physics = Subject.objects.get(name='Physics')
+        for i in range(12):
+            tutor = User.objects.create_user(
+                username=f'extra{i}', password='pass123', user_type='tutor', email=f'extra{i}@example.com',
+            )
+            Gig.objects.create(tutor=tutor, subject=physics, title='Physics')
+        with mock.patch('core.tasks.flush_job_alert_digests.apply_async'):
+            job_alerts.notify_tutors_of_job(self.jobs[0].id)
+        items = JobAlertDigestItem.objects.filter(job=self.jobs[0])
+        self.assertEqual(items.count(), 14)  # every unmuted tutor gets the in-app alert
+        self.assertEqual(items.filter(send_email=True).count(), sum(JOB_EMAIL_POLICY.batch_sizes))
+
+        # Tutors who mute alerts before the flush are neither notified nor counted
+        UserSettings.objects.filter(user=self.tutors['no_email']).update(job_notifications=False)
+        with mock.patch('core.tasks.send_job_email_batch.delay') as send:
+            self.assertEqual(job_alerts.flush_digests(), 13)
+        emailed = [recipient for call in send.call_args_list for recipient in call.args[0]]
+        self.assertEqual(len(emailed), sum(JOB_EMAIL_POLICY.batch_sizes))
+
+    def test_flush_can_be_scheduled_again(self):
+        with mock.patch('core.tasks.flush_job_alert_digests.apply_async') as schedule, \
+                mock.patch('core.tasks.send_job_email_batch.delay'):
+            job_alerts.notify_tutors_of_job(self.jobs[0].id)
+            job_alerts.flush_digests()
+            job_alerts.notify_tutors_of_job(self.jobs[1].id)
+        self.assertEqual(schedule.call_count, 2)
+
+
+class JobEmailBatchTests(TestCase):
+    recipients = [
+        {'email': 'a@example.com', 'username': 'alice'},
+        {'email': 'b@example.com', 'username': 'bob'},
+    ]
+
+    def test_policy_batches(self):
+        policy = StaggeredBatchPolicy([1, 2, 3, 4], 60)
+        self.assertEqual(
+            policy.batches(list(range(12))),
+            [(0, [0]), (60, [1, 2]), (120, [3, 4, 5]), (180, [6, 7, 8, 9])],
+        )
+        self.assertEqual(policy.batches(['x', 'y'], start=2), [(60, ['x']), (120, ['y'])])
+
+    def test_batch_uses_one_connection_and_personalizes(self):
+        with mock.patch('core.tasks.get_connection', wraps=get_connection) as connect:
+            sent = send_job_email_batch.apply(args=[self.recipients, '<p>Hi $username</p>', 'Hi $username, $$5']).get()
+        self.assertEqual(sent, 2)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual([m.to for m in mail.outbox], [['a@example.com'], ['b@example.com']])
+        self.assertEqual(mail.outbox[1].body, 'Hi bob, $5')
+        self.assertEqual(mail.outbox[1].alternatives[0][0], '<p>Hi bob</p>')
+
+    def test_failed_recipients_are_retried(self):
+        original_send = EmailMultiAlternatives.send
+        failures = {'b@example.com': 1}
+
+        def flaky_send(message, *args, **kwargs):
+            if failures.get(message.to[0]):
+                failures[message.to[0]] -= 1
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (450, b'try later')})
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(EmailMultiAlternatives, 'send', flaky_send):
+            send_job_email_batch.apply(args=[self.recipients, '$username', '$username'])
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['a@example.com', 'b@example.com'])
+
+class SubjectIndexTests(TestCase):
+    def setUp(self):
+        # rebuild_subject_index leaves Redis marked ready with sets keyed by reused subject ids
+        redis_keys = (subject_index.READY_KEY, subject_index.REDIS_KEY.format('*'))
+        drop_redis_keys(*redis_keys)
+        self.addCleanup(drop_redis_keys, *redis_keys)
+        User = get_user_model()
+        self.physics = Subject.objects.create(name='Physics', is_active=True)
+        self.chemistry = Subject.objects.create(name='Chemistry', is_active=False)
+        self.alice = User.objects.create_user(username='alice', password='pass123', user_type='tutor')
+        self.bob = User.objects.create_user(username='bob', password='pass123', user_type='tutor')
+        self.gig = Gig.objects.create(tutor=self.alice, subject=self.physics, title='Physics', used_credits=1)
+        Gig.objects.create(tutor=self.bob, subject=self.physics, title='Physics', used_credits=3)
+        Gig.objects.create(tutor=self.bob, subject=self.chemistry, title='Chemistry')
+
+    def test_gigs_are_indexed_by_subject_with_points(self):
+        self.assertEqual(subject_index.ranked_tutor_ids([self.physics.id]), [self.bob.id, self.alice.id])
+        self.gig.used_credits = 5  # boost
+        self.gig.save()
+        self.assertEqual(subject_index.ranked_tutor_ids([self.physics.id]), [self.alice.id, self.bob.id])
+        self.assertTrue(subject_index.teaches_any(self.alice.id, [self.physics.id]))
+
+    def test_subject_changes_move_entries(self):
+        self.assertEqual(subject_index.subject_ids_for_tutor(self.bob.id), {self.physics.id})
+        self.chemistry.is_active = True
+        self.chemistry.save()
+        self.assertEqual(subject_index.subject_ids_for_tutor(self.bob.id), {self.physics.id, self.chemistry.id})
+
+        self.gig.subject = self.chemistry
+        self.gig.save()
+        self.assertEqual(subject_index.ranked_tutor_ids([self.physics.id]), [self.bob.id])
+        self.gig.delete()
+        self.assertFalse(subject_index.teaches_any(self.alice.id, [self.physics.id, self.chemistry.id]))
+
+    def test_rebuild_matches_maintained_index(self):
+        maintained = set(SubjectTutorIndex.objects.values_list('subject_id', 'tutor_id', 'points_spent'))
+        SubjectTutorIndex.objects.all().delete()
+        call_command('rebuild_subject_index', stdout=StringIO())
+        self.assertEqual(set(SubjectTutorIndex.objects.values_list('subject_id', 'tutor_id', 'points_spent')), maintained)
+
+    def test_rebuild_survives_a_redis_outage(self):
+        down = mock.Mock(**{
+            name + '.side_effect': subject_index.RedisError('down')
+            for name in ('delete', 'set', 'exists', 'pipeline')
+        })
+        with mock.patch.object(subject_index, 'redis_client', return_value=down):
+            out = StringIO()
+            call_command('rebuild_subject_index', stdout=out)
+        self.assertIn('in the database', out.getvalue())
+        self.assertEqual(subject_index.ranked_tutor_ids([self.physics.id]), [self.bob.id, self.alice.id])
+
+    def test_failed_mirror_sends_lookups_to_the_table(self):
+        client = mock.Mock(**{'exists.return_value': True, 'zadd.side_effect': subject_index.RedisError('down')})
+        with mock.patch.object(subject_index, 'redis_client', return_value=client):
+            subject_index.mirror_member(self.physics.id, self.alice.id, 5)
+        client.delete.assert_called_once_with(subject_index.READY_KEY)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class GigSubjectTests(APITestCase):
+    def setUp(self):
+        self.maths = Subject.objects.create(name='Mathematics', aliases='Math, Maths', is_active=True)
+        self.tutor = get_user_model().objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        self.client.force_authenticate(self.tutor)
+
+    def test_resolve_canonicalizes_names_and_aliases(self):
+        self.assertEqual(Subject.objects.resolve(' mathematics '), self.maths)
+        self.assertEqual(Subject.objects.resolve('maths'), self.maths)
+        self.assertIsNone(Subject.objects.canonical('Math Olympiad'))
+        created = Subject.objects.resolve('Math Olympiad')
+        self.assertFalse(created.is_active)
+        self.assertEqual(Subject.objects.resolve('math olympiad'), created)
+
+    def test_gig_api_links_subject_by_alias(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('gig-list'), {'subject': 'Math', 'title': 'Calculus'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['subject'], 'Mathematics')
+        self.assertTrue(response.data['subject_active'])
+        self.assertEqual(Gig.objects.get().subject, self.maths)
+        self.assertEqual(subject_index.ranked_tutor_ids([self.maths.id]), [self.tutor.id])
+
+    def test_rejected_gig_leaves_no_new_subject(self):
+        for i in range(5):
+            Gig.objects.create(tutor=self.tutor, subject=self.maths, title=f'gig {i}')
+        Credit.objects.create(user=self.tutor, balance=0)
+        response = self.client.post(reverse('gig-list'), {'subject': 'Astrology', 'title': 'Stars'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('gig-list'), {'subject': 'Astrology', 'title': 'x' * 300}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Subject.objects.filter(name='Astrology').exists())
+
+        Credit.objects.filter(user=self.tutor).update(balance=1)
+        response = self.client.post(reverse('gig-list'), {'subject': 'Astrology', 'title': 'Stars'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Subject.objects.get(name='Astrology').is_active)
+
+    def test_gig_list_reads_subjects_in_one_query(self):
+        for i in range(5):
+            Gig.objects.create(tutor=self.tutor, subject=self.maths, title=f'gig {i}')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('gig-list'))
+        self.assertTrue(all(gig['subject_active'] for gig in response.data))
+
+    def test_gig_listings_stay_flat_at_100_gigs(self):
+        subjects = [Subject.objects.create(name=f'Subject {i}', is_active=i % 2 == 0) for i in range(10)]
+        Gig.objects.bulk_create([
+            Gig(tutor=self.tutor, subject=subjects[i % 10], title=f'gig {i}') for i in range(100)
+        ])
+        # Plain querysets: the gigs, then their subjects in one IN query
+        with self.assertNumQueries(2):
+            data = GigSerializer(Gig.objects.filter(tutor=self.tutor), many=True).data
+        self.assertEqual(len(data), 100)
+        self.assertEqual(sum(gig['subject_active'] for gig in data), 50)
+        with self.assertNumQueries(1):
+            gigs = TeacherProfileSerializer().get_gigs(self.tutor)
+        self.assertEqual(len(gigs), 100)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('gig-list'))
+        self.assertEqual(len(response.data), 100)
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'autocomplete'}},
+    CELERY_TASK_ALWAYS_EAGER=True,
+)
+class SubjectAutocompleteTests(APITestCase):
+    def setUp(self):
+        tutor = get_user_model().objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.maths = Subject.objects.create(name='Mathematics', aliases='Maths, Calculus', is_active=True)
+            self.music = Subject.objects.create(name='Music Theory', is_active=True)
+            self.chemistry = Subject.objects.create(name='Organic Chemistry', aliases='Chem')
+            for _ in range(2):
+                Gig.objects.create(tutor=tutor, subject=self.music)
+
+    def suggest(self, q, **params):
+        response = self.client.get(reverse('subject-suggest'), {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [s['name'] for s in response.data]
+
+    def test_prefixes_of_names_aliases_and_words_ranked_by_popularity(self):
+        self.assertEqual(self.suggest('m'), ['Music Theory', 'Mathematics'])
+        self.assertEqual(self.suggest('calc'), ['Mathematics'])
+        self.assertEqual(self.suggest('CHEM'), ['Organic Chemistry'])
+        self.assertEqual(self.suggest('theory'), ['Music Theory'])
+        self.assertEqual(self.suggest('', limit=1), ['Music Theory'])
+        self.assertEqual(self.suggest('physics'), [])
+
+    def test_answers_from_memory_and_reloads_on_subject_change(self):
+        self.suggest('m')
+        with self.assertNumQueries(0):
+            self.suggest('mat')
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(name='Marine Biology')
+        self.assertEqual(self.suggest('mar'), ['Marine Biology'])
+
+    def test_subject_search_uses_the_index(self):
+        response = self.client.get(reverse('subject-list'), {'search': 'm'})
+        self.assertEqual([s['name'] for s in response.data], ['Music Theory', 'Mathematics'])
+        response = self.client.get(reverse('subject-list'), {'search': 'calc'})
+        self.assertEqual([s['name'] for s in response.data], ['Mathematics'])
+        response = self.client.get(reverse('subject-list'), {'search': 'emistry'})
+        self.assertEqual(response.data, [])
+
+    def test_cache_outage_does_not_fail_subject_writes(self):
+        down = mock.Mock(**{
+            name + '.side_effect': subject_index.RedisError('down') for name in ('get_or_set', 'set')
+        })
+        with mock.patch.object(autocomplete, 'cache', down):
+            with self.captureOnCommitCallbacks(execute=True):
+                Subject.objects.create(name='Marine Biology')
+            self.assertEqual(self.suggest('mat'), ['Mathematics'])
+
+class PointSpendTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        Credit.objects.create(user=self.user, balance=5)
+
+    def test_spend_is_conditional(self):
+        self.assertTrue(points.spend(self.user, 5, 'gig_boost'))
+        self.assertFalse(points.spend(self.user, 1, 'gig_boost'))
+        self.assertEqual(points.balance(self.user), 0)
+        other = get_user_model().objects.create_user(username='nocredit', password='pass123')
+        self.assertFalse(points.spend(other, 1, 'gig_boost'))
+        points.grant(other, 3, 'purchase')
+        self.assertEqual(points.balance(other), 3)
+
+
+class ConcurrentPointSpendTests(TransactionTestCase):
+    """Many threads spending from one balance at once: no overspend, no lost deduction."""
+    THREADS = 8
+    ATTEMPTS = 10  # per thread
+
+    def test_concurrent_spends_keep_balance_invariant(self):
+        user = get_user_model().objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        points.open_account(user, 50)
+        start = threading.Barrier(self.THREADS)
+        results = []
+
+        def worker():
+            spent = 0
+            try:
+                start.wait()
+                for _ in range(self.ATTEMPTS):
+                    for _ in range(50):  # SQLite reports a busy database instead of waiting
+                        try:
+                            with transaction.atomic():
+                                ok = points.spend(user, 3, 'job_unlock')
+                            break
+                        except OperationalError:
+                            time.sleep(0.01)
+                    else:
+                        raise AssertionError("database stayed locked")
+                    spent += 3 if ok else 0
+            finally:
+                connection.close()
+            results.append(spent)
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), self.THREADS)
+        balance = Credit.objects.get(user=user).balance
+        self.assertGreaterEqual(balance, 0)
+        self.assertEqual(sum(results) + balance, 50)
+        self.assertEqual(sum(results), 48)  # 16 spends of 3 fit in 50
+        self.assertEqual(PointsTransaction.objects.filter(user=user, reason='job_unlock').count(), 16)
+        self.assertEqual(list(points.reconcile()), [])
+
+
+class PointsLedgerTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='pass123')
+        self.bob = User.objects.create_user(username='bob', password='pass123')
+        points.open_account(self.alice, 20)
+
+    def test_spends_and_grants_are_recorded(self):
+        self.client.force_authenticate(self.alice)
+        response = self.client.post(reverse('credit-transfer'), {'recipient_id': self.bob.id, 'amount': 7}, format='json')
+        self.assertEqual(response.data['new_balance'], 13)
+        self.assertFalse(points.spend(self.alice, 50, 'job_unlock'))
+        self.assertEqual(
+            list(PointsTransaction.objects.order_by('id').values_list('user__username', 'delta', 'reason', 'ref')),
+            [
+                ('alice', 20, 'signup', ''),
+                ('alice', -7, 'transfer_out', f'user:{self.bob.id}'),
+                ('bob', 7, 'transfer_in', f'user:{self.alice.id}'),
+            ],
+        )
+        self.assertEqual(points.ledger_balance(self.alice), 13)
+        self.assertEqual(list(points.reconcile()), [])
+
+    def test_snapshots_plus_tail_match_balance(self):
+        PointsTransaction.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(points.take_snapshots(), 1)
+        points.spend(self.alice, 5, 'gig_boost')
+        snapshot = PointsSnapshot.objects.get(user=self.alice)
+        self.assertEqual(snapshot.balance, 20)
+        with self.assertNumQueries(2):
+            self.assertEqual(points.ledger_balance(self.alice), 15)
+        self.assertEqual(list(points.reconcile()), [])
+
+    def test_reconcile_reports_drift(self):
+        Credit.objects.filter(user=self.alice).update(balance=99)
+        self.assertEqual(list(points.reconcile()), [(self.alice.id, 99, 20)])
+        with self.assertRaises(CommandError):
+            call_command('reconcile_points', stdout=StringIO())
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'idempotency'}})
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='pass123')
+        self.bob = User.objects.create_user(username='bob', password='pass123')
+        points.open_account(self.alice, 20)
+        self.client.force_authenticate(self.alice)
+
+    def transfer(self, amount, key):
+        return self.client.post(
+            reverse('credit-transfer'), {'recipient_id': self.bob.id, 'amount': amount},
+            format='json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retries_replay_the_first_response(self):
+        first = self.transfer(5, 'retry-1')
+        second = self.transfer(5, 'retry-1')
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(points.balance(self.alice), 15)
+
+        self.assertEqual(self.transfer(6, 'retry-1').status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.transfer(5, 'retry-2')
+        self.assertEqual(points.balance(self.alice), 10)
+
+    def test_duplicate_of_a_running_request_does_not_execute(self):
+        # Another worker holds the key for the same request and has not finished
+        lock_key = f"idempotency:{self.alice.pk}:CreditViewSet.transfer:{hashlib.sha256(b'busy').hexdigest()}:lock"
+        with mock.patch.object(idempotency, 'fingerprint', return_value='same'), \
+                mock.patch.object(idempotency, 'WAIT_TIMEOUT', 0.2):
+            cache.add(lock_key, 'same', 30)
+            response = self.transfer(5, 'busy')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(points.balance(self.alice), 20)
+
+    def test_anonymous_requests_are_never_replayed(self):
+        class Upgrade:
+            calls = 0
+
+            @idempotency.idempotent
+            def upgrade(self, request):
+                Upgrade.calls += 1
+                return Response({'call': Upgrade.calls})
+
+        factory = APIRequestFactory()
+        for _ in range(2):
+            request = Request(factory.post('/', {}, format='json', HTTP_IDEMPOTENCY_KEY='shared'))
+            request.user = AnonymousUser()
+            response = Upgrade().upgrade(request)
+            self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(Upgrade.calls, 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'applicants'}})
+class JobApplicantsTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.student = User.objects.create_user(username='student1', password='pass123')
+        physics = Subject.objects.create(name='Physics', is_active=True)
+        chemistry = Subject.objects.create(name='Chemistry', is_active=True)
+        self.job = Job.objects.create(student=self.student, description='physics and chemistry')
+        self.job.subjects.add(physics, chemistry)
+        self.tutors = []
+        for i, credits in enumerate([1, 5, 3]):
+            tutor = User.objects.create_user(username=f'tutor{i}', password='pass123', user_type='tutor', email=f't{i}@example.com')
+            Gig.objects.create(tutor=tutor, subject=physics, used_credits=credits)
+            Gig.objects.create(tutor=tutor, subject=chemistry, used_credits=credits)
+            JobUnlock.objects.create(job=self.job, tutor=tutor, points_spent=1)
+            self.tutors.append(tutor)
+        self.client.force_authenticate(self.student)
+
+    def get(self):
+        response = self.client.get(reverse('job-applicants', args=[self.job.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_ranked_masked_and_cached(self):
+        # ranked applicants / the student's unlocked contacts
+        with self.assertNumQueries(2):
+            results = self.get()
+        self.assertEqual([a['username'] for a in results], ['tutor1', 'tutor2', 'tutor0'])
+        self.assertEqual([a['points_spent'] for a in results], [10, 6, 2])
+        self.assertTrue(all(a['email'] is None for a in results))
+        with self.assertNumQueries(0):
+            self.get()
+
+    def test_unlocks_invalidate(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactUnlock.objects.create(unlocker=self.student, target=self.tutors[2])
+        self.assertEqual([a['email'] for a in self.get()], [None, 't2@example.com', None])
+
+        late = get_user_model().objects.create_user(username='late', password='pass123', user_type='tutor')
+        Gig.objects.create(tutor=late, subject=Subject.objects.get(name='Physics'), used_credits=50)
+        with self.captureOnCommitCallbacks(execute=True):
+            JobUnlock.objects.create(job=self.job, tutor=late, points_spent=1)
+        self.assertEqual(self.get()[0]['username'], 'late')
+
+    def test_unknown_job(self):
+        response = self.client.get(reverse('job-applicants', args=[self.job.id + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class GigLeaderboardTests(APITestCase):
+    def setUp(self):
+        # Sets are keyed by subject id, which the next test reuses
+        drop_redis_keys(leaderboard.REDIS_KEY.format('*'))
+        self.addCleanup(drop_redis_keys, leaderboard.REDIS_KEY.format('*'))
+        User = get_user_model()
+        self.physics = Subject.objects.create(name='Physics', is_active=True)
+        self.tutor = User.objects.create_user(username='tutor1', password='pass123', user_type='tutor')
+        Credit.objects.create(user=self.tutor, balance=10)
+        self.gig = Gig.objects.create(tutor=self.tutor, subject=self.physics, used_credits=1)
+        for i, credits in enumerate([0, 1, 2, 4]):
+            other = User.objects.create_user(username=f'other{i}', password='pass123', user_type='tutor')
+            gig = Gig.objects.create(tutor=other, subject=self.physics, used_credits=credits)
+            # The other gigs are older, so ties go to self.gig
+            Gig.objects.filter(pk=gig.pk).update(created_at=timezone.now() - timedelta(days=1))
+        Gig.objects.create(tutor=self.tutor, subject=Subject.objects.create(name='Chemistry'), used_credits=9)
+        self.client.force_authenticate(self.tutor)
+
+    def test_rank_and_predicted_rank_from_counts(self):
+        response = self.client.get(reverse('gig-rank', args=[self.gig.id]))
+        self.assertEqual((response.data['rank'], response.data['total']), (3, 5))
+        response = self.client.get(reverse('gig-predicted-rank', args=[self.gig.id]), {'points': 1})
+        self.assertEqual((response.data['predicted_rank'], response.data['total']), (2, 5))
+        response = self.client.get(reverse('gig-predicted-rank', args=[self.gig.id]), {'points': 3})
+        self.assertEqual(response.data['predicted_rank'], 1)
+
+    def test_boost_moves_the_gig_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('gig-boost', args=[self.gig.id]))
+        response = self.client.get(reverse('gig-rank', args=[self.gig.id]))
+        self.assertEqual(response.data['rank'], 2)
+        self.assertEqual(points.balance(self.tutor), 8)
+
+    def test_scores_order_like_credits_then_recency(self):
+        now = timezone.now()
+        self.assertGreater(leaderboard.score(2, now - timedelta(days=365)), leaderboard.score(1, now))
+        self.assertGreater(leaderboard.score(1, now), leaderboard.score(1, now - timedelta(seconds=1)))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'leaderboard-rebuild-tests'}})
+    def test_rebuild_command_without_redis(self):
+        out = StringIO()
+        call_command('rebuild_gig_leaderboard', stdout=out)
+        self.assertIn('not Redis', out.getvalue())
+        self.assertEqual(leaderboard.clear(), 0)
+
+    def test_rebuild_command_reports_unreachable_redis(self):
+        down = mock.Mock(**{'scan_iter.side_effect': subject_index.RedisError('down')})
+        with mock.patch.object(leaderboard, 'redis_client', return_value=down):
+            with self.assertRaisesMessage(CommandError, 'Could not reach Redis'):
+                call_command('rebuild_gig_leaderboard', stdout=StringIO())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'boost-curve-tests'}})
+    def test_boost_curve_matches_predicted_rank(self):
+        url = reverse('gig-boost-curve', args=[self.gig.id])
+        response = self.client.get(url)
+        self.assertEqual((response.data['rank'], response.data['total']), (3, 5))
+        self.assertEqual(response.data['curve'], [{'rank': 2, 'points': 1}, {'rank': 1, 'points': 3}])
+        for entry in response.data['curve']:
+            predicted = self.client.get(reverse('gig-predicted-rank', args=[self.gig.id]), {'points': entry['points']})
+            self.assertEqual(predicted.data['predicted_rank'], entry['rank'])
+            predicted = self.client.get(reverse('gig-predicted-rank', args=[self.gig.id]), {'points': entry['points'] - 1})
+            self.assertGreater(predicted.data['predicted_rank'], entry['rank'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'boost-curve-cache-tests'}})
+    def test_boost_curve_is_cached_until_a_boost(self):
+        url = reverse('gig-boost-curve', args=[self.gig.id])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            leaderboard.subject_scores(self.physics.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('gig-boost', args=[self.gig.id]))
+        response = self.client.get(url)
+        self.assertEqual(response.data['rank'], 2)
+        self.assertEqual(response.data['curve'], [{'rank': 1, 'points': 2}])
+
+    def test_cache_outage_does_not_fail_boosts(self):
+        down = mock.Mock(**{
+            name + '.side_effect': subject_index.RedisError('down')
+            for name in ('get', 'set', 'delete_many')
+        })
+        with mock.patch.object(leaderboard, 'cache', down):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('gig-boost', args=[self.gig.id]))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.get(reverse('gig-boost-curve', args=[self.gig.id]))
+        self.assertEqual(response.data['curve'], [{'rank': 1, 'points': 2}])
+        down.delete_many.assert_called_once()
+
+
+class ChatMessageWriteTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [User.objects.create_user(username=f'user{i}', password='pass123') for i in range(3)]
+        self.conversation = Conversation.objects.create()
+        ConversationParticipant.objects.bulk_create([
+            ConversationParticipant(conversation=self.conversation, user=user) for user in self.users
+        ])
+
+    async def send(self, sender, content):
+        recipients = [user.id for user in self.users if user != sender]
+        return await chat.save_message(sender.id, self.conversation.id, content, recipients)
+
+    def test_message_and_receipts_in_bulk(self):
+        with self.assertNumQueries(4):  # savepoint, message, receipts, release
+            message = async_to_sync(self.send)(self.users[0], 'hello')
+        self.assertEqual(Message.objects.get().content, 'hello')
+        self.assertEqual(
+            sorted(MessageRead.objects.filter(message=message, status='sent').values_list('user_id', flat=True)),
+            [self.users[1].id, self.users[2].id],
+        )
+
+    @override_settings(CHAT_WRITE_BEHIND_MS=20)
+    def test_write_behind_batches_a_burst(self):
+        async def burst():
+            return await asyncio.gather(*(self.send(self.users[i % 3], f'message {i}') for i in range(10)))
+
+        with mock.patch.object(chat, 'save_messages', wraps=chat.save_messages) as save_messages:
+            messages = async_to_sync(burst)()
+        save_messages.assert_called_once()
+        self.assertEqual([message.content for message in messages], [f'message {i}' for i in range(10)])
+        self.assertTrue(all(message.pk for message in messages))
+        self.assertEqual(Message.objects.count(), 10)
+        self.assertEqual(MessageRead.objects.count(), 20)
+
+    def test_consumer_participant_cache_expires(self):
+        consumer = ChatConsumer()
+        consumer.user_id, consumer.participants = self.users[0].id, {}
+        lookup = async_to_sync(consumer.conversation_participant_ids)
+        self.assertEqual(len(lookup(self.conversation.id)), 3)
+        newcomer = get_user_model().objects.create_user(username='newcomer', password='pass123')
+        ConversationParticipant.objects.create(conversation=self.conversation, user=newcomer)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(lookup(self.conversation.id)), 3)
+        with mock.patch('core.consumers.PARTICIPANTS_TTL', -1):
+            self.assertIn(newcomer.id, lookup(self.conversation.id))
+
+    def test_mark_read_reports_one_watermark_per_sender(self):
+        reader, first, second = self.users
+        for sender in [first, second, first] * 40:
+            async_to_sync(self.send)(sender, 'hi')
+        newest = dict(Message.objects.values('sender_id').annotate(up_to=Max('id')).values_list('sender_id', 'up_to'))
+        with self.assertNumQueries(5):  # unread per sender, savepoint, update, last read, release
+            watermarks = chat.mark_read(reader.id, self.conversation.id)
+        self.assertEqual(watermarks, {first.id: newest[first.id], second.id: newest[second.id]})
+        self.assertFalse(MessageRead.objects.filter(user=reader).exclude(status='seen').exists())
+        participant = ConversationParticipant.objects.get(user=reader, conversation=self.conversation)
+        self.assertEqual(participant.last_read_message_id, Message.objects.latest('timestamp', 'id').id)
+
+        # A second read only sees what arrived since
+        self.assertEqual(chat.mark_read(reader.id, self.conversation.id), {})
+        message = async_to_sync(self.send)(second, 'again')
+        self.assertEqual(chat.mark_read(reader.id, self.conversation.id), {second.id: message.id})
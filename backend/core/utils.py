@@ -1,25 +1,50 @@
 from django.utils import timezone
-from core.tasks import send_job_email, expire_single_user_premium
+from core.tasks import send_job_email_batch, expire_single_user_premium
 
 JOB_EMAIL_DELAY = 20 * 60  # 20 minutes in seconds
 BATCHES = [1, 2, 3, 4]     # tutors per batch
 
-def schedule_job_emails(tutor_data):
-    sent_count = 0
-    delay_seconds = 0
-
-    for batch_size in BATCHES:
-        batch = tutor_data[sent_count: sent_count + batch_size]
-        for tutor in batch:
-            send_job_email.apply_async(
-                args=[tutor['email'], tutor['html_content'], tutor['text_content']],
-                countdown=delay_seconds
-            )
-            print(f"Scheduled email to {tutor['email']} in {delay_seconds} seconds")
-        sent_count += batch_size
-        delay_seconds += JOB_EMAIL_DELAY
-        if sent_count >= len(tutor_data):
-            break
+
+class StaggeredBatchPolicy:
+    """
+    Staggered email schedule by rank (0 = first): the first batch_sizes[0]
+    recipients right away, the next batch_sizes[1] `delay` seconds later, and
+    so on. Ranks past the last batch get no email.
+    """
+
+    def __init__(self, batch_sizes, delay):
+        self.batch_sizes = list(batch_sizes)
+        self.delay = delay
+
+    def countdown(self, rank):
+        for i, batch_size in enumerate(self.batch_sizes):
+            if rank < batch_size:
+                return i * self.delay
+            rank -= batch_size
+        return None
+
+    def batches(self, recipients, start=0):
+        """[(countdown, recipients)] for a ranked list whose first item has rank `start`."""
+        groups = {}
+        for rank, recipient in enumerate(recipients, start):
+            countdown = self.countdown(rank)
+            if countdown is None:
+                break
+            groups.setdefault(countdown, []).append(recipient)
+        return list(groups.items())
+
+
+JOB_EMAIL_POLICY = StaggeredBatchPolicy(BATCHES, JOB_EMAIL_DELAY)
+
+
+def schedule_job_emails(recipients, html_template, text_template, start=0, policy=JOB_EMAIL_POLICY):
+    """
+    Queue one send_job_email_batch task per schedule slot instead of one task per tutor.
+    `start` is the rank of recipients[0] when a ranked list is scheduled in chunks.
+    """
+    for delay_seconds, batch in policy.batches(recipients, start):
+        send_job_email_batch.apply_async(args=[batch, html_template, text_template], countdown=delay_seconds)
+        print(f"Scheduled {len(batch)} job emails in {delay_seconds} seconds")
 
 
 def update_trust_score(user):
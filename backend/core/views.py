@@ -5,14 +5,13 @@ import json
 import random
 import time
 from django.db.models import Avg
-from geopy.exc import GeocoderUnavailable, GeocoderTimedOut
-from geopy.geocoders import Nominatim
 from rest_framework.views import APIView
-from django.db.models import Sum, Q
+from django.db.models import Count, Exists, F, OuterRef, Sum, Q
+from django.db.models.functions import Coalesce
 from django.core.mail import send_mail
 from django.utils import timezone
 from datetime import datetime, timedelta
-from rest_framework import viewsets, permissions, status, filters, views, generics
+from rest_framework import viewsets, permissions, status, views, generics
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.views.decorators.csrf import csrf_exempt
@@ -21,14 +20,13 @@ from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from math import radians, cos, sin, asin, sqrt
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from rest_framework.authtoken.models import Token
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from decimal import Decimal, InvalidOperation
@@ -39,11 +37,19 @@ from django.core.files.storage import default_storage
 from core.modules.auth import ( SendOTPView, ResetPasswordView,
     VerifyOTPView, LoginView, CookieTokenObtainPairView, CookieTokenRefreshView,
 )
+from core.modules import autocomplete, leaderboard, points, pricing, subject_index
+from core.modules.applicants import masked_applicants, ranked_applicants
+from core.modules.idempotency import idempotent
+from core.tasks import notify_tutors_of_new_job
+from core.modules.geocoding import geocode_location
+from core.modules.search import FullTextSearchFilter, order_by_ids, search_ids
+from core.modules.spatial import covering_cells, fetch_in_order, haversine_expression, nearby_ids, within_cells_q
+from .pagination import JobCursorPagination, NotificationCursorPagination, RankedPagination, UserCursorPagination
 
 from urllib.parse import urlencode
 from .models import (
-    CountryGroup, CountryGroupPoint, UnlockPricingTier, User, Gig, Credit, Job, Application, Notification, UserSettings, Review, Subject, EscrowPayment,
-    Order, Payment, ContactUnlock, JobUnlock,
+    User, Gig, Credit, Job, Application, Notification, UserSettings, Review, Subject, EscrowPayment,
+    Order, Payment, ContactUnlock, JobUnlock, TutorJobFeed,
 )
 from .serializers import (
     ContactUnlockSerializer, UserSerializer, GigSerializer, CreditSerializer, JobSerializer,
@@ -72,9 +78,18 @@ def generate_transaction_id():
     """Generates a unique transaction ID with a 'TRN-' prefix."""
     return 'TRN-' + str(uuid.uuid4().hex[:20]).upper()
 
+def unlocked_target_ids(user, users):
+    """Ids among `users` whose contact `user` has unlocked, in one query (for UserSerializer.unlocked)."""
+    if not user.is_authenticated or not users:
+        return set()
+    return set(ContactUnlock.objects.filter(
+        unlocker=user, target_id__in=[u.id for u in users]
+    ).values_list("target_id", flat=True))
+
 class TutorViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.filter(user_type='tutor')
+    pagination_class = UserCursorPagination
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -90,63 +105,54 @@ class TutorViewSet(viewsets.ModelViewSet):
     def search(self, request):
         input_location = request.data.get("location", "").strip()
         subject_query = request.data.get("subject", "").strip().lower()
+        try:
+            radius_km = float(request.data.get("radius_km") or 0)
+        except (TypeError, ValueError):
+            radius_km = 0
 
-        geolocator = Nominatim(user_agent="your_app_name")
         input_lat, input_lon = None, None
 
         if input_location:
-            try:
-                loc = geolocator.geocode(input_location)
-                if loc:
-                    input_lat, input_lon = loc.latitude, loc.longitude
-            except (GeocoderUnavailable, GeocoderTimedOut):
-                pass
-
-        # All tutors (no location exclusion!)
-        tutors = User.objects.filter(user_type="tutor")
-        matched_tutors = []
-
-        for tutor in tutors:
-            try:
-                # Check if tutor has relevant subject
-                gigs_qs = Gig.objects.filter(tutor=tutor)
-                if subject_query:
-                    gigs_qs = gigs_qs.filter(subject__icontains=subject_query)
-
-                if subject_query and not gigs_qs.exists():
-                    continue  # Skip tutor if no relevant subject match
-
-                credit_count = getattr(tutor, "credit_count", 0)
-
-                distance_km = None
-                if input_lat is not None and input_lon is not None and tutor.location:
-                    try:
-                        tutor_loc = geolocator.geocode(tutor.location)
-                        if tutor_loc:
-                            tutor_lat, tutor_lon = tutor_loc.latitude, tutor_loc.longitude
-                            distance_km = haversine(input_lon, input_lat, tutor_lon, tutor_lat)
-                    except Exception:
-                        pass  # Location geocode failed, skip distance
-
-                matched_tutors.append((tutor, credit_count, distance_km))
-            except Exception:
-                continue
-
-        # Sort: by points DESC, then distance ASC (None distances go last)
-        matched_tutors.sort(
-            key=lambda x: (-x[1], x[2] if x[2] is not None else float('inf'))
-        )
+            coords = geocode_location(input_location)
+            if coords:
+                input_lat, input_lon = coords
 
-        combined_tutors = [t[0] for t in matched_tutors]
-        serializer = self.get_serializer(combined_tutors, many=True)
-        return Response({
-            "count": len(combined_tutors),
-            "results": serializer.data
+        # One annotated query: subject match, points spent and distance are all computed in SQL
+        tutors = User.objects.filter(user_type="tutor")
+        if subject_query:
+            # Name/alias text is matched once against Subject; gigs are joined on subject_id
+            subject_ids = Subject.objects.filter(
+                Q(name__icontains=subject_query) | Q(aliases__icontains=subject_query)
+            ).values("id")
+            tutors = tutors.filter(Exists(
+                Gig.objects.filter(tutor=OuterRef("pk"), subject_id__in=subject_ids)
+            ))
+        tutors = tutors.annotate(points_spent=Coalesce(Sum("gigs__used_credits"), 0))
+
+        ordering = ["-points_spent", "-trust_score"]
+        if input_lat is not None:
+            # Tutor coordinates are geocoded on profile save, never here
+            tutors = tutors.annotate(distance_km=haversine_expression(input_lat, input_lon))
+            if radius_km > 0:
+                cells = covering_cells(input_lat, input_lon, radius_km)
+                if cells is not None:
+                    tutors = tutors.filter(within_cells_q(cells))
+                tutors = tutors.filter(distance_km__lte=radius_km)
+            ordering.append(F("distance_km").asc(nulls_last=True))
+        tutors = tutors.order_by(*ordering, "id").prefetch_related("groups", "user_permissions")
+
+        paginator = RankedPagination()
+        page = paginator.paginate_queryset(tutors, request, view=self)
+        serializer = self.get_serializer(page, many=True, context={
+            "request": request,
+            "unlocked_ids": unlocked_target_ids(request.user, page),
         })
+        return paginator.get_paginated_response(serializer.data)
 
 class StudentViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.filter(user_type='student')
+    pagination_class = UserCursorPagination
 
     def get_permissions(self):
         # Make list and retrieve public
@@ -165,24 +171,21 @@ class JobCreateAPIView(APIView):
     def post(self, request, *args, **kwargs):
         serializer = JobSerializer(data=request.data)
         if serializer.is_valid():
-            job = serializer.save()
-
-            student_id = request.data.get('student') or job.student.id
-            try:
-                student = User.objects.get(id=student_id)
-            except User.DoesNotExist:
-                return Response({"error": "Student not found"}, status=status.HTTP_400_BAD_REQUEST)
-
-            # 🔻 Deduct 1 credit from student
-            try:
-                credit = Credit.objects.get(user=student)
-                if credit.balance >= 1:
-                    credit.balance -= 1
-                    credit.save()
-                else:
+            # The job only commits together with its point: any failure rolls both back
+            with transaction.atomic():
+                job = serializer.save()
+
+                student_id = request.data.get('student') or job.student.id
+                try:
+                    student = User.objects.get(id=student_id)
+                except User.DoesNotExist:
+                    transaction.set_rollback(True)
+                    return Response({"error": "Student not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+                # 🔻 Deduct 1 credit from student
+                if not points.spend(student, 1, "job_post"):
+                    transaction.set_rollback(True)
                     return Response({"error": "Insufficient points"}, status=status.HTTP_400_BAD_REQUEST)
-            except Credit.DoesNotExist:
-                return Response({"error": "Credit record not found"}, status=status.HTTP_400_BAD_REQUEST)
 
             tutors = User.objects.filter(user_type='tutor')
             notifications = [
@@ -362,7 +365,7 @@ class UserViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             user = serializer.save(user_type=user_type)
             UserSettings.objects.create(user=user)
-            Credit.objects.create(user=user, balance=100)
+            points.open_account(user, 100)
             Notification.objects.create(
                 user=user,
                 message="🎉 Welcome! You have received 100 free points to get started."
@@ -405,27 +408,31 @@ class UserViewSet(viewsets.ModelViewSet):
         requesting_user = request.user
         if requesting_user.user_type != 'student':
             return Response({'error': 'Only students can unlock profiles'}, status=403)
-        credit = Credit.objects.filter(user=requesting_user).first()
-        if not credit or credit.balance < 1:
+        if not points.spend(requesting_user, 1, "profile_unlock", f"user:{user.id}"):
             return Response({'error': 'Insufficient points'}, status=403)
-        credit.balance -= 1
-        credit.save()
         Notification.objects.create(user=requesting_user, message=f"Unlocked profile for user {user.id}")
         serializer = self.get_serializer(user)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='search', url_name='search', permission_classes=[])
     def search(self, request):
+        """
+        Tutors matching ?subject= (gig and profile text, most relevant first) and ?location=.
+        Each full-text lookup keeps its best SEARCH_MAX_RESULTS matches (core.modules.search).
+        """
         subject = request.query_params.get('subject', '')
         location = request.query_params.get('location', '')
-        qs = self.get_queryset().filter(user_type='teacher')
+        qs = self.get_queryset().filter(user_type='tutor')
 
         if subject:
-            qs = qs.filter(Q(gigs__subject__icontains=subject) | Q(gigs__title__icontains=subject))
+            # Relevance-ranked: matching gigs first, then matching profiles (bio/education/experience)
+            gig_ids = search_ids('gig', subject)
+            gig_tutor_ids = dict(Gig.objects.filter(id__in=gig_ids).values_list('id', 'tutor_id'))
+            tutor_ids = [gig_tutor_ids[g] for g in gig_ids if g in gig_tutor_ids] + search_ids('tutor', subject)
+            qs = order_by_ids(qs, list(dict.fromkeys(tutor_ids)))
         if location:
             qs = qs.filter(location__icontains=location)
 
-        qs = qs.distinct()
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -462,6 +469,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    @idempotent
     def purchase_premium(self, request):
         """
         Buy premium subscription
@@ -554,27 +562,6 @@ class UserViewSet(viewsets.ModelViewSet):
             'profile_picture_url': request.build_absolute_uri(user.profile_picture.url)
         }, status=200)
 
-# --- Utility ---
-import math
-
-def haversine(lon1, lat1, lon2, lat2):
-    """
-    Calculate the great-circle distance between two points
-    on the Earth specified by longitude and latitude in decimal degrees.
-    Returns distance in kilometers.
-    """
-    R = 6371  # Earth radius in km
-
-    lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
-
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-
-    return R * c
-
 class UserCreditBalanceView(APIView):
     permission_classes = [IsAuthenticated]  # no auth required
     def get(self, request, user_id):
@@ -621,22 +608,18 @@ class CreditUpdateByUserPostView(APIView):
         serializer = CreditUpdateByUserSerializer(data=request.data)
         if serializer.is_valid():
             credit = serializer.validated_data['credit']
-            credit.balance = serializer.validated_data['new_balance']
-            credit.save()
+            points.set_balance(credit, serializer.validated_data['new_balance'])
             return Response({
                 "user_id": credit.user.id,
                 "new_balance": credit.balance
             }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderUnavailable, GeocoderTimedOut
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .models import User, Gig
 from .serializers import UserSerializer
-from math import radians, cos, sin, asin, sqrt
 
 # --- GigViewSet ---
 class GigViewSet(viewsets.ModelViewSet):
@@ -644,7 +627,7 @@ class GigViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Gig.objects.filter(tutor=self.request.user)
+        return Gig.objects.filter(tutor=self.request.user).select_related('subject')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -653,24 +636,11 @@ class GigViewSet(viewsets.ModelViewSet):
         user_gig_count = Gig.objects.filter(tutor=user).count()
 
         # Deduct credit only if user has already created 5 or more gigs
-        if user_gig_count >= 5:
-            try:
-                credit = Credit.objects.get(user=user)
-                if credit.balance < 1:
-                    raise ValidationError("Insufficient points to create gig.")
-                credit.balance -= 1
-                credit.save()
-            except Credit.DoesNotExist:
-                raise ValidationError("Credit record not found.")
-
-        # --- Handle Subject insertion ---
-        subject_name = serializer.validated_data.get("subject")
-        subject, created = Subject.objects.get_or_create(
-            name=subject_name,
-            defaults={"is_active": False}
-        )
-        
-        serializer.save(tutor=user)
+        with transaction.atomic():
+            if user_gig_count >= 5 and not points.spend(user, 1, "gig_create"):
+                raise ValidationError("Insufficient points to create gig.")
+            # The serializer resolves the subject name (creating unknown subjects inactive)
+            serializer.save(tutor=user)
 
     @action(detail=True, methods=['post'])
     def boost(self, request, pk=None):
@@ -680,17 +650,12 @@ class GigViewSet(viewsets.ModelViewSet):
         if user != gig.tutor:
             raise PermissionDenied("Only gig owner can boost.")
 
-        try:
-            credit = Credit.objects.get(user=user)
-            if credit.balance < 2:
+        with transaction.atomic():
+            if not points.spend(user, 2, "gig_boost", f"gig:{gig.id}"):
                 raise ValidationError("Insufficient points to boost gig.")
-            credit.balance -= 2
-            credit.save()
-        except Credit.DoesNotExist:
-            raise ValidationError("Credit record not found.")
-
-        gig.used_credits += 1
-        gig.save()
+            gig.used_credits = F('used_credits') + 1
+            gig.save(update_fields=['used_credits'])
+        gig.refresh_from_db(fields=['used_credits'])
 
         return Response({"detail": "Gig boosted successfully."})
 
@@ -701,20 +666,14 @@ class GigViewSet(viewsets.ModelViewSet):
         if request.user != gig.tutor:
             raise PermissionDenied("You can only view rank for your own gig.")
 
-        # Sort gigs by used_credits and created_at
-        all_gigs = Gig.objects.filter(title=gig.title).order_by('-used_credits', '-created_at')
-        gig_ids = list(all_gigs.values_list('id', flat=True))
-
-        try:
-            rank = gig_ids.index(gig.id) + 1
-        except ValueError:
-            rank = -1
+        # Gigs in the same subject by used_credits, then created_at (core.modules.leaderboard)
+        rank, total = leaderboard.rank(gig)
 
         return Response({
             "rank": rank,
-            "total": len(gig_ids),
+            "total": total,
             "gig_id": gig.id,
-            "subject": gig.title,
+            "subject": gig.subject.name if gig.subject else gig.title,
         })
 
     @action(detail=True, methods=['get'])
@@ -733,25 +692,34 @@ class GigViewSet(viewsets.ModelViewSet):
 
         simulated_used_credits = gig.used_credits + credits_to_spend
 
-        all_gigs = list(Gig.objects.filter(title=gig.title))
-
-        all_gigs_sorted = sorted(
-            all_gigs,
-            key=lambda g: (-(g.used_credits if g.id != gig.id else simulated_used_credits), -g.created_at.timestamp())
-        )
-
-        try:
-            new_rank = [g.id for g in all_gigs_sorted].index(gig.id) + 1
-        except ValueError:
-            new_rank = -1
+        new_rank, total = leaderboard.predicted_rank(gig, simulated_used_credits)
 
         return Response({
             "predicted_rank": new_rank,
-            "total": len(all_gigs_sorted),
+            "total": total,
             "gig_id": gig.id,
-            "subject": gig.title,
+            "subject": gig.subject.name if gig.subject else gig.title,
             "simulated_used_credits": simulated_used_credits,
             "credits_spent": credits_to_spend,
+        })
+
+    @action(detail=True, methods=['get'])
+    def boost_curve(self, request, pk=None):
+        gig = self.get_object()
+
+        if request.user != gig.tutor:
+            raise PermissionDenied("You can only view rank for your own gig.")
+
+        # Fewest extra points (as in predicted_rank) for every rank up to 1, from one sorted array
+        rank, total, curve = leaderboard.boost_curve(gig)
+
+        return Response({
+            "rank": rank,
+            "total": total,
+            "gig_id": gig.id,
+            "subject": gig.subject.name if gig.subject else gig.title,
+            "used_credits": gig.used_credits,
+            "curve": [{"rank": target, "points": needed} for target, needed in curve],
         })# core/views.py
 
 # --- CreditViewSet ---
@@ -773,6 +741,7 @@ class CreditViewSet(viewsets.ModelViewSet):
 
     # Secure purchase endpoint: only authenticated users
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    @idempotent
     def purchase(self, request):
         """
         Buy points
@@ -838,6 +807,7 @@ class CreditViewSet(viewsets.ModelViewSet):
             return Response({'status': 'FAILED', 'error': payment.error_message}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def transfer(self, request):
         recipient_id = request.data.get('recipient_id')
         amount = request.data.get('amount')
@@ -859,78 +829,92 @@ class CreditViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({'error': 'Recipient not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        try:
-            with transaction.atomic():
-                sender_credit = Credit.objects.select_for_update().get(user=request.user)
-                recipient_credit, created = Credit.objects.select_for_update().get_or_create(user=recipient)
-
-                if sender_credit.balance < amount:
-                    return Response({'error': 'Insufficient points'}, status=status.HTTP_400_BAD_REQUEST)
-
-                sender_credit.balance -= amount
-                recipient_credit.balance += amount
-
-                sender_credit.save()
-                recipient_credit.save()
+        with transaction.atomic():
+            if not points.spend(request.user, amount, "transfer_out", f"user:{recipient.id}"):
+                return Response({'error': 'Insufficient points'}, status=status.HTTP_400_BAD_REQUEST)
+            points.grant(recipient, amount, "transfer_in", f"user:{request.user.id}")
 
-                # Create notification for recipient
-                Notification.objects.create(
-                    from_user=request.user,
-                    to_user=recipient,
-                    message=f"You received {amount} coins as a gift from {request.user.username}!"
-                )
-        except Credit.DoesNotExist:
-            return Response({'error': 'Sender credit account not found'}, status=status.HTTP_400_BAD_REQUEST)
+            # Create notification for recipient
+            Notification.objects.create(
+                from_user=request.user,
+                to_user=recipient,
+                message=f"You received {amount} coins as a gift from {request.user.username}!"
+            )
 
         return Response({
             'message': 'Points transferred successfully',
             'amount': amount,
             'recipient': recipient.username,
-            'new_balance': sender_credit.balance
+            'new_balance': points.balance(request.user)
         })
 
 # --- JobViewSet ---
 class JobViewSet(viewsets.ModelViewSet):
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'description', 'subject', 'location']
+    filter_backends = [FullTextSearchFilter]
+    search_kind = 'job'  # description, location and subject names
+    pagination_class = JobCursorPagination
+
+    @property
+    def paginator(self):
+        # ?search= results are ordered by relevance, which a created_at cursor would discard
+        if not hasattr(self, '_paginator') and self.request.query_params.get(FullTextSearchFilter.search_param):
+            self._paginator = RankedPagination()
+        return super().paginator
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
             return [AllowAny()]
         return super().get_permissions()
     def get_queryset(self):
+        return self.with_serializer_data(self.get_filtered_jobs())
+
+    def get_filtered_jobs(self):
         queryset = Job.objects.all()
         subject = self.request.query_params.get('subject', None)
         location = self.request.query_params.get('location', None)
-        lat = self.request.query_params.get('lat')
-        lng = self.request.query_params.get('lng')
-        radius_km = float(self.request.query_params.get('radius_km', 20))
 
         if subject:
-            queryset = queryset.filter(subject__icontains=subject)
+            queryset = queryset.filter(subjects__name__icontains=subject).distinct()
         if location:
             queryset = queryset.filter(location__icontains=location)
 
-        if lat and lng:
-            lat, lng = float(lat), float(lng)
-            jobs_in_radius = []
-            for job in queryset:
-                if job.latitude is not None and job.longitude is not None:
-                    distance = haversine(lat, lng, job.latitude, job.longitude)
-                    if distance <= radius_km:
-                        job._distance = distance
-                        jobs_in_radius.append(job)
-            jobs_in_radius.sort(key=lambda j: getattr(j, '_distance', 0))
-            return jobs_in_radius
-
         return queryset
+
+    def with_serializer_data(self, queryset):
+        """Everything JobSerializer reads per row, loaded up front (no per-job queries)."""
+        return queryset.select_related('student', 'review').prefetch_related('subjects').annotate(
+            applicants_count=Count('unlocks', distinct=True),
+        )
+
+    def list(self, request, *args, **kwargs):
+        lat = request.query_params.get('lat')
+        lng = request.query_params.get('lng')
+        if not (lat and lng):
+            return super().list(request, *args, **kwargs)
+
+        try:
+            lat, lng = float(lat), float(lng)
+            radius_km = float(request.query_params.get('radius_km', 20))
+        except ValueError:
+            return Response({"detail": "lat, lng and radius_km must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Geohash cell scan + vectorized distance over ids/coordinates only;
+        # full Job rows are fetched just for the requested page
+        ids, distances = nearby_ids(self.get_filtered_jobs(), lat, lng, radius_km)
+        paginator = RankedPagination()
+        page_ids = paginator.paginate_queryset(ids, request, view=self)
+        offset = (paginator.page.number - 1) * paginator.page.paginator.per_page
+        jobs = fetch_in_order(self.get_queryset(), page_ids, distances[offset:offset + len(page_ids)])
+        serializer = self.get_serializer(jobs, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['GET'], permission_classes=[IsAuthenticated])
     def my_jobs(self, request):
         """
-        Return jobs created by the logged-in user (students only).
+        Return jobs created by the logged-in user (students only), a cursor page at a time.
+        The first page also carries `counts`: total, active (open or assigned) and completed.
         """
         user = request.user
 
@@ -940,82 +924,29 @@ class JobViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        queryset = Job.objects.filter(student=user).order_by('-created_at')
+        queryset = self.with_serializer_data(Job.objects.filter(student=user))
         page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        if not request.query_params.get(self.paginator.cursor_query_param):
+            # Dashboard totals in one aggregate, on the first page only so later pages stay a range scan
+            response.data['counts'] = Job.objects.filter(student=user).aggregate(
+                total=Count('id'),
+                active=Count('id', filter=Q(status__in=['Open', 'Assigned'])),
+                completed=Count('id', filter=Q(status='Completed')),
+            )
+        return response
 
     def perform_create(self, serializer):
         user = self.request.user
-        if user.credit.balance < 1:
-            raise ValidationError({"detail": "You don't have enough points to post a job."})
-
-        job = serializer.save(student=user)
-        user.credit.balance -= 1
-        user.credit.save(update_fields=["balance"])
-
-        # -------------------------------
-        # Notify tutors with active gigs and active subjects
-        # -------------------------------
-        active_job_subjects = job.subjects.filter(is_active=True).values_list("name", flat=True)
-
-        # print(f"Active job subjects for job {job.id}: {list(active_job_subjects)}")
-        # Tutors who have active gigs with subjects matching the active job subjects
-        tutors = User.objects.filter(
-            user_type="tutor",
-            gigs__subject__in=active_job_subjects
-        ).distinct().annotate(
-            total_points_spent=Sum(
-                'gigs__used_credits',
-                filter=Q(gigs__subject__in=active_job_subjects)
-            )
-        ).order_by('-total_points_spent')
-
-        tutor_data = []
-        notifications = []
-
-        for tutor in tutors:
-            if tutor.email:
-                verify_url = f"{settings.FRONTEND_SITE_URL}/jobs/{job.id}/"
-                html_content = f"""
-                <html><body style="font-family: Arial, sans-serif; padding: 40px;">
-                <h2>New Job Matching Your Gig!</h2>
-                <p>{job.description}</p>
-                <p>Location: {job.location}, Budget: {job.budget} USD</p>
-                <p>Subjects: {', '.join(active_job_subjects)}</p>
-                <a href="{verify_url}">View Job & Apply</a>
-                </body></html>
-                """
-                text_content = f"New job posted: {job.description}\nView & apply here: {verify_url}"
-
-                # collect for bulk email
-                tutor_data.append({
-                    'email': tutor.email,
-                    'html_content': html_content,
-                    'text_content': text_content
-                })
-
-            # create in-app notification
-            notifications.append(Notification(
-                from_user=user,
-                to_user=tutor,
-                message=f"New job posted matching your subjects: {', '.join(active_job_subjects)}"
-            ))
-
-        # -------------------------------
-        # Save all notifications at once
-        # -------------------------------
-        if notifications:
-            Notification.objects.bulk_create(notifications)
+        with transaction.atomic():
+            if not points.spend(user, 1, "job_post"):
+                raise ValidationError({"detail": "You don't have enough points to post a job."})
+            job = serializer.save(student=user)
 
-        # -------------------------------
-        # Send emails in batches
-        # -------------------------------
-        schedule_job_emails(tutor_data)
+        # Notify tutors with active gigs and active subjects once the job is
+        # committed; matching and fan-out run in the background
+        transaction.on_commit(lambda: notify_tutors_of_new_job.delay(job.id))
 
     @action(detail=False, methods=['GET'], permission_classes=[IsAuthenticated])
     def matched_jobs(self, request):
@@ -1026,31 +957,19 @@ class JobViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Step 1: Get all active Subject names
-        active_subjects = Subject.objects.filter(is_active=True).values_list("name", flat=True)
-
-        # Step 2: Collect tutor's gigs whose subject is active
-        gig_subject_names = user.gigs.filter(subject__in=active_subjects).values_list("subject", flat=True).distinct()
-
-        if not gig_subject_names:
-            return Response([], status=status.HTTP_200_OK)
-
-        # Step 3: Get jobs with those subjects
-        jobs = Job.objects.filter(subjects__name__in=gig_subject_names).distinct().order_by("-created_at")
-
-        # Step 4: Paginate & serialize
-        page = self.paginate_queryset(jobs)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
+        # The feed is materialized on write (core.modules.feed): one range scan on
+        # (tutor, created_at) for the page, then one fetch of those jobs
+        entries = TutorJobFeed.objects.filter(tutor=user).only("id", "job_id", "created_at")
+        page = self.paginate_queryset(entries)
+        jobs = fetch_in_order(self.with_serializer_data(Job.objects.all()), [entry.job_id for entry in page])
         serializer = self.get_serializer(jobs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_paginated_response(serializer.data)
 
     # ---------------------------
     # Job Unlock
     # ---------------------------
     @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
+    @idempotent
     def unlock(self, request, pk=None):
         try:
             job = Job.objects.get(pk=pk)
@@ -1058,11 +977,8 @@ class JobViewSet(viewsets.ModelViewSet):
         except Job.DoesNotExist:
             return Response({"detail": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Get active gig subject names (strings)
-        gig_subjects = tutor.gigs.values_list("subject", flat=True).distinct()
-
-        # Check if job has at least one matching subject
-        if not job.subjects.filter(name__in=gig_subjects, is_active=True).exists():
+        # Check the tutor has a gig in at least one of the job's (active) subjects
+        if not subject_index.teaches_any(tutor.id, job.subjects.values_list("id", flat=True)):
             return Response(
                 {"detail": "You need an active gig with a matching subject to unlock this job."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -1071,24 +987,24 @@ class JobViewSet(viewsets.ModelViewSet):
         if JobUnlock.objects.filter(job=job, tutor=tutor).exists():
             return Response({"detail": "Job already unlocked"}, status=status.HTTP_400_BAD_REQUEST)
 
-        points = self.calculate_unlock_points(job, tutor)
-
-        if tutor.credit.balance < points:
-            return Response({"detail": "Insufficient points"}, status=status.HTTP_400_BAD_REQUEST)
+        price = pricing.unlock_points(job)
 
-        with transaction.atomic():
-            # Deduct points
-            tutor.credit.balance -= points
-            tutor.credit.save(update_fields=["balance"])
+        try:
+            with transaction.atomic():
+                # Deduct points (one conditional UPDATE, see core.modules.points)
+                if not points.spend(tutor, price, "job_unlock", f"job:{job.id}"):
+                    return Response({"detail": "Insufficient points"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Save job unlock
-            unlock_obj = JobUnlock.objects.create(job=job, tutor=tutor, points_spent=points)
+                # Save job unlock; a concurrent duplicate fails here and rolls the spend back
+                unlock_obj = JobUnlock.objects.create(job=job, tutor=tutor, points_spent=price)
 
-            # Also unlock contact: tutor -> student (job poster)
-            ContactUnlock.objects.get_or_create(
-                unlocker=tutor,
-                target=job.student
-            )
+                # Also unlock contact: tutor -> student (job poster)
+                ContactUnlock.objects.get_or_create(
+                    unlocker=tutor,
+                    target=job.student
+                )
+        except IntegrityError:
+            return Response({"detail": "Job already unlocked"}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = JobUnlockSerializer(unlock_obj)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1096,6 +1012,27 @@ class JobViewSet(viewsets.ModelViewSet):
     # ---------------------------
     # Preview unlock points
     # ---------------------------
+    @action(detail=False, methods=['GET'], url_path='unlock-quotes')
+    def unlock_quotes(self, request):
+        """
+        Unlock prices for several jobs at once: ?ids=1,2,3 (up to pricing.MAX_QUOTE_JOBS).
+        Returns {job_id: {"unlocked": bool, "points_needed": int}}; unknown ids are left out.
+        """
+        try:
+            job_ids = list(dict.fromkeys(int(i) for i in request.query_params.get('ids', '').split(',') if i.strip()))
+        except ValueError:
+            return Response({"detail": "ids must be a comma-separated list of job ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(job_ids) > pricing.MAX_QUOTE_JOBS:
+            return Response(
+                {"detail": f"At most {pricing.MAX_QUOTE_JOBS} jobs can be quoted at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        jobs = Job.objects.filter(id__in=job_ids).only(
+            'id', 'budget', 'budget_type', 'total_hours', 'country', 'created_at'
+        )
+        return Response(pricing.quote_jobs(list(jobs), request.user), status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['GET'])
     def preview(self, request, pk=None):
         try:
@@ -1107,151 +1044,30 @@ class JobViewSet(viewsets.ModelViewSet):
         unlocked = JobUnlock.objects.filter(job=job, tutor=tutor).exists()
         points_needed = 0
         if not unlocked:
-            points_needed = self.calculate_unlock_points(job, tutor)
+            points_needed = pricing.unlock_points(job)
 
         return Response({
             "unlocked": unlocked,
             "points_needed": points_needed
         }, status=status.HTTP_200_OK)
 
-    # ---------------------------
-    # Helper Methods
-    # ---------------------------
-    def calculate_unlock_points(self, job: Job, tutor: User) -> int:
-        """
-        Full calculation pipeline:
-        1. Use budget → normalize hourly → tier → base points
-        2. If no budget, fallback to country points
-        3. Apply bidding (10% increase per unlock, max 10 unlocks)
-        4. Apply decay (after 36h idle, -5% per 5h, min 20% of base)
-        """
-        # Step 1: Base points
-        if job.budget and job.total_hours:
-            hourly_rate = self.normalize_hourly_rate(job)
-            base_points = self.get_base_points_for_hourly(hourly_rate)
-        else:
-            base_points = self.get_country_group_points(job.country)
-
-        # Step 2 + 3: Dynamic pricing
-        final_points = self.calculate_dynamic_price(job, base_points)
-
-        return max(final_points, 1)
-
-    def normalize_hourly_rate(self, job: Job) -> float:
-        """
-        Convert any job budget type (Per Hour, Per Day, Per Week, etc.) to hourly.
-        """
-        total_hours = job.total_hours or 1
-        budget = float(job.budget or 0)
-
-        if job.budget_type == "Per Hour":
-            return budget
-        return budget / total_hours
-
-    def get_base_points_for_hourly(self, hourly_rate: float) -> int:
-        """
-        Find unlock tier based on hourly rate.
-        If not in range → clamp to lowest or highest tier.
-        """
-        tiers = UnlockPricingTier.objects.order_by('min_rate')
-        if not tiers.exists():
-            return 100  # fallback if no tiers defined
-
-        # Match tier
-        tier = tiers.filter(min_rate__lte=hourly_rate).filter(
-            Q(max_rate__gte=hourly_rate) | Q(max_rate__isnull=True)
-        ).first()
-        if tier:
-            return tier.points
-
-        lowest_tier = tiers.first()
-        highest_tier = tiers.last()
-
-        if hourly_rate < lowest_tier.min_rate:
-            return lowest_tier.points
-        if highest_tier.max_rate and hourly_rate > highest_tier.max_rate:
-            return highest_tier.points
-
-        return lowest_tier.points
-
-    def get_country_group_points(self, country: str) -> int:
-        group_obj = CountryGroup.objects.filter(name=country).first()
-        if not group_obj:
-            return 100
-        group_point_obj = CountryGroupPoint.objects.filter(group=group_obj.group).first()
-        return group_point_obj.points if group_point_obj else 100
-
-    def calculate_dynamic_price(self, job: Job, base_price: int) -> int:
-        """
-        Apply bidding increase & decay decrease.
-        """
-        price = base_price
-        unlock_count = job.unlocks.count()
-
-        # 1. Increment per unlock (10% each, cap at 10)
-        effective_unlocks = min(unlock_count, 10)
-        if effective_unlocks > 0:
-            price = int(price * (1.1 ** effective_unlocks))
-
-        # 2. Decay if idle for 36h
-        if unlock_count == 0 and job.created_at:
-            now = timezone.now()
-            idle_time = now - job.created_at
-
-            if idle_time > timedelta(hours=36):
-                five_hour_blocks = (idle_time - timedelta(hours=36)) // timedelta(hours=5)
-                for _ in range(int(five_hour_blocks)):
-                    price = int(price * 0.95)
-
-        # 3. Floor = 20% of base
-        min_price = int(base_price * 0.20)
-        return max(price, min_price)
-    
     @action(detail=True, methods=['GET'], permission_classes=[IsAuthenticated])
     def applicants(self, request, pk=None):
         """
-        Returns a list of tutors who have applied for this job (or unlocked it),
-        sorted by total credits spent on their gigs (descending).
+        Returns a page of tutors who have unlocked this job, sorted by the points
+        they spent on gigs in its subjects (descending).
         If the requesting user is a student, email and phone are only
         shown if the contact is unlocked.
         """
-        user = request.user
-
-        try:
-            job = Job.objects.get(pk=pk)
-        except Job.DoesNotExist:
+        # Ranked list and the student's unlocked contacts are cached (core.modules.applicants)
+        ranked = ranked_applicants(pk)
+        if not ranked and not Job.objects.filter(pk=pk).exists():
             return Response({"detail": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Tutors who unlocked the job
-        unlocked_tutor_ids = JobUnlock.objects.filter(job=job).values_list('tutor_id', flat=True)
-
-        # Tutors who have gigs in the job subjects
-        job_subject_names = list(job.subjects.filter(is_active=True).values_list("name", flat=True))
-        if not job_subject_names:
-            return Response([], status=status.HTTP_200_OK)
-
-        tutors = User.objects.filter(
-            user_type="tutor",
-            gigs__subject__in=job_subject_names,
-            id__in=unlocked_tutor_ids  # Only those who unlocked/applied
-        ).distinct().order_by('-gigs__used_credits')
-
-        tutor_list = []
-        for tutor in tutors:
-            contact_unlocked = ContactUnlock.objects.filter(
-                unlocker=user,
-                target=tutor
-            ).exists() if user.user_type == "student" else True  # tutors see full info
-
-            tutor_list.append({
-                "id": tutor.id,
-                "username": tutor.username,
-                "email": tutor.email if contact_unlocked else None,
-                "phone": str(tutor.phone_number) if contact_unlocked and tutor.phone_number else None,
-            })
+        paginator = RankedPagination()
+        page = paginator.paginate_queryset(ranked, request, view=self)
+        return paginator.get_paginated_response(masked_applicants(page, request.user))
 
-        return Response(tutor_list, status=status.HTTP_200_OK)
-    
     @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
     def choose_tutor(self, request, pk=None):
         """
@@ -1389,25 +1205,20 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 {'error': 'You have already applied to this job'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        try:
-            credit = Credit.objects.get(user=user)
-        except Credit.DoesNotExist:
-            credit = Credit.objects.create(user=user)
-        if credit.balance < 1:
-            return Response(
-                {'error': 'Insufficient points to apply'},
-                status=status.HTTP_400_BAD_REQUEST
+        with transaction.atomic():
+            if not points.spend(user, 1, "application", f"job:{job.id}"):
+                return Response(
+                    {'error': 'Insufficient points to apply'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            application = Application.objects.create(
+                job=job,
+                teacher=user,
+                is_premium=is_premium
             )
-        application = Application.objects.create(
-            job=job,
-            teacher=user,
-            is_premium=is_premium
-        )
-        if not is_premium:
-            application.countdown_end = timezone.now() + timedelta(hours=24)
-            application.save()
-        credit.balance -= 1
-        credit.save()
+            if not is_premium:
+                application.countdown_end = timezone.now() + timedelta(hours=24)
+                application.save()
         serializer = self.get_serializer(application)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -1435,12 +1246,14 @@ class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     queryset = Notification.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
     @action(detail=False, methods=['get'], url_path='unread')
     def unread(self, request):
         unread_notifications = self.queryset.filter(to_user=request.user, is_read=False)
-        serializer = self.get_serializer(unread_notifications, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(unread_notifications)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['post'], url_path='mark-read')
     def mark_read(self, request):
@@ -1523,7 +1336,7 @@ class UserSettingsViewSet(viewsets.ModelViewSet):
         return Response({'status': 'privacy settings updated'})
 
 # --- ReviewViewSet (with trust_score update hook) ---
-from core.utils import schedule_job_emails, schedule_premium_expiry, update_trust_score
+from core.utils import schedule_premium_expiry, update_trust_score
 class ReviewViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ReviewSerializer
@@ -1555,6 +1368,7 @@ class PremiumViewSet(viewsets.ViewSet):
 
     # TEMPORARY: Changed permission_classes to AllowAny for testing without authentication
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @idempotent
     def upgrade(self, request):
         # IMPORTANT: For unauthenticated testing, you NEED a user object.
         # You could fetch a specific test user or create a temporary one if needed.
@@ -1660,20 +1474,18 @@ class SubjectViewSet(viewsets.ModelViewSet):
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'aliases']
+    filter_backends = [autocomplete.SubjectAutocompleteFilter]
 
-    @api_view(['GET'])
-    def suggest_subjects(request):
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        """Autocomplete over subject names and aliases, answered from memory."""
         query = request.query_params.get('q', '')
-        if query:
-            subjects = Subject.objects.filter(
-                Q(name__icontains=query) | Q(aliases__icontains=query)
-            )
-        else:
-            subjects = Subject.objects.all()
-        serializer = SubjectSerializer(subjects[:10], many=True)
-        return Response(serializer.data)
+        try:
+            limit = int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            limit = autocomplete.DEFAULT_LIMIT
+        limit = min(max(limit, 1), autocomplete.MAX_LIMIT)
+        return Response(autocomplete.suggest(query, limit))
 
 def build_payment_data(request, user, order, transaction_id, amount, product_type, points=0):
     """
@@ -1747,10 +1559,8 @@ class EscrowPaymentViewSet(viewsets.ModelViewSet):
 def update_user_credit(user_id: int, credits_to_add: int):
     try:
         user = User.objects.get(id=user_id)
-        credit_obj, _ = Credit.objects.get_or_create(user=user)
-        credit_obj.balance = (credit_obj.balance or 0) + credits_to_add
-        credit_obj.save()
-        return True, credit_obj.balance
+        points.grant(user, credits_to_add, "purchase")
+        return True, points.balance(user)
     except User.DoesNotExist:
         return False, "User not found"
 
@@ -1839,17 +1649,13 @@ def payment_success_view(request):
             order.save()
 
             if payment_type == 'points':
-                credit_obj, _ = Credit.objects.get_or_create(user=user)
-                credit_obj.balance += credits_amount
-                credit_obj.save()
+                points.grant(user, credits_amount, "purchase", f"order:{order.id}")
 
                 # Referral bonus: give referrer 10% on first purchase by referred user
                 if user.referred_by and not user.has_given_referral_bonus:
                     bonus = int(credits_amount * 0.10)
                     if bonus > 0:
-                        referrer_credit, _ = Credit.objects.get_or_create(user=user.referred_by)
-                        referrer_credit.balance += bonus
-                        referrer_credit.save()
+                        points.grant(user.referred_by, bonus, "referral", f"user:{user.id}")
                         user.has_given_referral_bonus = True
                         user.save()
 
@@ -2033,12 +1839,10 @@ def sslcommerz_ipn(request):
 
                 if payment_type == 'credit_purchase':
                     credits_to_add = int(data.get('value_b', 0))
-                    credit_obj, _ = Credit.objects.get_or_create(user=user)
-                    credit_obj.balance += credits_to_add
-                    credit_obj.save()
+                    points.grant(user, credits_to_add, "purchase", f"order:{order.id}")
                     Notification.objects.create(
                         user=user,
-                        message=f"💰 Your purchase of {credits_to_add} points was confirmed (IPN)! Your new balance is {credit_obj.balance}."
+                        message=f"💰 Your purchase of {credits_to_add} points was confirmed (IPN)! Your new balance is {points.balance(user)}."
                     )
                 elif payment_type == 'premium_upgrade':
                     user_settings, _ = UserSettings.objects.get_or_create(user=user)
@@ -2097,7 +1901,7 @@ class AdminViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'])
     def pending_gigs(self, request):
-        gigs = Gig.objects.filter(status='pending')
+        gigs = Gig.objects.filter(status='pending').select_related('subject')
         return Response(GigSerializer(gigs, many=True).data)
 
     @action(detail=True, methods=['post'])
@@ -2145,25 +1949,18 @@ class ContactUnlockViewSet(viewsets.ViewSet):
         if request.user.id == target_user.id:
             return Response({'detail': 'You cannot unlock yourself.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if already unlocked
-        unlock, created = ContactUnlock.objects.get_or_create(
-            unlocker=request.user, target=target_user
-        )
-        if not created:
-            return Response({'detail': 'Contact already unlocked.'}, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            # Check if already unlocked
+            unlock, created = ContactUnlock.objects.get_or_create(
+                unlocker=request.user, target=target_user
+            )
+            if not created:
+                return Response({'detail': 'Contact already unlocked.'}, status=status.HTTP_200_OK)
 
-        # 🧾 Deduct 1 credit (only if newly unlocking)
-        try:
-            credit = Credit.objects.get(user=request.user)
-            if credit.balance >= 1:
-                credit.balance -= 1
-                credit.save()
-            else:
-                unlock.delete()  # rollback unlock if not enough points
+            # 🧾 Deduct 1 credit (only if newly unlocking)
+            if not points.spend(request.user, 1, "contact_unlock", f"user:{target_user.id}"):
+                transaction.set_rollback(True)  # drop the unlock
                 return Response({'detail': 'Insufficient points'}, status=status.HTTP_402_PAYMENT_REQUIRED)
-        except Credit.DoesNotExist:
-            unlock.delete()
-            return Response({'detail': 'Credit record not found'}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = ContactUnlockSerializer(unlock, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
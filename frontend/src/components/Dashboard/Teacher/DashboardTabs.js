@@ -2,7 +2,7 @@ import React from "react";
 import GigItemCard from "./GigItemCard";
 import JobCard from "../../JobCard";
 
-const DashboardTabs = ({ activeTab, setActiveTab, dashboardData, handleCreateGigClick }) => {
+const DashboardTabs = ({ activeTab, setActiveTab, dashboardData, handleCreateGigClick, paginationInfo = {} }) => {
   const tabs = [
     { key: "overview", label: "Overview" },
     { key: "gigs", label: "My Gigs" },
@@ -112,11 +112,31 @@ const DashboardTabs = ({ activeTab, setActiveTab, dashboardData, handleCreateGig
               onAction={() => (window.location.href = "/jobs")}
             >
               {dashboardData.matchedJobs.length > 0 ? (
-                <div className="grid grid-cols-1 sm:grid-cols-2 gap-6">
-                  {dashboardData.matchedJobs.map((job) => (
-                    <JobCard key={job.id} job={job} />
-                  ))}
-                </div>
+                <>
+                  <div className="grid grid-cols-1 sm:grid-cols-2 gap-6">
+                    {dashboardData.matchedJobs.map((job) => (
+                      <JobCard key={job.id} job={job} />
+                    ))}
+                  </div>
+                  {(paginationInfo.hasPreviousJobs || paginationInfo.hasNextJobs) && (
+                    <div className="flex justify-center gap-3 pt-2">
+                      <button
+                        onClick={paginationInfo.onPreviousJobs}
+                        disabled={!paginationInfo.hasPreviousJobs}
+                        className="px-4 py-2 rounded-lg text-sm font-medium bg-white border border-gray-200 hover:bg-indigo-50 disabled:opacity-50 disabled:cursor-not-allowed"
+                      >
+                        Previous
+                      </button>
+                      <button
+                        onClick={paginationInfo.onNextJobs}
+                        disabled={!paginationInfo.hasNextJobs}
+                        className="px-4 py-2 rounded-lg text-sm font-medium bg-white border border-gray-200 hover:bg-indigo-50 disabled:opacity-50 disabled:cursor-not-allowed"
+                      >
+                        Next
+                      </button>
+                    </div>
+                  )}
+                </>
               ) : (
                 <EmptyState
                   title="No matched jobs"
@@ -1,6 +1,17 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { gigApi, subjectApi } from '../utils/apiService';
-import CreatableSelect from "react-select/creatable";
+import AsyncCreatableSelect from "react-select/async-creatable";
+
+// Subjects matching what the tutor has typed, most popular first (served from the autocomplete index)
+const loadSubjectOptions = async (inputValue) => {
+  try {
+    const response = await subjectApi.suggestSubjects(inputValue);
+    return response.data.map((item) => ({ value: item.name, label: item.name }));
+  } catch (err) {
+    console.error('Failed to fetch subjects:', err);
+    return [];
+  }
+};
 
 const GigPostForm = ({ onClose, onGigCreated }) => {
   const [title, setTitle] = useState('');
@@ -11,7 +22,6 @@ const GigPostForm = ({ onClose, onGigCreated }) => {
   const [experience, setExperience] = useState('');
   const [feeDetails, setFeeDetails] = useState('');
   const [subject, setSubject] = useState('');
-  const [subjects, setSubjects] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState(null);
   const [success, setSuccess] = useState(null);
@@ -22,19 +32,6 @@ const GigPostForm = ({ onClose, onGigCreated }) => {
     subject: false,
   });
 
-  useEffect(() => {
-    const fetchSubjects = async () => {
-      try {
-        const response = await subjectApi.getSubjects();
-        setSubjects(response.data);
-      } catch (err) {
-        console.error('Failed to fetch subjects:', err);
-      }
-    };
-
-    fetchSubjects();
-  }, []);
-
   const handleBlur = (field) => {
     setTouchedFields((prev) => ({ ...prev, [field]: true }));
   };
@@ -282,14 +279,16 @@ const GigPostForm = ({ onClose, onGigCreated }) => {
             <label htmlFor="gigSubject" className="block text-sm font-medium text-gray-700 mb-1">
               Subject <span className="text-red-500">*</span>
             </label>
-            <CreatableSelect
+            <AsyncCreatableSelect
               id="gigSubject"
               isClearable
+              cacheOptions
+              defaultOptions
               placeholder="Type or select a subject"
               value={subject ? { value: subject, label: subject } : null}
               onChange={(selected) => setSubject(selected ? selected.value : "")}
               onBlur={() => handleBlur("subject")}
-              options={subjects.map((item) => ({ value: item.name, label: item.name }))}
+              loadOptions={loadSubjectOptions}
               classNamePrefix="react-select"
             />
             {touchedFields.subject && !isSubjectValid && (
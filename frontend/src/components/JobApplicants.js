@@ -21,14 +21,14 @@ const JobApplicants = ({ jobId, job }) => {
 
     const fetchApplicants = async () => {
       try {
-        const response = await jobAPI.getJobApplicants(jobId);
+        const response = await jobAPI.getJobApplicants(jobId, { page_size: 100 });
         if (!isMounted) return;
 
         let dataWithState = [];
 
         if (job?.status === 'Assigned' && job.assigned_tutor) {
           // Show only the assigned tutor
-          const assignedTutor = response.data.find(t => t.id === job.assigned_tutor);
+          const assignedTutor = response.data.results.find(t => t.id === job.assigned_tutor);
           if (assignedTutor) {
             dataWithState = [{
               ...assignedTutor,
@@ -39,7 +39,7 @@ const JobApplicants = ({ jobId, job }) => {
           }
         } else {
           // Show all applicants if job is not assigned
-          dataWithState = response.data.map(tutor => ({
+          dataWithState = response.data.results.map(tutor => ({
             ...tutor,
             isUnlocked: !!(tutor.email || tutor.phone),
             contactInfo: { email: tutor.email || '', phone: tutor.phone || '' },
@@ -57,10 +57,13 @@ const JobDetail = () => {
         setJob(response.data);
 
         if (isTutor) {
-          const unlockRes = await jobAPI.getJobUnlockPreview(id);
+          const quotesRes = await jobAPI.getJobUnlockQuotes([id]);
           if (!isMounted) return;
-          setJobUnlocked(unlockRes.data.unlocked);
-          setCreditsNeeded(unlockRes.data.points_needed);
+          const quote = quotesRes.data[id];
+          if (quote) {
+            setJobUnlocked(quote.unlocked);
+            setCreditsNeeded(quote.points_needed);
+          }
         }
       } catch (err) {
         if (!isMounted) return;
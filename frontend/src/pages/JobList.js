@@ -10,7 +10,7 @@ import {
   FiSearch,
   FiUser,
 } from "react-icons/fi";
-import { jobAPI } from "../utils/apiService";
+import { cursorFrom, jobAPI } from "../utils/apiService";
 
 const JobList = () => {
   const [jobs, setJobs] = useState([]);
@@ -18,41 +18,52 @@ const JobList = () => {
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedType, setSelectedType] = useState("all");
   const [currentPage, setCurrentPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [unlockQuotes, setUnlockQuotes] = useState({});
 
   const jobsPerPage = 7;
+  const isTutor = JSON.parse(localStorage.getItem("user") || "null")?.user_type === "tutor";
   const location = useLocation();
   const navigate = useNavigate();
 
+  // One request prices every job of a page (at most 50, the endpoint's limit)
+  const fetchUnlockQuotes = async (pageJobs) => {
+    if (!isTutor || pageJobs.length === 0) return;
+    try {
+      const res = await jobAPI.getJobUnlockQuotes(pageJobs.map((job) => job.id));
+      setUnlockQuotes((prev) => ({ ...prev, ...res.data }));
+    } catch (err) {
+      console.error("Error fetching unlock prices:", err);
+    }
+  };
+
+  const filterByType = (pageJobs) => {
+    const type = new URLSearchParams(location.search).get("type");
+    if (type === "online") {
+      return pageJobs.filter((job) => job.mode?.includes("Online"));
+    } else if (type === "offline") {
+      return pageJobs.filter((job) => job.mode?.includes("Offline"));
+    } else if (type === "assignment") {
+      return pageJobs.filter(
+        (job) => job.service_type?.toLowerCase() === "assignment help"
+      );
+    }
+    return pageJobs;
+  };
+
   useEffect(() => {
     const fetchJobs = async () => {
       try {
-        const res = await jobAPI.getJobs();
-        let allJobs = res.data || [];
-
-        // Sort by date (newest first)
-        allJobs.sort(
-          (a, b) => new Date(b.created_at) - new Date(a.created_at)
+        const res = await jobAPI.getJobs({ page_size: 50 });
+        const type = new URLSearchParams(location.search).get("type");
+        setSelectedType(
+          ["online", "offline", "assignment"].includes(type) ? type : "all"
         );
-
-        const params = new URLSearchParams(location.search);
-        const type = params.get("type");
-
-        if (type === "online") {
-          allJobs = allJobs.filter((job) => job.mode?.includes("Online"));
-          setSelectedType("online");
-        } else if (type === "offline") {
-          allJobs = allJobs.filter((job) => job.mode?.includes("Offline"));
-          setSelectedType("offline");
-        } else if (type === "assignment") {
-          allJobs = allJobs.filter(
-            (job) => job.service_type?.toLowerCase() === "assignment help"
-          );
-          setSelectedType("assignment");
-        } else {
-          setSelectedType("all");
-        }
-
-        setJobs(allJobs);
+        const pageJobs = filterByType(res.data?.results || []);
+        setJobs(pageJobs);
+        setNextCursor(cursorFrom(res.data?.next));
+        fetchUnlockQuotes(pageJobs);
       } catch (err) {
         console.error("Error fetching jobs:", err);
       } finally {
@@ -62,6 +73,22 @@ const JobList = () => {
     fetchJobs();
   }, [location.search]);
 
+  const loadMoreJobs = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await jobAPI.getJobs({ page_size: 50, cursor: nextCursor });
+      const pageJobs = filterByType(res.data?.results || []);
+      setJobs((prev) => [...prev, ...pageJobs]);
+      setNextCursor(cursorFrom(res.data?.next));
+      fetchUnlockQuotes(pageJobs);
+    } catch (err) {
+      console.error("Error fetching more jobs:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleFilterChange = (type) => {
     setSelectedType(type);
     setCurrentPage(1);
@@ -197,7 +224,7 @@ const JobList = () => {
           <>
             <div className="space-y-6">
               {paginatedJobs.map((job) => (
-                <JobCard key={job.id} job={job} />
+                <JobCard key={job.id} job={job} unlockQuote={unlockQuotes[job.id]} />
               ))}
             </div>
 
@@ -241,6 +268,18 @@ const JobList = () => {
                 Next
               </button>
             </div>
+
+            {nextCursor && (
+              <div className="flex justify-center mt-6">
+                <button
+                  onClick={loadMoreJobs}
+                  disabled={loadingMore}
+                  className="rounded-xl bg-indigo-600 px-6 py-3 text-sm font-medium text-white shadow hover:bg-indigo-700 disabled:opacity-60"
+                >
+                  {loadingMore ? "Loading..." : "Load more jobs"}
+                </button>
+              </div>
+            )}
           </>
         )}
       </main>
@@ -251,7 +290,7 @@ const JobList = () => {
 };
 
 // Job Card Component
-const JobCard = ({ job }) => (
+const JobCard = ({ job, unlockQuote }) => (
   <div className="relative flex flex-col md:flex-row items-center justify-between gap-6 bg-white rounded-2xl shadow-md hover:shadow-lg transition-all p-6 border border-gray-100 hover:border-indigo-100">
     <div className="flex flex-col md:flex-row md:items-center gap-6 flex-1">
       <div className="flex-shrink-0 bg-indigo-50 p-4 rounded-xl">
@@ -301,6 +340,13 @@ const JobCard = ({ job }) => (
       <div className="text-lg font-semibold text-indigo-600">
         {job.budget || "Negotiable"}
       </div>
+      {unlockQuote && (
+        <div className="text-xs font-medium text-gray-500">
+          {unlockQuote.unlocked
+            ? "Unlocked"
+            : `${unlockQuote.points_needed} points to unlock`}
+        </div>
+      )}
       <Link
         to={`/jobs/${job.id}`}
         className="inline-flex items-center rounded-xl bg-green-600 px-5 py-2 text-sm font-medium text-white hover:bg-green-700 transition"
@@ -166,6 +166,18 @@ export default function WhatsAppLikeMessaging() {
             )
           );
           break;
+        case 'chat.read_up_to':
+          // Every message of ours in the conversation up to message_id has been seen
+          setMessages((prev) =>
+            prev.map((msg) =>
+              Number(msg.conversation_id) === Number(data.conversation_id) &&
+              Number(msg.sender?.id) === Number(user?.user_id) &&
+              Number(msg.id) <= Number(data.message_id)
+                ? { ...msg, status: 'seen', is_read: true }
+                : msg
+            )
+          );
+          break;
         case 'chat.search_results':
           setSearchResults(data.results);
           setIsLoading(false);
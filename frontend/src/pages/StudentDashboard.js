@@ -10,7 +10,7 @@ import DashboardHeader from '../components/Dashboard/Student/DashboardHeader';
 import DashboardStats from '../components/Dashboard/Student/DashboardStats';
 import JobPostModal from '../components/Dashboard/Student/JobPostModal';
 import InsufficientCreditsModal from '../components/Dashboard/Student/InsufficientCreditsModal';
-import { creditAPI, jobAPI, notificationAPI } from '../utils/apiService';
+import { creditAPI, cursorFrom, jobAPI, notificationAPI } from '../utils/apiService';
 
 const studentAPI = {
   getCredits: async () => {
@@ -21,12 +21,13 @@ const studentAPI = {
       return { balance: 0 };
     }
   },
-  getPostedJobs: async () => {
+  // One cursor page of my_jobs; the first page also carries the job counts
+  getPostedJobs: async (params) => {
     try {
-      const response = await jobAPI.getMyJobs();
-      return response.data || [];
+      const response = await jobAPI.getMyJobs(params);
+      return response.data;
     } catch {
-      return [];
+      return { results: [], next: null, previous: null };
     }
   },
   getFavoriteTeachers: async (userId) => {
@@ -87,81 +88,27 @@ const JobCard = ({ job, onView }) => {
   );
 };
 
-const Pagination = ({ currentPage, totalPages, onPageChange }) => {
-  const pages = [];
-  
-  const maxVisiblePages = 5;
-  let startPage = Math.max(1, currentPage - Math.floor(maxVisiblePages / 2));
-  let endPage = Math.min(totalPages, startPage + maxVisiblePages - 1);
-  
-  if (endPage - startPage + 1 < maxVisiblePages) {
-    startPage = Math.max(1, endPage - maxVisiblePages + 1);
-  }
-
-  for (let i = startPage; i <= endPage; i++) {
-    pages.push(
-      <button
-        key={i}
-        onClick={() => onPageChange(i)}
-        className={`px-3 py-1 rounded-lg text-sm font-medium ${
-          currentPage === i
-            ? 'bg-blue-600 text-white'
-            : 'bg-white text-gray-700 border border-gray-300 hover:bg-gray-50'
-        }`}
-      >
-        {i}
-      </button>
-    );
-  }
-
-  return (
-    <div className="flex items-center justify-center space-x-2 mt-8">
-      <button
-        onClick={() => onPageChange(currentPage - 1)}
-        disabled={currentPage === 1}
-        className="px-3 py-1 rounded-lg text-sm font-medium bg-white text-gray-700 border border-gray-300 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
-      >
-        Previous
-      </button>
-      
-      {startPage > 1 && (
-        <>
-          <button
-            onClick={() => onPageChange(1)}
-            className="px-3 py-1 rounded-lg text-sm font-medium bg-white text-gray-700 border border-gray-300 hover:bg-gray-50"
-          >
-            1
-          </button>
-          {startPage > 2 && <span className="px-2 text-gray-500">...</span>}
-        </>
-      )}
-      
-      {pages}
-      
-      {endPage < totalPages && (
-        <>
-          {endPage < totalPages - 1 && <span className="px-2 text-gray-500">...</span>}
-          <button
-            onClick={() => onPageChange(totalPages)}
-            className="px-3 py-1 rounded-lg text-sm font-medium bg-white text-gray-700 border border-gray-300 hover:bg-gray-50"
-          >
-            {totalPages}
-          </button>
-        </>
-      )}
-      
-      <button
-        onClick={() => onPageChange(currentPage + 1)}
-        disabled={currentPage === totalPages}
-        className="px-3 py-1 rounded-lg text-sm font-medium bg-white text-gray-700 border border-gray-300 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
-      >
-        Next
-      </button>
-    </div>
-  );
-};
-
-
+const Pagination = ({ currentPage, totalPages, hasPrevious, hasNext, onPrevious, onNext }) => (
+  <div className="flex items-center justify-center space-x-2 mt-8">
+    <button
+      onClick={onPrevious}
+      disabled={!hasPrevious}
+      className="px-3 py-1 rounded-lg text-sm font-medium bg-white text-gray-700 border border-gray-300 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+    >
+      Previous
+    </button>
+    <span className="px-2 text-sm text-gray-500">
+      Page {currentPage} of {totalPages}
+    </span>
+    <button
+      onClick={onNext}
+      disabled={!hasNext}
+      className="px-3 py-1 rounded-lg text-sm font-medium bg-white text-gray-700 border border-gray-300 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+    >
+      Next
+    </button>
+  </div>
+);
 
 const EasterEggOverlay = ({ isVisible, onClose }) => {
   const [cardsRevealed, setCardsRevealed] = useState(false);
@@ -412,9 +359,11 @@ const StudentDashboard = () => {
   const [favoriteTeachers, setFavoriteTeachers] = useState([]);
   const [dashboardData, setDashboardData] = useState({
     postedJobs: [],
+    totalJobs: 0,
     points: 0,
     stats: { activeJobs: 0, completedJobs: 0 }
   });
+  const [jobCursors, setJobCursors] = useState({ next: null, previous: null });
   const [notifications, setNotifications] = useState([]);
   const [unreadNotificationCount, setUnreadNotificationCount] = useState(0);
   const [showNotifications, setShowNotifications] = useState(false);
@@ -460,20 +409,13 @@ const StudentDashboard = () => {
     const loadDashboardData = async () => {
       setIsLoading(true);
       try {
-        const [creditsData, jobsData, favoritesData] = await Promise.all([
+        const [creditsData, favoritesData] = await Promise.all([
           studentAPI.getCredits(),
-          studentAPI.getPostedJobs(),
-          studentAPI.getFavoriteTeachers(user.id)
+          studentAPI.getFavoriteTeachers(user.id),
+          loadFirstJobsPage()
         ]);
 
-        const activeJobs = jobsData.filter(j => j.status === 'active').length;
-        const completedJobs = jobsData.filter(j => j.status === 'completed').length;
-
-        setDashboardData({
-          postedJobs: jobsData,
-          points: creditsData.balance || 0,
-          stats: { activeJobs, completedJobs }
-        });
+        setDashboardData(prev => ({ ...prev, points: creditsData.balance || 0 }));
         setFavoriteTeachers(favoritesData);
         await loadNotifications();
       } catch {} finally {
@@ -484,23 +426,28 @@ const StudentDashboard = () => {
     loadDashboardData();
   }, [user]);
 
-  const totalJobs = dashboardData.postedJobs.length;
-  const totalPages = Math.ceil(totalJobs / jobsPerPage);
-  const startIndex = (currentPage - 1) * jobsPerPage;
-  const currentJobs = dashboardData.postedJobs.slice(startIndex, startIndex + jobsPerPage);
-
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [dashboardData.postedJobs.length]);
-
-  const handleJobCreated = (newJob) => {
+  // Counts come from the server with the first page, so they cover every posted job
+  async function loadFirstJobsPage() {
+    const data = await studentAPI.getPostedJobs({ page_size: jobsPerPage });
+    const counts = data.counts || { total: 0, active: 0, completed: 0 };
     setDashboardData(prev => ({
       ...prev,
-      postedJobs: [newJob, ...prev.postedJobs],
-      stats: { ...prev.stats, activeJobs: prev.stats.activeJobs + 1 },
-      points: prev.points - 1
+      postedJobs: data.results || [],
+      totalJobs: counts.total,
+      stats: { activeJobs: counts.active, completedJobs: counts.completed }
     }));
+    setJobCursors({ next: data.next, previous: data.previous });
+    setCurrentPage(1);
+  }
+
+  const totalJobs = dashboardData.totalJobs;
+  const totalPages = Math.max(1, Math.ceil(totalJobs / jobsPerPage));
+  const currentJobs = dashboardData.postedJobs;
+
+  const handleJobCreated = async () => {
+    setDashboardData(prev => ({ ...prev, points: prev.points - 1 }));
     setIsJobFormOpen(false);
+    await loadFirstJobsPage();
   };
 
   const handlePostJobClick = () => {
@@ -524,8 +471,13 @@ const StudentDashboard = () => {
     if (jobId) navigate(`/jobs/${jobId}`);
   };
 
-  const handlePageChange = (page) => {
-    setCurrentPage(page);
+  const handlePageChange = async (url, step) => {
+    if (!url) return;
+    const cursor = cursorFrom(url);
+    const data = await studentAPI.getPostedJobs({ page_size: jobsPerPage, cursor });
+    setDashboardData(prev => ({ ...prev, postedJobs: data.results || [] }));
+    setJobCursors({ next: data.next, previous: data.previous });
+    setCurrentPage(page => page + step);
     const jobSection = document.getElementById('job-posts-section');
     if (jobSection) {
       jobSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
@@ -595,7 +547,10 @@ const StudentDashboard = () => {
                 <Pagination
                   currentPage={currentPage}
                   totalPages={totalPages}
-                  onPageChange={handlePageChange}
+                  hasPrevious={Boolean(jobCursors.previous)}
+                  hasNext={Boolean(jobCursors.next)}
+                  onPrevious={() => handlePageChange(jobCursors.previous, -1)}
+                  onNext={() => handlePageChange(jobCursors.next, 1)}
                 />
               )}
             </>
@@ -3,7 +3,7 @@ import axios from 'axios';
 import LoadingSpinner from '../components/LoadingSpinner';
 import Navbar from '../components/Navbar';
 import Footer from '../components/Footer';
-import { creditAPI, gigApi, notificationAPI, jobAPI } from '../utils/apiService';
+import { creditAPI, cursorFrom, gigApi, notificationAPI, jobAPI } from '../utils/apiService';
 
 // Import components
 import DashboardHeader from '../components/Dashboard/Teacher/DashboardHeader';
@@ -390,9 +390,9 @@ const TeacherDashboard = () => {
     }
   });
 
-  // Pagination state for both gigs and matched jobs
+  // Gigs are paged on the client; matched jobs one cursor page at a time from the feed
   const [currentGigsPage, setCurrentGigsPage] = useState(1);
-  const [currentJobsPage, setCurrentJobsPage] = useState(1);
+  const [jobCursors, setJobCursors] = useState({ next: null, previous: null });
   const itemsPerPage = 6;
 
   // Easter Egg State
@@ -453,11 +453,12 @@ const TeacherDashboard = () => {
       const [gigsData, creditBalanceData, matchedJobsResponse] = await Promise.all([
         tutorAPI.getTutorGigs(currentUser.id),
         point.getUserCredits(currentUser.id),
-        jobAPI.getMatchedJobs(),
+        jobAPI.getMatchedJobs({ page_size: itemsPerPage }),
       ]);
 
       const myGigs = gigsData || [];
-      const matchedJobs = matchedJobsResponse.data || [];
+      const matchedJobs = matchedJobsResponse.data?.results || [];
+      setJobCursors({ next: matchedJobsResponse.data?.next, previous: matchedJobsResponse.data?.previous });
       const creditBalance = creditBalanceData.balance || 0;
       setDashboardData(prev => ({
         ...prev,
@@ -481,21 +482,11 @@ const TeacherDashboard = () => {
   const gigsStartIndex = (currentGigsPage - 1) * itemsPerPage;
   const currentGigs = dashboardData.myGigs.slice(gigsStartIndex, gigsStartIndex + itemsPerPage);
 
-  // Calculate pagination values for matched jobs
-  const totalJobs = dashboardData.matchedJobs.length;
-  const totalJobsPages = Math.ceil(totalJobs / itemsPerPage);
-  const jobsStartIndex = (currentJobsPage - 1) * itemsPerPage;
-  const currentJobs = dashboardData.matchedJobs.slice(jobsStartIndex, jobsStartIndex + itemsPerPage);
-
   // Reset to first page when data changes
   useEffect(() => {
     setCurrentGigsPage(1);
   }, [dashboardData.myGigs.length]);
 
-  useEffect(() => {
-    setCurrentJobsPage(1);
-  }, [dashboardData.matchedJobs.length]);
-
   const handleGigCreated = async (newGig) => {
     if (user) {
       try {
@@ -565,8 +556,17 @@ const TeacherDashboard = () => {
     }
   };
 
-  const handleJobsPageChange = (page) => {
-    setCurrentJobsPage(page);
+  const handleJobsPageChange = async (url) => {
+    if (!url) return;
+    const cursor = cursorFrom(url);
+    try {
+      const response = await jobAPI.getMatchedJobs({ page_size: itemsPerPage, cursor });
+      setDashboardData(prev => ({ ...prev, matchedJobs: response.data?.results || [] }));
+      setJobCursors({ next: response.data?.next, previous: response.data?.previous });
+    } catch (error) {
+      console.error("Error loading matched jobs:", error);
+      return;
+    }
     // Scroll to jobs section for better UX
     const jobsSection = document.getElementById('matched-jobs-section');
     if (jobsSection) {
@@ -648,9 +648,8 @@ const TeacherDashboard = () => {
             setActiveTab={setActiveTab}
             dashboardData={{
               ...dashboardData,
-              // Pass paginated data to tabs
-              myGigs: currentGigs,
-              matchedJobs: currentJobs
+              // Pass paginated gigs to tabs
+              myGigs: currentGigs
             }}
             handleCreateGigClick={handleCreateGigClick}
             // Pass pagination info and handlers
@@ -660,11 +659,11 @@ const TeacherDashboard = () => {
               totalGigsPages: totalGigsPages,
               currentGigsPage: currentGigsPage,
               onGigsPageChange: handleGigsPageChange,
-              // Jobs pagination
-              totalJobs: totalJobs,
-              totalJobsPages: totalJobsPages,
-              currentJobsPage: currentJobsPage,
-              onJobsPageChange: handleJobsPageChange,
+              // Jobs pagination (cursor: previous / next only)
+              hasPreviousJobs: Boolean(jobCursors.previous),
+              hasNextJobs: Boolean(jobCursors.next),
+              onPreviousJobs: () => handleJobsPageChange(jobCursors.previous),
+              onNextJobs: () => handleJobsPageChange(jobCursors.next),
               itemsPerPage: itemsPerPage
             }}
           />
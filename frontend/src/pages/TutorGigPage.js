@@ -15,6 +15,7 @@ const TutorGigPage = () => {
   const [boosting, setBoosting] = useState(false);
   const [creditsToSpend, setCreditsToSpend] = useState('');
   const [predictedRank, setPredictedRank] = useState(null);
+  const [boostCurve, setBoostCurve] = useState(null);
   const [predictLoading, setPredictLoading] = useState(false);
   const [editing, setEditing] = useState(false);
   const [dropdownOpen, setDropdownOpen] = useState(false);
@@ -49,6 +50,7 @@ const TutorGigPage = () => {
       setGig(data);
       fetchRank(data.id);
       setPredictedRank(null);
+      setBoostCurve(null);
     } catch {
       toast.error('Failed to load gig details');
       setGig(null);
@@ -97,8 +99,15 @@ const TutorGigPage = () => {
     if (!gig || isNaN(points) || points < 0) return;
     setPredictLoading(true);
     try {
-      const { data } = await gigApi.getPredictedRank(gig.id, points);
-      setPredictedRank(data);
+      // The curve lists the points needed for every rank, so it is fetched once per gig
+      let curve = boostCurve;
+      if (!curve) {
+        ({ data: curve } = await gigApi.getBoostCurve(gig.id));
+        setBoostCurve(curve);
+      }
+      const reached = curve.curve.filter((entry) => entry.points <= points);
+      const rank = reached.length ? reached[reached.length - 1].rank : curve.rank;
+      setPredictedRank({ predicted_rank: rank, total: curve.total });
     } catch {
       toast.error('Failed to fetch predicted rank');
       setPredictedRank(null);
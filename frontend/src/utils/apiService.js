@@ -20,6 +20,12 @@ apiService.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// Per-call Idempotency-Key: retries of the same call (e.g. after a token refresh)
+// reuse the key, so the backend runs the payment/spend once and replays the response
+const newIdempotencyKey = () =>
+  (window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+const idempotent = () => ({ headers: { 'Idempotency-Key': newIdempotencyKey() } });
+
 // To avoid multiple simultaneous refresh calls
 let isRefreshing = false;
 let failedQueue = [];
@@ -170,14 +176,15 @@ export const jobAPI = {
   getJobsByLocation: (location) =>
     apiService.get('/api/jobs/by-location/', { params: { location } }),
 
-  unlockJob: (id) => apiService.post(`/api/jobs/${id}/unlock/`),
+  unlockJob: (id) => apiService.post(`/api/jobs/${id}/unlock/`, undefined, idempotent()),
 
-  getJobUnlockPreview: (jobId) => apiService.get(`/api/jobs/${jobId}/preview/`),
+  getJobUnlockQuotes: (jobIds) =>
+    apiService.get('/api/jobs/unlock-quotes/', { params: { ids: jobIds.join(',') } }),
 
-  getMatchedJobs: () => apiService.get('/api/jobs/matched_jobs/'),
+  getMatchedJobs: (params) => apiService.get('/api/jobs/matched_jobs/', { params }),
 
-  getJobApplicants: (jobId) =>
-    apiService.get(`/api/jobs/${jobId}/applicants/`),
+  getJobApplicants: (jobId, params = {}) =>
+    apiService.get(`/api/jobs/${jobId}/applicants/`, { params }),
 
   chooseTutor: (jobId, tutorId) =>
     apiService.post(`/api/jobs/${jobId}/choose_tutor/`, { tutor_id: tutorId }),
@@ -197,10 +204,12 @@ export const gigApi = {
   getGigRank: (id) => apiService.get(`/api/gigs/${id}/rank/`),
   getGig: (gigId) => apiService.get(`/api/gigs/${gigId}/`),
   getPredictedRank: (gigId, points) => apiService.get(`/api/gigs/${gigId}/predicted_rank/`, { params: { points } }),
+  getBoostCurve: (gigId) => apiService.get(`/api/gigs/${gigId}/boost_curve/`),
 };
 
 export const subjectApi = {
   getSubjects: () => apiService.get('/api/subjects/'),
+  suggestSubjects: (q, limit = 10) => apiService.get('/api/subjects/suggest/', { params: { q, limit } }),
 };
 
 export const userApi = {
@@ -223,14 +232,14 @@ export const userApi = {
 export const creditAPI = {
   getCreditBalance: () => apiService.get(`/api/credits/`),
   getCreditHistory: (params) => apiService.get('/api/credit/history/', { params }),
-  transferCredits: (transferData) => apiService.post('/api/credits/transfer/', transferData),
-  giftCoins: (recipientId, amount) => apiService.post('/api/credits/transfer/', { recipient_id: recipientId, amount }),
+  transferCredits: (transferData) => apiService.post('/api/credits/transfer/', transferData, idempotent()),
+  giftCoins: (recipientId, amount) => apiService.post('/api/credits/transfer/', { recipient_id: recipientId, amount }, idempotent()),
   getReferralCode: () => apiService.get('/api/credit/referral-code/'),
   applyReferralCode: (code) => apiService.post('/api/credit/apply-referral/', { code }),
   getEarnings: () => apiService.get('/api/credit/earnings/'),
   withdrawEarnings: (data) => apiService.post('/api/credit/withdraw/', data),
   getPendingPayments: () => apiService.get('/api/credit/pending-payments/'),
-  purchaseCredits: (purchaseData) => apiService.post('/api/credits/purchase/', purchaseData),
+  purchaseCredits: (purchaseData) => apiService.post('/api/credits/purchase/', purchaseData, idempotent()),
 };
 
 // Review API calls
@@ -278,12 +287,16 @@ export const settingsAPI = {
 // Premium features API calls
 export const premiumAPI = {
   getPremiumStatus: () => apiService.get('/premium/status/'),
-  upgradeToPremium: (planData) => apiService.post('api/users/purchase_premium/', planData),
+  upgradeToPremium: (planData) => apiService.post('api/users/purchase_premium/', planData, idempotent()),
   cancelPremium: () => apiService.post('/premium/cancel/'),
   getPremiumFeatures: () => apiService.get('/premium/features/'),
   getPremiumAnalytics: () => apiService.get('/premium/analytics/'),
 };
 
+// Cursor-paged listings return { next, previous, results }; pass this to the next request as `cursor`
+export const cursorFrom = (url) =>
+  url ? new URL(url, window.location.origin).searchParams.get('cursor') : null;
+
 // File upload utility
 export const uploadFile = async (file, endpoint = '/upload/') => {
   const formData = new FormData();